@@ -0,0 +1,190 @@
+"""
+Benchmark Runner - times the cases in cases.py and compares runs
+
+Usage:
+    python benchmarks/bench.py run [--out FILE] [--filter TEXT] [--quick]
+    python benchmarks/bench.py compare BASELINE NEW [--threshold 0.15]
+
+Run from the repository root with src/slither_sprint on PYTHONPATH (the
+Makefile's bench targets do this). Rendering cases use SDL's dummy video
+driver, so no window is opened.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+REPEATS = 5
+TARGET_S = 0.15  # time one repeat should take
+QUICK_TARGET_S = 0.02
+MAX_ITERATIONS = 1_000_000
+
+
+def _time_op(op, iterations: int) -> float:
+    """Seconds taken by iterations calls of op"""
+    perf_counter = time.perf_counter
+    start = perf_counter()
+    for _ in range(iterations):
+        op()
+    return perf_counter() - start
+
+
+def _calibrate(factory, n, target_s: float) -> int:
+    """Find an iteration count that takes about target_s"""
+    iterations = 1
+    while iterations < MAX_ITERATIONS:
+        elapsed = _time_op(factory(n), iterations)
+        if elapsed >= target_s / 2:
+            return max(1, int(iterations * target_s / elapsed))
+        iterations *= 4 if elapsed < target_s / 20 else 2
+    return MAX_ITERATIONS
+
+
+def run_case(factory, n, iterations, repeats: int, target_s: float) -> dict:
+    """
+    Time one case
+
+    Each repeat gets fresh state from the factory, so cases that change
+    their state as they run start every repeat from the same point.
+
+    Returns:
+        Dict with the median and minimum time per call in microseconds
+    """
+    if iterations is None:
+        iterations = _calibrate(factory, n, target_s)
+    times = []
+    for _ in range(repeats):
+        op = factory(n)
+        gc.collect()
+        gc.disable()
+        try:
+            times.append(_time_op(op, iterations) / iterations)
+        finally:
+            gc.enable()
+    return {
+        "median_us": round(statistics.median(times) * 1e6, 3),
+        "min_us": round(min(times) * 1e6, 3),
+        "iterations": iterations,
+        "repeats": repeats,
+    }
+
+
+def _has_numpy() -> bool:
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def cmd_run(args) -> int:
+    """Run the selected cases and write the results as JSON"""
+    # Set before pygame is imported; compare never needs it
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    import pygame
+    from cases import CASES
+
+    target_s = QUICK_TARGET_S if args.quick else TARGET_S
+    repeats = 3 if args.quick else REPEATS
+    results = {}
+    for name, (factory, n, needs_display, iterations) in CASES.items():
+        if args.filter and args.filter not in name:
+            continue
+        if name.startswith("batch_engine") and not _has_numpy():
+            print(f"{name:<36} skipped (numpy not installed)")
+            continue
+        if needs_display and not pygame.display.get_init():
+            pygame.init()
+        result = run_case(factory, n, iterations, repeats, target_s)
+        results[name] = result
+        print(f"{name:<36}{result['median_us']:>12.2f} us")
+    pygame.quit()
+
+    data = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pygame": pygame.version.ver,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(data, f, indent=2)
+        print(f"Wrote {len(results)} results to {args.out}")
+    return 0
+
+
+def cmd_compare(args) -> int:
+    """
+    Compare two result files
+
+    Returns:
+        1 if any case is slower than the baseline by more than the
+        threshold, else 0
+    """
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    with open(args.new) as f:
+        new = json.load(f)["results"]
+
+    regressions = 0
+    print(f"{'case':<36}{'baseline us':>14}{'new us':>12}{'ratio':>9}")
+    names = list(baseline) + [name for name in new if name not in baseline]
+    for name in names:
+        if name not in baseline or name not in new:
+            where = "baseline" if name not in baseline else "new run"
+            print(f"{name:<36}  missing from {where}")
+            continue
+        old_us = baseline[name]["median_us"]
+        new_us = new[name]["median_us"]
+        ratio = new_us / old_us if old_us else float("inf")
+        flag = ""
+        if ratio > 1 + args.threshold:
+            flag = "  SLOWER"
+            regressions += 1
+        elif ratio < 1 - args.threshold:
+            flag = "  faster"
+        print(f"{name:<36}{old_us:>14.2f}{new_us:>12.2f}{ratio:>9.2f}{flag}")
+
+    if regressions:
+        print(f"{regressions} case(s) slower by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Slither Sprint benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Time the benchmark cases")
+    run.add_argument("--out", metavar="FILE", help="Write results as JSON")
+    run.add_argument("--filter", metavar="TEXT", help="Only cases containing TEXT")
+    run.add_argument("--quick", action="store_true", help="Shorter, noisier runs")
+    run.set_defaults(func=cmd_run)
+
+    compare = commands.add_parser("compare", help="Compare two result files")
+    compare.add_argument("baseline", help="Results to compare against")
+    compare.add_argument("new", help="Results of the new run")
+    compare.add_argument(
+        "--threshold",
+        type=float,
+        default=0.15,
+        help="Fraction slower that counts as a regression (default 0.15)",
+    )
+    compare.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+"""
+Benchmark cases - the hot paths of the model, controller and renderers
+
+Each case is a factory registered with @case. The runner calls the factory
+once per repeat to get fresh state, then times calls of the zero-argument
+operation it returns. Cases with scales are run once per scale, which is
+the entity count the name shows in brackets. Cases whose state drifts as
+they run (snakes climbing past their obstacles) fix their iteration count
+so every run measures the same stretch of play.
+"""
+
+import random
+from model.apple import Apple
+from model.entity_store import EntityStore, APPLE
+from model.game_state import GameState
+from model.obstacles import Obstacles
+from model.pane import Pane
+from model.snake import Snake
+from controller.engine import GameEngine
+from config import (
+    GRID_W,
+    GRID_H,
+    PANE1_X0,
+    PANE1_X1,
+    P1_COLOR,
+    P1_HEAD,
+)
+
+SCALES = (10, 1_000, 10_000)
+PLAYER_COUNTS = (2, 4, 8)
+
+CASES = {}
+
+
+def case(name: str, scales=(None,), needs_display=False, iterations=None):
+    """Register a benchmark factory under a name, once per scale"""
+
+    def register(factory):
+        for n in scales:
+            key = name if n is None else f"{name}[{n}]"
+            CASES[key] = (factory, n, needs_display, iterations)
+        return factory
+
+    return register
+
+
+def _obstacle_field(n: int, top: int, rng, panes=()) -> Obstacles:
+    """n obstacles at distinct random cells from row top downward"""
+    obstacles = Obstacles(panes)
+    rows = max(1, -(-n * 2 // GRID_W))  # about half the cells filled
+    cells = [(x, y) for y in range(top, top + rows) for x in range(GRID_W)]
+    for x, y in rng.sample(cells, min(n, len(cells))):
+        obstacles.add(x, y)
+    return obstacles
+
+
+@case("snake.step")
+def snake_step(_):
+    snake = Snake(Pane(PANE1_X0, PANE1_X1), 10, 0, P1_COLOR, P1_HEAD, "P1")
+    turns = [(True, False), (False, True)]
+    count = [0]
+
+    def op():
+        count[0] += 1
+        if count[0] % 8 == 0:
+            snake.steer(*turns[count[0] // 8 % 2])
+        snake.step()
+
+    return op
+
+
+@case("obstacles.collides", SCALES)
+def obstacles_collides(n):
+    rng = random.Random(1)
+    obstacles = _obstacle_field(n, -n, rng)
+    probes = [(rng.randrange(GRID_W), rng.randrange(-n, 0)) for _ in range(256)]
+    probes += list(obstacles.blocks)[:256]
+    index = [0]
+
+    def op():
+        i = index[0] = (index[0] + 1) % len(probes)
+        obstacles.collides(probes[i])
+
+    return op
+
+
+@case("obstacles.scroll_cleanup", SCALES)
+def obstacles_scroll_cleanup(n):
+    """Steady state of play: a row appears ahead and one is cleaned behind"""
+    rng = random.Random(2)
+    obstacles = _obstacle_field(n, 0, rng)
+    bounds = obstacles.rows.bounds()
+    top = [bounds[0]]
+    bottom = [bounds[1]]
+
+    def op():
+        # Add as many blocks as the row about to be cleaned holds
+        top[0] -= 1
+        dropped = obstacles.rows.get(bottom[0])
+        for x in rng.sample(range(GRID_W), len(dropped) if dropped else 0):
+            obstacles.add(x, top[0])
+        obstacles.cleanup(bottom[0])
+        bottom[0] -= 1
+
+    return op
+
+
+@case("entity_store.churn", SCALES)
+def entity_store_churn(n):
+    """One apple eaten and one spawned elsewhere"""
+    rng = random.Random(9)
+    pane = Pane(PANE1_X0, PANE1_X1)
+    store = EntityStore([pane])
+    cells = rng.sample(
+        [(x, y) for y in range(-n, 0) for x in range(pane.x0, pane.x1 + 1)], n + 1
+    )
+    for x, y in cells[:n]:
+        store.add(APPLE, x, y)
+    spare = [cells[n]]
+
+    def op():
+        i = rng.randrange(n)
+        store.remove(APPLE, cells[i])
+        x, y = spare[0]
+        store.add(APPLE, x, y)
+        cells[i], spare[0] = spare[0], cells[i]
+
+    return op
+
+
+@case("pane.get_empty_cell", SCALES)
+def pane_get_empty_cell(n):
+    rng = random.Random(3)
+    pane = Pane(PANE1_X0, PANE1_X1)
+    occupied = _obstacle_field(n, -60, rng).blocks
+
+    def op():
+        pane.get_empty_cell(occupied, -60, -10, rng)
+
+    return op
+
+
+@case("pane.get_free_cell", SCALES)
+def pane_get_free_cell(n):
+    rng = random.Random(4)
+    pane = Pane(PANE1_X0, PANE1_X1)
+    obstacles = _obstacle_field(n, -60, rng, [pane])
+    counts = obstacles.store.occupancy_in(pane)
+
+    def op():
+        pane.get_free_cell(counts, obstacles.blocks, -60, -10, rng)
+
+    return op
+
+
+@case("game_state.spawn_apple", SCALES)
+def game_state_spawn_apple(n):
+    """One spawn attempt; the new apple is removed so the count stays put"""
+    state = GameState(seed=5)
+    state.obstacles.restore(_obstacle_field(n, -70, random.Random(5)).snapshot())
+    apples = state.apples
+
+    def op():
+        before = len(apples)
+        state.spawn_apple()
+        if len(apples) > before:
+            apples.pop_at(next(reversed(apples.by_pos)))
+
+    return op
+
+
+@case("game_state.snapshot")
+def game_state_snapshot(_):
+    engine = GameEngine(seed=6)
+    engine.run_frames(100)
+    return engine.game_state.snapshot
+
+
+@case("game_state.restore")
+def game_state_restore(_):
+    engine = GameEngine(seed=6)
+    engine.run_frames(100)
+    state = engine.game_state
+    snapshot = state.snapshot()
+    return lambda: state.restore(snapshot)
+
+
+def _invincible_engine(n: int, chunked: bool = False, players: int = 2) -> GameEngine:
+    """An engine whose snakes cannot crash, with n obstacles ahead of them"""
+    engine = GameEngine(seed=7, chunked=chunked, players=players)
+    state = engine.game_state
+    for snake in state.snakes:
+        snake.collect_golden_apple()
+        snake.powerup_end_time = float("inf")
+    if n:
+        field = _obstacle_field(n, -GRID_H - n * 2 // GRID_W, random.Random(7))
+        for x, y in field.blocks:
+            state.obstacles.add(x, y)
+    return engine
+
+
+@case("engine.tick", SCALES, iterations=300)
+def engine_tick(n):
+    """Full _update_game ticks; invincible snakes keep the match running"""
+    engine = _invincible_engine(n)
+    return lambda: engine._update_game(33)
+
+
+@case("engine.tick_chunked", iterations=300)
+def engine_tick_chunked(_):
+    engine = _invincible_engine(0, chunked=True)
+    return lambda: engine._update_game(33)
+
+
+@case("engine.tick_players", PLAYER_COUNTS, iterations=300)
+def engine_tick_players(n):
+    """Chunked-world ticks with n players; should grow linearly with n"""
+    engine = _invincible_engine(0, chunked=True, players=n)
+    return lambda: engine._update_game(33)
+
+
+def _render_case(renderer_name: str, n: int, players: int = 2):
+    import pygame
+    from controller.game_controller import RENDERERS
+    from config import WIDTH, HEIGHT
+
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    renderer = RENDERERS[renderer_name](screen)
+    state = GameState(seed=8, players=players)
+    # Fill the view from its top row up; what does not fit lies ahead
+    state.obstacles.restore(
+        _obstacle_field(n, -n * 2 // GRID_W, random.Random(8)).snapshot()
+    )
+    rng = random.Random(8)
+    for _ in range(40):
+        state.apples.add(
+            Apple(rng.randrange(GRID_W), rng.randrange(0, GRID_H), rng.random() < 0.2)
+        )
+
+    def op():
+        # Scroll like a match in progress so strips keep repainting
+        cameras = state.cameras
+        for i in range(len(cameras)):
+            cameras[i] -= 0.2 - 0.05 * (i % 2)
+        renderer.render(state)
+
+    return op
+
+
+@case("render.full", SCALES, needs_display=True, iterations=200)
+def render_full(n):
+    return _render_case("full", n)
+
+
+@case("render.strip", SCALES, needs_display=True, iterations=200)
+def render_strip(n):
+    return _render_case("strip", n)
+
+
+@case("render.players", PLAYER_COUNTS, needs_display=True, iterations=200)
+def render_players(n):
+    """A full redraw of the same 1k obstacles split between n panes"""
+    return _render_case("full", 1_000, players=n)
+
+
+@case("batch_engine.step[1024]")
+def batch_engine_step(_):
+    from controller.batch_engine import BatchEngine
+
+    engine = BatchEngine(1024, seed=9)
+
+    def op():
+        engine.step()
+        engine.reset(~engine.running)
+
+    return op
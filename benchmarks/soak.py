@@ -0,0 +1,192 @@
+"""
+Soak Test - runs an endless race for millions of ticks and checks it stays flat
+
+Usage:
+    python benchmarks/soak.py [--ticks N] [--window N] [--players N]
+                              [--chunks] [--render-every N] [--seed N]
+
+Run from the repository root with src/slither_sprint on PYTHONPATH (the
+Makefile's soak target does this). The race is endless and every snake is
+kept alive, so it never ends: each snake bounces between its pane's walls
+and stays invincible. Every window of ticks the harness records the memory
+traced by tracemalloc, the mean time per tick, the entity counts and the
+camera range. With --render-every both renderers also draw the race onto
+SDL's dummy display, so their caches are covered too.
+
+The run fails (exit status 1) if, after the warm-up, memory grows by more
+than MEMORY_SLACK_KB, the last quarter's ticks are more than TIME_SLACK
+slower than the first quarter's, or a camera strays further from the
+origin than a rebase allows.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+WARMUP = 0.1  # fraction of the run left out of the checks
+MEMORY_SLACK_KB = 256
+TIME_SLACK = 0.5
+
+
+def keep_alive(engine):
+    """Steer every snake away from its pane's walls and keep it invincible"""
+    from model.power_up import PowerUpType
+
+    for player, snake in enumerate(engine.game_state.snakes, start=1):
+        x = snake.head[0]
+        if x <= snake.pane.x0 + 1:
+            engine.set_steering(player, False, True)
+        elif x >= snake.pane.x1 - 1:
+            engine.set_steering(player, True, False)
+        elif snake.dx == 0:
+            engine.set_steering(player, player % 2 == 1, player % 2 == 0)
+        # Renewed every tick, since a speed boost replaces it
+        snake.activate_powerup(PowerUpType.INVINCIBILITY)
+
+
+def make_renderers():
+    """Both renderers, drawing onto the dummy display"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    import pygame
+    from controller.game_controller import RENDERERS
+    from config import WIDTH, HEIGHT
+
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    return [renderer(screen) for renderer in RENDERERS.values()]
+
+
+def counts(engine, renderers) -> dict:
+    """Sizes of everything a long race could pile up"""
+    state = engine.game_state
+    result = {
+        "blocks": len(state.obstacles.blocks),
+        "obstacle_rows": len(state.obstacles.rows),
+        "apples": len(state.apples),
+        "bodies": sum(len(snake.body) for snake in state.snakes),
+    }
+    if state.world is not None:
+        result["chunks"] = len(state.world.loaded)
+    if renderers:
+        result["text_cache"] = max(len(r.text) for r in renderers)
+        result["sprites"] = max(len(r.sprites) for r in renderers)
+    return result
+
+
+def run(args) -> int:
+    """Run the soak test and check its windows"""
+    from controller.engine import GameEngine
+    from config import FIXED_STEP_MS, GRID_H, REBASE_ROWS
+
+    engine = GameEngine(
+        seed=args.seed, chunked=args.chunks, players=args.players, endless=True
+    )
+    renderers = make_renderers() if args.render_every else []
+    state = engine.game_state
+
+    tracemalloc.start()
+    perf_counter = time.perf_counter
+    windows = []
+    camera_limit = 0.0
+    tick = 0
+    print(
+        f"{'tick':>10}{'memory KB':>11}{'us/tick':>9}{'us/frame':>10}"
+        f"{'camera':>9}{'origin':>11}  counts"
+    )
+    while tick < args.ticks:
+        tick_s = render_s = 0.0
+        frames = 0
+        ticks = min(args.window, args.ticks - tick)
+        for _ in range(ticks):
+            keep_alive(engine)
+            start = perf_counter()
+            engine.tick(FIXED_STEP_MS)
+            tick_s += perf_counter() - start
+            tick += 1
+            for camera in state.cameras:
+                camera_limit = max(camera_limit, abs(camera))
+            if args.render_every and tick % args.render_every == 0:
+                start = perf_counter()
+                for renderer in renderers:
+                    renderer.render(state)
+                render_s += perf_counter() - start
+                frames += 1
+        if engine.is_over:
+            print(f"Race ended at tick {tick}: {state.winner_text}")
+            return 1
+
+        window = {
+            "tick": tick,
+            "memory_kb": tracemalloc.get_traced_memory()[0] / 1024,
+            "tick_us": tick_s / ticks * 1e6,
+            "frame_us": render_s / frames * 1e6 if frames else 0.0,
+            "counts": counts(engine, renderers),
+        }
+        windows.append(window)
+        print(
+            f"{tick:>10}{window['memory_kb']:>11.0f}{window['tick_us']:>9.1f}"
+            f"{window['frame_us']:>10.0f}{min(state.cameras):>9.0f}"
+            f"{state.origin:>11}  {window['counts']}"
+        )
+    tracemalloc.stop()
+
+    return check(windows, camera_limit, REBASE_ROWS + 2 * GRID_H)
+
+
+def check(windows: list, camera_limit: float, camera_bound: float) -> int:
+    """
+    Check the windows after the warm-up for growth
+
+    Returns:
+        1 if a check failed, else 0
+    """
+    measured = windows[int(len(windows) * WARMUP) :]
+    quarter = max(1, len(measured) // 4)
+    first, last = measured[:quarter], measured[-quarter:]
+    failures = []
+
+    growth = max(w["memory_kb"] for w in last) - max(w["memory_kb"] for w in first)
+    if growth > MEMORY_SLACK_KB:
+        failures.append(f"memory grew by {growth:.0f} KB")
+
+    first_us = statistics.median(w["tick_us"] for w in first)
+    last_us = statistics.median(w["tick_us"] for w in last)
+    if last_us > first_us * (1 + TIME_SLACK):
+        failures.append(f"ticks slowed from {first_us:.1f} to {last_us:.1f} us")
+
+    if camera_limit > camera_bound:
+        failures.append(f"a camera reached y={camera_limit:.0f}")
+
+    print(
+        f"Memory {growth:+.0f} KB, ticks {first_us:.1f} -> {last_us:.1f} us,"
+        f" cameras within {camera_limit:.0f} rows of the origin"
+    )
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    return 1 if failures else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Slither Sprint soak test")
+    parser.add_argument("--ticks", type=int, default=2_000_000)
+    parser.add_argument("--window", type=int, default=50_000, help="Ticks per sample")
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--chunks", action="store_true", help="Use a chunked world")
+    parser.add_argument(
+        "--render-every",
+        type=int,
+        default=100,
+        metavar="N",
+        help="Draw with both renderers every N ticks (0 to skip)",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,6 +7,33 @@ WIDTH, HEIGHT = 900, 640
 CELL = 20
 FPS = 30
 STEP_MS = 110  # base snake step interval
+FIXED_STEP_MS = 1000 // FPS  # simulation tick in deterministic mode
+MAX_TICKS_PER_FRAME = 5  # catch-up limit before lag is dropped
+INTERPOLATE = False  # draw between fixed ticks at RENDER_FPS instead of once per tick
+RENDER_FPS = 120  # frame rate cap when interpolating; the simulation stays at FPS
+MAX_FRAME_SKIP = 4  # frames put off in a row under load before one is drawn anyway
+
+# Rendering
+RENDER_MODE = "full"  # "full" redraws every frame, "strip" scrolls cached strips
+TEXT_CACHE_SIZE = 64  # rendered HUD strings kept between frames
+FONT_PATH = None  # HUD font file; None uses the font bundled with pygame
+FONT_SIZE = 18
+
+# Profiling
+PROFILE_WINDOW = 300  # frames behind the rolling percentiles
+PROFILE_TRACE_FRAMES = 100_000  # frames kept for export
+
+# Video export
+EXPORT_POOL = 8  # frames in flight between the render loop and the writer thread
+FFMPEG = "ffmpeg"  # encoder command for video files
+
+# Online play
+DEFAULT_PORT = 7453  # port --serve listens on
+ROLLBACK_BUDGET_MS = FIXED_STEP_MS / 4  # re-simulation time per tick; the rest waits
+
+# AI opponents
+BOT_BUDGET_MS = 4.0  # path planning time per frame, shared by every bot
+BOT_LOOKAHEAD = 24  # rows a bot plans ahead of its head
 
 # Grid calculations
 GRID_W = WIDTH // CELL
@@ -22,6 +49,18 @@ P1_HEAD = (20, 255, 160)
 P2_COLOR = (80, 150, 255)
 P2_HEAD = (120, 200, 255)
 
+# (body, head) colors of every player, in player order
+PLAYER_COLORS = [
+    (P1_COLOR, P1_HEAD),
+    (P2_COLOR, P2_HEAD),
+    ((235, 90, 70), (255, 140, 110)),
+    ((190, 110, 240), (220, 160, 255)),
+    ((240, 180, 40), (255, 220, 110)),
+    ((40, 200, 210), (120, 240, 245)),
+    ((240, 100, 170), (255, 160, 210)),
+    ((170, 200, 60), (210, 235, 120)),
+]
+
 OBSTACLE_A = (120, 120, 120)
 OBSTACLE_B = (140, 140, 140)
 
@@ -34,6 +73,19 @@ PADDING = 2
 SNAKE_LEN = 12
 
 # Split-screen
+PLAYERS = 2  # default player count, one pane each
+MAX_PLAYERS = len(PLAYER_COLORS)
+# (left, right) steering keys of every player, as pygame key names
+PLAYER_KEYS = [
+    ("a", "d"),
+    ("left", "right"),
+    ("j", "l"),
+    ("v", "n"),
+    ("[4]", "[6]"),
+    ("z", "c"),
+    ("t", "u"),
+    ("1", "3"),
+]
 PANE_COLS = GRID_W // 2
 PANE1_X0, PANE1_X1 = 0, PANE_COLS - 1
 PANE2_X0, PANE2_X1 = PANE_COLS, GRID_W - 1
@@ -44,6 +96,12 @@ OBSTACLE_SPAWN_EVERY_STEPS = 5
 OBSTACLE_SPAWN_CHANCE = 0.3
 SPAWN_AHEAD_MIN, SPAWN_AHEAD_MAX = 8, 20
 
+# Chunked world generation
+CHUNKED_WORLD = False  # generate obstacles per chunk instead of ahead of snakes
+MIRROR_CHUNKS = True  # give both panes the same obstacle layout
+CHUNK_ROWS = 16
+CHUNK_CLEAR_ROWS = 30  # rows above the start line kept free of obstacles
+
 # Power-ups
 SPEED_BOOST_DURATION = 5000  # 5 seconds in ms
 INVINCIBILITY_DURATION = 5000
@@ -53,3 +111,10 @@ GOLDEN_APPLE_SPAWN_CHANCE = 0.1
 # Game goals
 FINISH_LINE_DISTANCE = -500  # world Y coordinate for finish line
 MINIGAME_TRIGGER = FINISH_LINE_DISTANCE / 2  # halfway point
+
+# Endless mode
+ENDLESS = False  # no finish line; the race goes on until one snake is left
+# Rows every world coordinate is moved back by once the leading camera has
+# climbed this far, so coordinates stay small however long the race runs.
+# A whole number of chunks, so chunked worlds keep their layout
+REBASE_ROWS = 4096
@@ -0,0 +1,506 @@
+"""
+Batch Engine - steps many independent matches in lockstep with NumPy
+"""
+
+import math
+import numpy as np
+from controller.engine import FRAME_MS
+from config import (
+    GRID_W,
+    GRID_H,
+    SNAKE_LEN,
+    STEP_MS,
+    PANE1_X0,
+    PANE1_X1,
+    PANE2_X0,
+    PANE2_X1,
+    OBSTACLE_SEED,
+    OBSTACLE_SPAWN_EVERY_STEPS,
+    OBSTACLE_SPAWN_CHANCE,
+    SPAWN_AHEAD_MIN,
+    SPAWN_AHEAD_MAX,
+    SPEED_BOOST_DURATION,
+    INVINCIBILITY_DURATION,
+    APPLES_FOR_SPEED_BOOST,
+    GOLDEN_APPLE_SPAWN_CHANCE,
+    FINISH_LINE_DISTANCE,
+)
+
+# Power-up codes, matching PowerUpType values
+NONE = 0
+SPEED_BOOST = 1
+INVINCIBILITY = 2
+
+# Apple codes
+NO_APPLE = 0
+RED_APPLE = 1
+GOLDEN_APPLE = 2
+
+# Winner codes
+RUNNING = -1
+P1_WINS = 0
+P2_WINS = 1
+DRAW = 2
+
+MAX_APPLES = 50
+EMPTY_CELL_ATTEMPTS = 50
+
+# Rows the obstacle grid covers: snakes start at y = 0 with their tail at
+# SNAKE_LEN - 1, and nothing spawns further than 60 rows past the finish
+# line while a head is still short of it. A frame long enough to carry a
+# head further only ends the match, so rows past Y_MIN are read as empty
+# and obstacles spawned there are dropped.
+Y_MIN = FINISH_LINE_DISTANCE - 60 - SPAWN_AHEAD_MAX
+Y_MAX = SNAKE_LEN
+WORLD_ROWS = Y_MAX - Y_MIN + 1
+
+PANE_X0 = np.array([PANE1_X0, PANE2_X0], dtype=np.int32)
+PANE_X1 = np.array([PANE1_X1, PANE2_X1], dtype=np.int32)
+
+
+class BatchEngine:
+    """
+    N independent two-player matches stored as NumPy arrays
+
+    Every per-match field of GameState/Snake becomes an array with the
+    match index as its first axis (and the player index second, for snake
+    fields), and each rule in GameEngine._update_game is applied to all
+    running matches at once. Obstacles live in a dense occupancy grid
+    covering every row a match can reach, so collision is a gather instead
+    of a set lookup, and apples live in MAX_APPLES slots per match.
+
+    Matches that have a winner stop advancing until reset() is called for
+    them.
+    """
+
+    def __init__(self, n: int, seed: int = None):
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+
+        shape = (n, 2)
+        self.time_ms = np.zeros(n, dtype=np.int64)
+        self.acc_ms = np.zeros(shape, dtype=np.int64)
+
+        # Snake bodies are ring buffers; head_idx points at the head slot
+        self.body_x = np.zeros((n, 2, SNAKE_LEN), dtype=np.int32)
+        self.body_y = np.zeros((n, 2, SNAKE_LEN), dtype=np.int32)
+        self.head_idx = np.zeros(shape, dtype=np.int32)
+        self.head_x = np.zeros(shape, dtype=np.int32)
+        self.head_y = np.zeros(shape, dtype=np.int32)
+        self.dx = np.zeros(shape, dtype=np.int32)
+        self.alive = np.ones(shape, dtype=bool)
+        self.steps = np.zeros(shape, dtype=np.int64)
+        self.apples_collected = np.zeros(shape, dtype=np.int64)
+        self.powerup = np.zeros(shape, dtype=np.int8)
+        self.powerup_end_ms = np.zeros(shape, dtype=np.int64)
+        self.step_ms = np.full(shape, STEP_MS, dtype=np.int64)
+
+        self.camera_y = np.zeros(shape, dtype=np.float64)
+
+        self.obstacles = np.zeros((n, WORLD_ROWS, GRID_W), dtype=bool)
+        # Rows at or below this y hold no obstacles
+        self.clear_from = np.full(n, Y_MAX + 1, dtype=np.int64)
+        self.apple_x = np.zeros((n, MAX_APPLES), dtype=np.int32)
+        self.apple_y = np.zeros((n, MAX_APPLES), dtype=np.int32)
+        self.apple_kind = np.zeros((n, MAX_APPLES), dtype=np.int8)
+
+        self.winner = np.full(n, RUNNING, dtype=np.int8)
+
+        self.reset()
+
+    @property
+    def running(self) -> np.ndarray:
+        """Boolean mask of matches that have not been decided"""
+        return self.winner == RUNNING
+
+    def reset(self, mask: np.ndarray = None):
+        """
+        Reset matches to their initial state
+
+        Args:
+            mask: Boolean array selecting matches to reset (all if None)
+        """
+        idx = np.arange(self.n) if mask is None else np.flatnonzero(mask)
+        if idx.size == 0:
+            return
+        m = idx.size
+
+        self.time_ms[idx] = 0
+        self.acc_ms[idx] = 0
+
+        # Snakes start in the middle of their pane, heading up
+        start_x = (PANE_X0 + PANE_X1) // 2
+        self.body_x[idx] = start_x[None, :, None]
+        self.body_y[idx] = np.arange(SNAKE_LEN, dtype=np.int32)[None, None, :]
+        self.head_idx[idx] = 0
+        self.head_x[idx] = start_x[None, :]
+        self.head_y[idx] = 0
+        self.dx[idx] = 0
+        self.alive[idx] = True
+        self.steps[idx] = 0
+        self.apples_collected[idx] = 0
+        self.powerup[idx] = NONE
+        self.powerup_end_ms[idx] = 0
+        self.step_ms[idx] = STEP_MS
+        self.camera_y[idx] = 0.0
+        self.winner[idx] = RUNNING
+
+        # Seed obstacles, each in a random pane
+        self.obstacles[idx] = False
+        self.clear_from[idx] = Y_MAX + 1
+        pane = (self.rng.random((m, OBSTACLE_SEED)) >= 0.5).astype(np.intp)
+        x = self._rand_x(pane)
+        y = self.rng.integers(-80, -30, size=(m, OBSTACLE_SEED), endpoint=True)
+        games = np.repeat(idx, OBSTACLE_SEED)
+        self.obstacles[games, (y - Y_MIN).ravel(), x.ravel()] = True
+
+        # Initial apples avoid obstacles and each other, like GameState.reset
+        self.apple_kind[idx] = NO_APPLE
+        for slot in range(10):
+            pane = (self.rng.random(m) >= 0.5).astype(np.intp)
+            found, px, py = self._find_empty_cells(
+                idx, pane, np.full(m, -100), np.full(m, -10)
+            )
+            games = idx[found]
+            self.apple_x[games, slot] = px[found]
+            self.apple_y[games, slot] = py[found]
+            self.apple_kind[games, slot] = RED_APPLE
+
+    def load(self, index: int, engine):
+        """
+        Copy a running two-player GameEngine match into one batch match
+
+        Everything the rules read is copied: snakes, step timers, power-ups,
+        cameras, obstacles on the grid's rows and apples. The RNG is not,
+        so the two engines spawn differently from here on.
+
+        Args:
+            index: Match to overwrite
+            engine: GameEngine to copy; its snakes must still have their
+                starting length
+        """
+        state = engine.game_state
+        if len(state.snakes) != 2 or state.endless or engine.is_over:
+            raise ValueError("only a running two-player race can be loaded")
+        if any(len(snake.body) != SNAKE_LEN for snake in state.snakes):
+            raise ValueError(f"snake bodies must be {SNAKE_LEN} cells long")
+
+        self.time_ms[index] = state.clock.now_ms
+        self.acc_ms[index] = engine.acc_ms
+        for p, snake in enumerate(state.snakes):
+            self.body_x[index, p] = [x for x, _ in snake.body]
+            self.body_y[index, p] = [y for _, y in snake.body]
+            self.head_x[index, p], self.head_y[index, p] = snake.head
+            self.dx[index, p] = snake.dx
+            self.alive[index, p] = snake.alive
+            self.steps[index, p] = snake.steps
+            self.apples_collected[index, p] = snake.apples_collected
+            self.powerup[index, p] = snake.active_powerup.value
+            self.powerup_end_ms[index, p] = snake.powerup_end_time
+            self.step_ms[index, p] = snake.current_step_ms
+        self.head_idx[index] = 0
+        self.camera_y[index] = state.cameras
+        self.winner[index] = RUNNING
+
+        self.obstacles[index] = False
+        for x, y in state.obstacles.blocks:
+            if Y_MIN <= y <= Y_MAX:
+                self.obstacles[index, y - Y_MIN, x] = True
+        # GameState.cleanup_offscreen_items already dropped the rows below
+        bottom = math.ceil(max(state.cameras) + 35)
+        self.clear_from[index] = min(max(bottom, Y_MIN), Y_MAX + 1)
+
+        self.apple_kind[index] = NO_APPLE
+        for slot, apple in enumerate(state.apples):
+            self.apple_x[index, slot] = apple.x
+            self.apple_y[index, slot] = apple.y
+            self.apple_kind[index, slot] = (
+                GOLDEN_APPLE if apple.is_golden else RED_APPLE
+            )
+
+    def body(self, index: int, player: int) -> list:
+        """
+        Get the cells of one snake, head first like Snake.body
+
+        Args:
+            index: Match to read
+            player: Player index, from 0
+        """
+        order = np.roll(np.arange(SNAKE_LEN), -self.head_idx[index, player])
+        xs = self.body_x[index, player, order]
+        ys = self.body_y[index, player, order]
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def step(self, steering: np.ndarray = None, dt: int = FRAME_MS):
+        """
+        Advance every running match by one frame
+
+        Args:
+            steering: (n, 2) int array per player, -1 for left, 1 for
+                right, 0 to keep the current heading
+            dt: Frame duration in milliseconds
+        """
+        active = self.running
+        if not active.any():
+            return
+
+        if steering is not None:
+            steer = np.asarray(steering)
+            self.dx = np.where(
+                active[:, None] & (steer != 0), np.sign(steer), self.dx
+            ).astype(np.int32)
+
+        self.time_ms[active] += dt
+        self._update_powerups(active)
+        self._update_snake_movement(active, dt)
+        self._check_collisions(active)
+        self._handle_apple_collection(active)
+        self._spawn_apples(active)
+        self._update_cameras(active)
+        self._spawn_obstacles(active)
+        self._check_win_conditions(active)
+        self._cleanup_offscreen_items(active)
+
+    def _grid_rows(self, y: np.ndarray):
+        """
+        Map world rows to obstacle grid rows
+
+        Returns:
+            (rows, inside): rows clamped into the grid, and a mask of the
+            ones that were in it
+        """
+        rows = y - Y_MIN
+        inside = (rows >= 0) & (rows < WORLD_ROWS)
+        return np.clip(rows, 0, WORLD_ROWS - 1), inside
+
+    def _rand_x(self, pane: np.ndarray) -> np.ndarray:
+        """Random x coordinate inside the given pane indices"""
+        return self.rng.integers(PANE_X0[pane], PANE_X1[pane], endpoint=True)
+
+    def _update_powerups(self, active):
+        """Expire power-ups whose end time has passed"""
+        expired = (
+            active[:, None]
+            & (self.powerup != NONE)
+            & (self.time_ms[:, None] >= self.powerup_end_ms)
+        )
+        self.powerup[expired] = NONE
+        self.step_ms[expired] = STEP_MS
+
+    def _update_snake_movement(self, active, dt):
+        """Step snakes whose accumulators have reached their step interval"""
+        self.acc_ms[active] += dt
+        while True:
+            due = active[:, None] & (self.acc_ms >= self.step_ms)
+            if not due.any():
+                break
+            self.acc_ms -= np.where(due, self.step_ms, 0)
+            self._step_snakes(due)
+
+    def _step_snakes(self, mask):
+        """Move the selected snakes forward one step"""
+        games, players = np.nonzero(mask & self.alive)
+        if games.size == 0:
+            return
+
+        self.steps[games, players] += 1
+        nx = self.head_x[games, players] + self.dx[games, players]
+        ny = self.head_y[games, players] - 1
+
+        # Boundary collision
+        inside = (nx >= PANE_X0[players]) & (nx <= PANE_X1[players])
+        self.alive[games[~inside], players[~inside]] = False
+        games, players, nx, ny = games[inside], players[inside], nx[inside], ny[inside]
+
+        # The new head overwrites the tail slot of the ring buffer
+        slot = (self.head_idx[games, players] - 1) % SNAKE_LEN
+        self.body_x[games, players, slot] = nx
+        self.body_y[games, players, slot] = ny
+        self.head_idx[games, players] = slot
+        self.head_x[games, players] = nx
+        self.head_y[games, players] = ny
+
+        # Self-collision: the head appears anywhere else in the body
+        overlaps = (self.body_x[games, players] == nx[:, None]) & (
+            self.body_y[games, players] == ny[:, None]
+        )
+        hit = overlaps.sum(axis=1) > 1
+        self.alive[games[hit], players[hit]] = False
+
+    def _check_collisions(self, active):
+        """Kill snakes whose head is on an obstacle"""
+        check = active[:, None] & self.alive & (self.powerup != INVINCIBILITY)
+        games, players = np.nonzero(check)
+        rows, inside = self._grid_rows(self.head_y[games, players])
+        hit = inside & self.obstacles[games, rows, self.head_x[games, players]]
+        self.alive[games[hit], players[hit]] = False
+
+    def _handle_apple_collection(self, active):
+        """Collect apples under living heads; player 1 wins ties"""
+        present = active[:, None] & (self.apple_kind != NO_APPLE)
+        takers = []
+        for p in (0, 1):
+            on_head = (
+                present
+                & self.alive[:, p, None]
+                & (self.apple_x == self.head_x[:, p, None])
+                & (self.apple_y == self.head_y[:, p, None])
+            )
+            present &= ~on_head
+            takers.append(on_head)
+
+        for p, taken in enumerate(takers):
+            reds = (taken & (self.apple_kind == RED_APPLE)).sum(axis=1)
+            goldens = (taken & (self.apple_kind == GOLDEN_APPLE)).sum(axis=1)
+
+            before = self.apples_collected[:, p]
+            after = before + reds
+            boosted = (after // APPLES_FOR_SPEED_BOOST) > (
+                before // APPLES_FOR_SPEED_BOOST
+            )
+            self.apples_collected[:, p] = after
+            self._activate_powerup(boosted, p, SPEED_BOOST)
+            self._activate_powerup(goldens > 0, p, INVINCIBILITY)
+
+            self.apple_kind[taken] = NO_APPLE
+
+    def _activate_powerup(self, games, player, powerup):
+        """Activate a power-up for one player in the selected matches"""
+        self.powerup[games, player] = powerup
+        if powerup == SPEED_BOOST:
+            self.powerup_end_ms[games, player] = (
+                self.time_ms[games] + SPEED_BOOST_DURATION
+            )
+            self.step_ms[games, player] = int(STEP_MS * 0.7)
+        else:
+            self.powerup_end_ms[games, player] = (
+                self.time_ms[games] + INVINCIBILITY_DURATION
+            )
+            self.step_ms[games, player] = STEP_MS
+
+    def _find_empty_cells(self, idx, pane, y_min, y_max):
+        """
+        Rejection-sample one empty cell per match, like Pane.get_empty_cell
+
+        Returns:
+            (found, x, y) arrays aligned with idx
+        """
+        m = idx.size
+        shape = (m, EMPTY_CELL_ATTEMPTS)
+        xs = self.rng.integers(
+            PANE_X0[pane][:, None], PANE_X1[pane][:, None], size=shape, endpoint=True
+        )
+        ys = self.rng.integers(
+            y_min[:, None], y_max[:, None], size=shape, endpoint=True
+        )
+
+        rows, inside = self._grid_rows(ys)
+        free = ~(inside & self.obstacles[idx[:, None], rows, xs])
+        # Only slots up to the last one any of these matches uses; while
+        # the initial apples go down, that is the ones placed so far
+        present = self.apple_kind[idx] != NO_APPLE
+        used = np.flatnonzero(present.any(axis=0))
+        if used.size:
+            end = used[-1] + 1
+            taken = (
+                present[:, None, :end]
+                & (self.apple_x[idx, :end][:, None, :] == xs[:, :, None])
+                & (self.apple_y[idx, :end][:, None, :] == ys[:, :, None])
+            )
+            free &= ~taken.any(axis=2)
+
+        first = free.argmax(axis=1)
+        rows = np.arange(m)
+        return free[rows, first], xs[rows, first], ys[rows, first]
+
+    def _spawn_apples(self, active):
+        """Spawn new apples randomly"""
+        count = (self.apple_kind != NO_APPLE).sum(axis=1)
+        spawn = active & (self.rng.random(self.n) < 0.08) & (count < MAX_APPLES)
+        idx = np.flatnonzero(spawn)
+        if idx.size == 0:
+            return
+
+        pane = (self.rng.random(idx.size) >= 0.5).astype(np.intp)
+        furthest = self.head_y[idx].min(axis=1)
+        found, x, y = self._find_empty_cells(idx, pane, furthest - 60, furthest - 10)
+        golden = self.rng.random(idx.size) < GOLDEN_APPLE_SPAWN_CHANCE
+
+        idx, x, y, golden = idx[found], x[found], y[found], golden[found]
+        slot = (self.apple_kind[idx] == NO_APPLE).argmax(axis=1)
+        self.apple_x[idx, slot] = x
+        self.apple_y[idx, slot] = y
+        self.apple_kind[idx, slot] = np.where(golden, GOLDEN_APPLE, RED_APPLE)
+
+    def _update_cameras(self, active):
+        """Update camera positions to follow snakes"""
+        target = self.head_y - GRID_H * 0.75
+        moved = self.camera_y + (target - self.camera_y) * 0.2
+        self.camera_y = np.where(active[:, None], moved, self.camera_y)
+
+    def _spawn_obstacles(self, active):
+        """Spawn obstacles ahead of snakes"""
+        spawn = (
+            active[:, None]
+            & self.alive
+            & (self.steps % OBSTACLE_SPAWN_EVERY_STEPS == 0)
+            & (self.rng.random((self.n, 2)) < OBSTACLE_SPAWN_CHANCE)
+        )
+        games, players = np.nonzero(spawn)
+        if games.size == 0:
+            return
+
+        ahead = self.rng.integers(
+            SPAWN_AHEAD_MIN, SPAWN_AHEAD_MAX, size=games.size, endpoint=True
+        )
+        rows, inside = self._grid_rows(self.head_y[games, players] - ahead)
+        span = self.rng.integers(1, 3, size=games.size, endpoint=True)
+        start_x = self.rng.integers(
+            PANE_X0[players], PANE_X1[players] - (span - 1), endpoint=True
+        )
+        for i in range(3):
+            wide = inside & (span > i)
+            self.obstacles[games[wide], rows[wide], start_x[wide] + i] = True
+
+    def _check_win_conditions(self, active):
+        """Record the winner of matches that just ended"""
+        finished = self.alive & (self.head_y <= FINISH_LINE_DISTANCE)
+        a1, a2 = self.alive[:, 0], self.alive[:, 1]
+
+        winner = np.select(
+            [
+                finished[:, 0],
+                finished[:, 1],
+                ~a1 & a2,
+                ~a2 & a1,
+                ~a1 & ~a2,
+            ],
+            [P1_WINS, P2_WINS, P2_WINS, P1_WINS, DRAW],
+            default=RUNNING,
+        )
+        self.winner = np.where(active, winner, self.winner).astype(np.int8)
+
+    def _cleanup_offscreen_items(self, active):
+        """
+        Drop obstacles below the trailing camera and apples past the
+        leading one, like GameState.cleanup_offscreen_items
+        """
+        # Cameras move less than a row a frame, so this clears a row now
+        # and then; rows stay cleared since snakes only climb
+        bottom = np.ceil(self.camera_y.max(axis=1) + 35).astype(np.int64)
+        while True:
+            due = np.flatnonzero(
+                active & (self.clear_from > bottom) & (self.clear_from > Y_MIN)
+            )
+            if due.size == 0:
+                break
+            self.clear_from[due] -= 1
+            self.obstacles[due, self.clear_from[due] - Y_MIN] = False
+
+        min_camera = self.camera_y.min(axis=1)
+        stale = (
+            active[:, None]
+            & (self.apple_kind != NO_APPLE)
+            & (self.apple_y <= min_camera[:, None] - 5)
+        )
+        self.apple_kind[stale] = NO_APPLE
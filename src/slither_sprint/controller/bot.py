@@ -0,0 +1,279 @@
+"""
+Bot - computer-controlled players with cached, time-budgeted path planning
+"""
+
+import time
+from config import BOT_BUDGET_MS, BOT_LOOKAHEAD
+
+# Path scores: surviving a row outweighs every apple a plan can reach
+ROW_VALUE = 1000
+APPLE_VALUE = 10
+GOLDEN_APPLE_VALUE = 30
+
+
+class PathPlanner:
+    """
+    Best reachable score from every cell in the rows ahead of one snake
+
+    Snakes always move up one row per step, and each step picks the
+    column change dx: steering sets dx to -1 or +1, and a snake that has
+    never been steered keeps dx = 0. A search over (x, y, dx) states is
+    then a walk through a DAG layered by row, solved exactly by one pass
+    from a horizon row down to the head. Once steered, dx = -1 and dx = +1
+    have the same successors, so each row keeps one table for snakes that
+    have turned and one for snakes that never have. A snake can never run
+    into its own body, which always trails below its head.
+
+    The horizon stays fixed while the snake climbs toward it, so rows that
+    were already solved stay valid. A row whose obstacles or apples change
+    invalidates only itself and the rows below it. Work is done a row at a
+    time against a deadline, so planning can be spread over frames.
+    """
+
+    def __init__(self, pane, lookahead: int = BOT_LOOKAHEAD):
+        self.pane = pane
+        self.lookahead = lookahead
+        self.width = pane.x1 - pane.x0 + 1
+        self.rows_solved = 0
+        self._world = None
+        self.clear()
+
+    def clear(self):
+        """Forget every solved row"""
+        self.horizon = None
+        self.solved_to = None  # rows horizon..solved_to are solved
+        self.turned = {}  # row -> scores of cells entered after turning
+        self.straight = {}  # row -> scores of cells entered never having turned
+        self.signatures = {}  # row -> (obstacle columns, apples) when solved
+
+    def _signature(self, game_state, y: int) -> tuple:
+        xs = self._obstacle_rows.get(y)
+        # By columns: a row can lose one obstacle and gain another
+        columns = frozenset(xs) if xs else frozenset()
+        apples = self._apple_rows.get(y)
+        if not apples:
+            return (columns, ())
+        return (columns, tuple(apples.items()))
+
+    def refresh(self, game_state, snake):
+        """
+        Drop solved rows the world has changed under
+
+        Args:
+            game_state: Current GameState
+            snake: The snake being planned for
+        """
+        obstacles = game_state.obstacles
+        world = (snake, obstacles, obstacles.generation)
+        if world != self._world:
+            # A new match, or a restored one
+            self._world = world
+            self.clear()
+        # Only this pane's rows, so other players' panes never invalidate it
+        self._obstacle_rows = obstacles.rows_in(self.pane).rows
+        self._apple_rows = game_state.apples.rows_in(self.pane).rows
+
+        target = snake.head[1] - 1
+        if self.horizon is None or target - self.horizon < self.lookahead // 2:
+            self.clear()
+            self.horizon = target - self.lookahead
+            self.solved_to = self.horizon - 1
+            return
+
+        # Rows behind the snake are no longer needed
+        for y in [y for y in self.turned if y > target]:
+            del self.turned[y], self.straight[y], self.signatures[y]
+        self.solved_to = min(self.solved_to, target)
+
+        for y in range(self.horizon, self.solved_to + 1):
+            if self.signatures[y] != self._signature(game_state, y):
+                self.solved_to = y - 1
+                break
+
+    def solved_for(self, snake) -> bool:
+        """Check if the rows the snake's next move needs are solved"""
+        return self.solved_to is not None and self.solved_to >= snake.head[1] - 1
+
+    def work(self, game_state, snake, deadline: float) -> bool:
+        """
+        Solve rows toward the snake's head until done or out of time
+
+        Args:
+            game_state: Current GameState
+            snake: The snake being planned for
+            deadline: time.perf_counter() value to stop at
+
+        Returns:
+            True if the plan reaches the head
+        """
+        target = snake.head[1] - 1
+        perf_counter = time.perf_counter
+        while self.solved_to < target:
+            if perf_counter() >= deadline:
+                return False
+            self._solve_row(game_state, self.solved_to + 1)
+        return True
+
+    def _solve_row(self, game_state, y: int):
+        """Score every cell of row y from the row above it"""
+        width = self.width
+        x0 = self.pane.x0
+        if y == self.horizon:
+            above_turned = above_straight = [0] * width
+        else:
+            above_turned = self.turned[y - 1]
+            above_straight = self.straight[y - 1]
+
+        # Best score available after entering each column of this row:
+        # turning moves one column left or right of it
+        padded = [0, *above_turned, 0]
+        best_turn = [max(padded[i], padded[i + 2]) for i in range(width)]
+
+        cell_values = [ROW_VALUE] * width
+        apples = self._apple_rows.get(y)
+        if apples:
+            for x, golden in apples.items():
+                bonus = GOLDEN_APPLE_VALUE if golden else APPLE_VALUE
+                cell_values[x - x0] += bonus
+        xs = self._obstacle_rows.get(y)
+        if xs:
+            for x in xs:
+                cell_values[x - x0] = 0
+
+        turned = []
+        straight = []
+        for i in range(width):
+            value = cell_values[i]
+            if value == 0:
+                turned.append(0)
+                straight.append(0)
+                continue
+            turned.append(value + best_turn[i])
+            straight.append(value + max(best_turn[i], above_straight[i]))
+
+        self.turned[y] = turned
+        self.straight[y] = straight
+        self.signatures[y] = self._signature(game_state, y)
+        self.solved_to = y
+        self.rows_solved += 1
+
+    def best_dx(self, snake) -> int:
+        """
+        Get the column change of the best next move
+
+        Ties keep the current direction, so bots only steer when it helps.
+        The plan must be solved_for() the snake.
+        """
+        hx, hy = snake.head
+        i = hx - self.pane.x0
+        turned = self.turned[hy - 1]
+        options = {}
+        for dx in (-1, 1):
+            if 0 <= i + dx < self.width:
+                options[dx] = turned[i + dx]
+            else:
+                options[dx] = 0
+        if snake.dx == 0:
+            options[0] = self.straight[hy - 1][i]
+        return max(options, key=lambda dx: (options[dx], dx == snake.dx))
+
+
+def steering_for(snake, dx: int) -> tuple:
+    """Turn a wanted column change into a (left, right) input"""
+    if dx == snake.dx or dx == 0:
+        return (False, False)
+    return (dx < 0, dx > 0)
+
+
+class Bot:
+    """
+    Steers one player's snake
+
+    Falls back to the safest single step when its plan has not caught up
+    with the snake yet.
+    """
+
+    def __init__(self, player: int, pane, lookahead: int = BOT_LOOKAHEAD):
+        self.player = player
+        self.planner = PathPlanner(pane, lookahead)
+        self.fallbacks = 0
+
+    def snake(self, game_state):
+        """Get the snake this bot steers"""
+        return game_state.snakes[self.player - 1]
+
+    def steering(self, game_state) -> tuple:
+        """
+        Pick this frame's input
+
+        Returns:
+            (left, right) tuple, as taken by Snake.steer
+        """
+        snake = self.snake(game_state)
+        if self.planner.solved_for(snake):
+            return steering_for(snake, self.planner.best_dx(snake))
+        self.fallbacks += 1
+        return steering_for(snake, self._safe_dx(game_state, snake))
+
+    def _safe_dx(self, game_state, snake) -> int:
+        """Keep going if the next cell is free, otherwise try the others"""
+        hx, hy = snake.head
+        options = [snake.dx] + [dx for dx in (-1, 1) if dx != snake.dx]
+        for dx in options:
+            x = hx + dx
+            if self.planner.pane.inside(x) and not game_state.obstacles.collides(
+                (x, hy - 1)
+            ):
+                return dx
+        return snake.dx
+
+
+class BotScheduler:
+    """
+    Shares a per-frame planning budget among bots
+
+    update() refreshes every plan, solves rows round-robin until the budget
+    or the frame deadline runs out, then applies each bot's steering
+    through GameEngine.set_steering. Bots whose plans are already solved
+    cost nothing, and the deadline is checked before every row, so a frame
+    overruns by at most one row (tens of microseconds).
+    """
+
+    def __init__(self, engine, bots, budget_ms: float = BOT_BUDGET_MS):
+        self.engine = engine
+        self.bots = list(bots)
+        self.budget_ms = budget_ms
+        self.planning_ms = 0.0  # time spent in the last update
+        self._next = 0
+
+    def update(self, deadline: float = None):
+        """
+        Plan and steer every bot for this frame
+
+        Args:
+            deadline: time.perf_counter() value planning must stop at,
+                on top of the budget
+        """
+        start = time.perf_counter()
+        stop = start + self.budget_ms / 1000
+        if deadline is not None:
+            stop = min(stop, deadline)
+
+        game_state = self.engine.game_state
+        bots = self.bots
+        for bot in bots:
+            bot.planner.refresh(game_state, bot.snake(game_state))
+
+        # Start with the bot after the last one served, so a tight budget
+        # does not always starve the same bot
+        count = len(bots)
+        pending = [bots[(self._next + i) % count] for i in range(count)]
+        while pending and time.perf_counter() < stop:
+            bot = pending.pop(0)
+            if not bot.planner.work(game_state, bot.snake(game_state), stop):
+                self._next = bots.index(bot)
+                break
+
+        for bot in bots:
+            self.engine.set_steering(bot.player, *bot.steering(game_state))
+        self.planning_ms = (time.perf_counter() - start) * 1000
@@ -0,0 +1,281 @@
+"""
+Game Engine - advances the game rules without a display or wall-clock
+"""
+
+from model.game_state import GameState
+from config import (
+    FPS,
+    GRID_H,
+    OBSTACLE_SPAWN_EVERY_STEPS,
+    OBSTACLE_SPAWN_CHANCE,
+    SPAWN_AHEAD_MIN,
+    SPAWN_AHEAD_MAX,
+    FINISH_LINE_DISTANCE,
+    CHUNKED_WORLD,
+    PLAYERS,
+    ENDLESS,
+    REBASE_ROWS,
+)
+
+FRAME_MS = 1000 // FPS
+
+
+class GameEngine:
+    """
+    Headless game simulation built around a GameState
+
+    Time only moves when tick() is called, and steering comes from
+    set_steering() instead of the keyboard, so matches can run without a
+    window and as fast as the CPU allows.
+    """
+
+    # Methods a FrameProfiler times, and the phase names it records
+    profiled_phases = {
+        "_update_game": "update",
+        "_update_snake_movement": "movement",
+        "_check_collisions": "collisions",
+        "_handle_apple_collection": "apple_pickup",
+        "_spawn_apples": "apple_spawn",
+        "_update_cameras": "cameras",
+        "_spawn_obstacles": "obstacle_spawn",
+        "_check_win_conditions": "win_check",
+        "_rebase_world": "rebase",
+    }
+
+    def __init__(
+        self,
+        game_state: GameState = None,
+        seed: int = None,
+        chunked: bool = CHUNKED_WORLD,
+        players: int = PLAYERS,
+        endless: bool = ENDLESS,
+    ):
+        if game_state is None:
+            game_state = GameState(seed, chunked, players=players, endless=endless)
+        self.game_state = game_state
+        players = len(game_state.snakes)
+
+        # Time owed to each snake's step timer
+        self.acc_ms = [0] * players
+
+        # Last (left, right) input given to each player
+        self.steering = [(False, False)] * players
+
+    @property
+    def is_over(self) -> bool:
+        """Check if the match has been decided"""
+        return self.game_state.winner_text is not None
+
+    def reset(self, seed: int = None):
+        """
+        Start a new match
+
+        Args:
+            seed: Reseed the match RNG first
+        """
+        self.game_state.reset(seed)
+        players = len(self.game_state.snakes)
+        self.acc_ms = [0] * players
+        self.steering = [(False, False)] * players
+
+    def snapshot(self) -> tuple:
+        """
+        Capture the match and the engine's step timers and steering
+
+        Returns:
+            Immutable tuple accepted by restore()
+        """
+        return (
+            self.game_state.snapshot(),
+            tuple(self.acc_ms),
+            tuple(self.steering),
+        )
+
+    def restore(self, state: tuple):
+        """
+        Return the engine to a state produced by snapshot()
+
+        Args:
+            state: Tuple returned by snapshot()
+        """
+        game_state, acc_ms, steering = state
+        self.game_state.restore(game_state)
+        self.acc_ms = list(acc_ms)
+        self.steering = list(steering)
+
+    def attach_profiler(self, profiler):
+        """
+        Time the simulation phases with a FrameProfiler
+
+        Args:
+            profiler: FrameProfiler to record into
+        """
+        profiler.attach(self, self.profiled_phases)
+        profiler.attach(self.game_state, self.game_state.profiled_phases)
+
+    def set_steering(self, player: int, left: bool, right: bool):
+        """
+        Steer a player's snake
+
+        Args:
+            player: Player number, from 1
+            left: True if steering left
+            right: True if steering right
+        """
+        self.steering[player - 1] = (bool(left), bool(right))
+        self.game_state.snakes[player - 1].steer(left, right)
+
+    def tick(self, dt: int = FRAME_MS):
+        """
+        Advance the simulation by one frame
+
+        Args:
+            dt: Frame duration in milliseconds
+        """
+        if self.game_state.winner_text is None:
+            self._update_game(dt)
+
+    def run_frames(self, frames: int, dt: int = FRAME_MS) -> int:
+        """
+        Advance the simulation by several frames, stopping early if the
+        match ends
+
+        Args:
+            frames: Maximum number of frames to simulate
+            dt: Frame duration in milliseconds
+
+        Returns:
+            Number of frames simulated
+        """
+        for i in range(frames):
+            if self.game_state.winner_text is not None:
+                return i
+            self._update_game(dt)
+        return frames
+
+    def _update_game(self, dt):
+        """Update game state"""
+        self.game_state.clock.advance(dt)
+
+        # Update power-ups
+        for snake in self.game_state.snakes:
+            snake.update_powerups()
+
+        # Update snakes with independent timers (for speed boost)
+        self._update_snake_movement(dt)
+
+        # Game logic
+        self._check_collisions()
+        self._handle_apple_collection()
+        self._spawn_apples()
+        self._update_cameras()
+        self._spawn_obstacles()
+        self._check_win_conditions()
+        self.game_state.cleanup_offscreen_items()
+        if self.game_state.endless:
+            self._rebase_world()
+
+    def _update_snake_movement(self, dt):
+        """Update snake positions based on their individual step timers"""
+        acc_ms = self.acc_ms
+        for i, snake in enumerate(self.game_state.snakes):
+            acc_ms[i] += dt
+            while acc_ms[i] >= snake.current_step_ms:
+                acc_ms[i] -= snake.current_step_ms
+                snake.step()
+
+    def _check_collisions(self):
+        """Check for obstacle collisions"""
+        blocks = self.game_state.obstacles.blocks
+        for snake in self.game_state.snakes:
+            if snake.alive and snake.head in blocks and not snake.is_invincible():
+                snake.alive = False
+
+    def _handle_apple_collection(self):
+        """Handle apple collection by snakes"""
+        apples = self.game_state.apples
+
+        for snake in self.game_state.snakes:
+            if not snake.alive:
+                continue
+            apple = apples.pop_at(snake.head)
+            if apple is None:
+                continue
+            if apple.is_golden:
+                snake.collect_golden_apple()
+            else:
+                snake.collect_apple()
+
+    def _spawn_apples(self):
+        """Spawn new apples randomly"""
+        if self.game_state.rng.random() < 0.08 and len(self.game_state.apples) < 50:
+            self.game_state.spawn_apple()
+
+    def _update_cameras(self):
+        """Update camera positions to follow snakes"""
+        cameras = self.game_state.cameras
+        for i, snake in enumerate(self.game_state.snakes):
+            target_camera = snake.head[1] - GRID_H * 0.75
+            cameras[i] += (target_camera - cameras[i]) * 0.2
+
+    def _spawn_obstacles(self):
+        """Spawn obstacles ahead of snakes"""
+        if self.game_state.world is not None:
+            self.game_state.update_world()
+            return
+        for snake in self.game_state.snakes:
+            self._spawn_obstacles_for_snake(snake)
+
+    def _spawn_obstacles_for_snake(self, snake):
+        """Spawn obstacles for a specific snake"""
+        if not snake.alive:
+            return
+
+        rng = self.game_state.rng
+        if (
+            snake.steps % OBSTACLE_SPAWN_EVERY_STEPS == 0
+            and rng.random() < OBSTACLE_SPAWN_CHANCE
+        ):
+            ahead = rng.randint(SPAWN_AHEAD_MIN, SPAWN_AHEAD_MAX)
+            hx, hy = snake.head
+            y = hy - ahead
+            span = rng.choice([1, 2, 3])
+            start_x = rng.randint(snake.pane.x0, snake.pane.x1 - (span - 1))
+
+            for i in range(span):
+                self.game_state.obstacles.add(start_x + i, y)
+
+    def _rebase_world(self):
+        """Move the world back down once the leader has climbed REBASE_ROWS"""
+        if min(self.game_state.cameras) < -REBASE_ROWS:
+            self.game_state.rebase(REBASE_ROWS)
+
+    def _check_win_conditions(self):
+        """Check if game has ended"""
+        snakes = self.game_state.snakes
+
+        # Check for finish line, lower player numbers winning ties; an
+        # endless race has none
+        if not self.game_state.endless:
+            for snake in snakes:
+                if snake.alive and snake.head[1] <= FINISH_LINE_DISTANCE:
+                    self.game_state.winner_text = (
+                        f"{snake.name} wins! Reached the finish line!"
+                    )
+                    return
+
+        # Check for crashes: the last snake standing wins
+        alive = [snake for snake in snakes if snake.alive]
+        if len(alive) == 1:
+            crashed = [snake.name for snake in snakes if not snake.alive]
+            if len(crashed) == 1:
+                self.game_state.winner_text = (
+                    f"{alive[0].name} wins! {crashed[0]} crashed!"
+                )
+            else:
+                self.game_state.winner_text = (
+                    f"{alive[0].name} wins! Everyone else crashed!"
+                )
+        elif not alive:
+            everyone = "Both" if len(snakes) == 2 else "All"
+            self.game_state.winner_text = f"Draw! {everyone} crashed!"
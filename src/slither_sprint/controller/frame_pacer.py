@@ -0,0 +1,168 @@
+"""
+Frame Pacer - fixed simulation ticks with a separate, load-shedding render rate
+"""
+
+from config import FIXED_STEP_MS, MAX_TICKS_PER_FRAME, RENDER_FPS, MAX_FRAME_SKIP
+
+# Weight of the newest render time in the running render cost estimate
+RENDER_COST_WEIGHT = 0.2
+
+
+class FramePacer:
+    """
+    Decides when to tick the simulation and when to draw
+
+    Ticks always run FIXED_STEP_MS apart in simulated time and are owed
+    for all the wall-clock time that passed. Frames are due render_fps
+    times a second. A due frame is put off while drawing it is expected
+    to take longer than the time left before the next tick, so a slow
+    renderer costs frames instead of making the simulation late; after
+    max_skip put-off attempts in a row it is drawn anyway, so the screen
+    still updates when every frame is too slow. A frame slot that passes
+    without a frame being drawn in it counts as dropped.
+
+    All times are time.perf_counter() seconds.
+    """
+
+    def __init__(
+        self,
+        step_ms: int = FIXED_STEP_MS,
+        render_fps: float = RENDER_FPS,
+        max_skip: int = MAX_FRAME_SKIP,
+        max_ticks: int = MAX_TICKS_PER_FRAME,
+    ):
+        self.step = step_ms / 1000
+        self.frame_period = 1 / render_fps
+        self.max_skip = max_skip
+        self.max_ticks = max_ticks
+
+        self.lag = 0.0  # wall-clock time the simulation owes ticks for
+        self.render_cost = 0.0  # running estimate of one render, seconds
+        self.skipped = 0  # times the due frame was put off in a row
+        self._last = None
+        self._next_frame = None  # start of the next frame slot
+
+        self.ticks = 0
+        self.late_ticks = 0  # ticks given up because even ticking fell behind
+        self.frames = 0
+        self.dropped = 0
+        self._started = None
+        self._ended = None
+
+    def alpha(self, now: float) -> float:
+        """How far the wall clock is past the last tick, in ticks (0 to 1)"""
+        return min((self.lag + now - self._last) / self.step, 1.0)
+
+    def ticks_due(self, now: float) -> int:
+        """
+        Count the ticks owed since the last call and take them off the lag
+
+        More than max_ticks owed means the simulation itself cannot keep
+        up; the rest are given up (and counted in late_ticks) so the game
+        slows down instead of spiralling.
+
+        Args:
+            now: Current time
+
+        Returns:
+            Number of ticks to run now
+        """
+        if self._last is None:
+            self._started = self._last = self._next_frame = now
+        self.lag += now - self._last
+        self._last = self._ended = now
+
+        ticks = int(self.lag // self.step)
+        if ticks > self.max_ticks:
+            self.late_ticks += ticks - self.max_ticks
+            ticks = self.max_ticks
+            self.lag = 0.0
+        else:
+            self.lag -= ticks * self.step
+        self.ticks += ticks
+        return ticks
+
+    def should_render(self, now: float) -> bool:
+        """
+        Decide whether to draw a frame now
+
+        Args:
+            now: Current time, after this iteration's ticks have run
+
+        Returns:
+            True to draw; report the draw with rendered() afterwards
+        """
+        if now < self._next_frame:
+            return False
+        # Time before the next tick is owed, measured from now
+        until_tick = self.step - self.lag - (now - self._last)
+        if self.render_cost > until_tick and self.skipped < self.max_skip:
+            # Try again once the tick has run
+            self.skipped += 1
+            return False
+        return True
+
+    def rendered(self, start: float, end: float):
+        """
+        Record a drawn frame
+
+        Args:
+            start: Time the render started
+            end: Time the render finished
+        """
+        self.frames += 1
+        self.skipped = 0
+        cost = end - start
+        if self.frames == 1:
+            self.render_cost = cost
+        else:
+            self.render_cost += (cost - self.render_cost) * RENDER_COST_WEIGHT
+
+        # Whole slots that went by since this frame was due were dropped;
+        # the next frame is due at the start of the following slot
+        missed = int((start - self._next_frame) // self.frame_period)
+        self.dropped += missed
+        self._next_frame += (missed + 1) * self.frame_period
+        self._ended = end
+
+    def wait_time(self, now: float) -> float:
+        """
+        Seconds until a tick or frame is next due
+
+        Returns:
+            Time the loop can sleep for, 0 if something is due now
+        """
+        until_tick = self.step - self.lag - (now - self._last)
+        if self.skipped:
+            # The due frame waits for the tick
+            return max(0.0, until_tick)
+        return max(0.0, min(until_tick, self._next_frame - now))
+
+    def as_dict(self) -> dict:
+        """
+        Counters since the first call
+
+        Returns:
+            Dict of ticks, late_ticks, frames, dropped_frames, seconds,
+            fps and dropped_pct
+        """
+        seconds = (self._ended - self._started) if self._started is not None else 0.0
+        offered = self.frames + self.dropped
+        return {
+            "ticks": self.ticks,
+            "late_ticks": self.late_ticks,
+            "frames": self.frames,
+            "dropped_frames": self.dropped,
+            "seconds": seconds,
+            "fps": self.frames / seconds if seconds else 0.0,
+            "dropped_pct": 100 * self.dropped / offered if offered else 0.0,
+        }
+
+    def report(self) -> str:
+        """One line summary of the counters"""
+        s = self.as_dict()
+        return (
+            f"Drew {s['frames']} frames in {s['seconds']:.1f}s ({s['fps']:.0f} fps),"
+            f" dropped {s['dropped_frames']} ({s['dropped_pct']:.1f}%);"
+            f" ran {s['ticks']} ticks, {s['late_ticks']} late ticks given up"
+        )
@@ -2,54 +2,277 @@
 Game Controller - manages game loop and logic
 """
 
-import pygame
 import random
-from model.game_state import GameState
+import time
+import pygame
+from controller.engine import GameEngine
+from controller.startup import TIMER
 from view.renderer import Renderer
+from view.strip_renderer import StripRenderer
 from config import (
     WIDTH,
     HEIGHT,
     FPS,
-    GRID_H,
-    OBSTACLE_SPAWN_EVERY_STEPS,
-    OBSTACLE_SPAWN_CHANCE,
-    SPAWN_AHEAD_MIN,
-    SPAWN_AHEAD_MAX,
-    FINISH_LINE_DISTANCE,
+    FIXED_STEP_MS,
+    MAX_TICKS_PER_FRAME,
+    RENDER_MODE,
+    CHUNKED_WORLD,
+    PLAYERS,
+    PLAYER_KEYS,
+    INTERPOLATE,
+    ENDLESS,
 )
 
+RENDERERS = {
+    "full": Renderer,
+    "strip": StripRenderer,
+}
 
-class GameController:
+
+class GameController(GameEngine):
     """Controls game flow and updates"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        render_mode: str = RENDER_MODE,
+        seed: int = None,
+        record_path=None,
+        chunked: bool = CHUNKED_WORLD,
+        profile_path=None,
+        bots=(),
+        startup_report: bool = False,
+        players: int = PLAYERS,
+        interpolate: bool = INTERPOLATE,
+        endless: bool = ENDLESS,
+    ):
+        """
+        Args:
+            render_mode: Key of RENDERERS to draw with
+            seed: If given, run deterministically: the match RNG is seeded
+                and the simulation advances in FIXED_STEP_MS ticks no
+                matter how long each frame took
+            record_path: If given, record a replay there; implies
+                deterministic mode, with a random seed if none was given
+            chunked: Generate obstacles from a seeded chunked world
+            profile_path: If given, profile every frame and write the
+                trace there on exit (.csv or .json)
+            bots: Player numbers steered by the computer
+            startup_report: Quit once the first frame is on screen
+            players: Number of players, each steered with its PLAYER_KEYS
+            interpolate: Tick the simulation in FIXED_STEP_MS steps and draw
+                up to RENDER_FPS frames a second in between, with snakes and
+                cameras interpolated and frames dropped under load
+            endless: Race without a finish line until one snake is left
+        """
+        if record_path is not None and seed is None:
+            seed = random.randrange(2**32)
+
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("Slither Sprint")
         self.clock = pygame.time.Clock()
-
-        self.game_state = GameState()
-        self.renderer = Renderer(self.screen)
-
-        self.acc_ms_p1 = 0
-        self.acc_ms_p2 = 0
+        TIMER.mark("window")
+
+        super().__init__(seed=seed, chunked=chunked, players=players, endless=endless)
+        self.renderer = RENDERERS[render_mode](self.screen)
+        TIMER.mark("game setup")
+        self.startup_report = startup_report
+        self.frames = 0
+
+        self.fixed_step = seed is not None or interpolate
+        self.lag_ms = 0
+        self.pacer = None
+        self.interpolator = None
+        if interpolate:
+            from controller.frame_pacer import FramePacer
+            from view.interpolation import TickInterpolator
+
+            self.pacer = FramePacer()
+            self.interpolator = TickInterpolator(FIXED_STEP_MS)
+        self.recorder = None
+        if record_path is not None:
+            from controller.replay import ReplayRecorder
+
+            self.recorder = ReplayRecorder(record_path, players)
+
+        self.bots = None
+        self.bot_players = tuple(bots)
+        if bots:
+            from controller.bot import Bot, BotScheduler
+
+            panes = self.game_state.panes
+            self.bots = BotScheduler(self, [Bot(p, panes[p - 1]) for p in bots])
+        # (player, left key, right key) of every player at the keyboard
+        self.key_players = [
+            (player, pygame.key.key_code(left), pygame.key.key_code(right))
+            for player, (left, right) in enumerate(PLAYER_KEYS[:players], start=1)
+            if player not in self.bot_players
+        ]
+        # Frame time taken by everything but bot planning, last frame
+        self._other_work_s = 0.0
+
+        self.profiler = None
+        self.profile_path = profile_path
+        if profile_path is not None:
+            self._start_profiler()
 
     def run(self):
         """Main game loop"""
+        try:
+            if self.pacer is not None:
+                self._loop_interpolated()
+            else:
+                self._loop()
+        finally:
+            if self.recorder is not None:
+                self.recorder.close()
+            if self.profiler is not None and self.profile_path is not None:
+                extra = {"text_cache": self.renderer.text.stats()}
+                if self.pacer is not None:
+                    extra["pacing"] = self.pacer.as_dict()
+                self.profiler.export(self.profile_path, extra)
+            if self.pacer is not None:
+                print(self.pacer.report())
+
+    def _loop(self):
         running = True
         while running:
-            dt = self.clock.tick(FPS)
+            # Nothing to pace against yet on the first frame; waiting out a
+            # whole frame period would only delay the first picture
+            dt = self.clock.tick(FPS) if self.frames else self.clock.tick()
+            frame_start = time.perf_counter()
+            profiler = self.profiler
+            if profiler is not None:
+                profiler.begin_frame()
 
             # Handle events
             if not self._handle_events():
                 running = False
                 continue
 
+            if self.bots is not None:
+                self._plan_bots(frame_start)
+
             # Update game
-            if self.game_state.winner_text is None:
-                self._update_game(dt)
+            if self.fixed_step:
+                self._run_fixed_ticks(dt)
+            else:
+                self.tick(dt)
 
             # Render
             self.renderer.render(self.game_state)
+            if profiler is not None:
+                profiler.end_frame(self.game_state)
+            if self.bots is not None:
+                self._other_work_s = (
+                    time.perf_counter() - frame_start - self.bots.planning_ms / 1000
+                )
+
+            self.frames += 1
+            if self.frames == 1:
+                TIMER.mark("first frame")
+                if self.startup_report:
+                    running = False
+
+    def _loop_interpolated(self):
+        """
+        Main loop with the simulation and drawing on separate clocks
+
+        Input is read on every pass, ticks run whenever they are owed, and
+        frames are drawn between them as the FramePacer allows. Passes
+        that neither tick nor draw sleep until the next one is due.
+        """
+        pacer = self.pacer
+        interpolator = self.interpolator
+        step = FIXED_STEP_MS
+        while True:
+            frame_start = time.perf_counter()
+            profiler = self.profiler
+            if profiler is not None:
+                profiler.begin_frame()
+
+            if not self._handle_events():
+                break
+
+            ticks = pacer.ticks_due(frame_start)
+            if ticks and self.bots is not None:
+                self._plan_bots(frame_start)
+            for _ in range(ticks):
+                interpolator.capture(self.game_state)
+                if self.recorder is not None:
+                    self.recorder.record(self)
+                self.tick(step)
+
+            now = time.perf_counter()
+            drew = pacer.should_render(now)
+            if drew:
+                self.renderer.render(
+                    interpolator.view(self.game_state, pacer.alpha(now), self.acc_ms)
+                )
+                pacer.rendered(now, time.perf_counter())
+            if profiler is not None and (ticks or drew):
+                profiler.end_frame(self.game_state)
+            if self.bots is not None and ticks:
+                self._other_work_s = (
+                    time.perf_counter() - frame_start - self.bots.planning_ms / 1000
+                )
+
+            if drew:
+                self.frames += 1
+                if self.frames == 1:
+                    TIMER.mark("first frame")
+                    if self.startup_report:
+                        break
+            time.sleep(pacer.wait_time(time.perf_counter()))
+
+    def _start_profiler(self):
+        """Time every update phase and draw pass from now on"""
+        from controller.profiler import FrameProfiler
+
+        self.profiler = FrameProfiler()
+        self.attach_profiler(self.profiler)
+        self.profiler.attach(self.renderer, self.renderer.profiled_passes)
+        self.profiler.attach(self, {"_handle_events": "events"})
+        if self.bots is not None:
+            self.profiler.attach(self, {"_plan_bots": "bots"})
+
+    def _toggle_overlay(self):
+        """Show or hide the profiler overlay, profiling only while needed"""
+        from view.profiler_overlay import ProfilerOverlay
+
+        renderer = self.renderer
+        if renderer.overlay is None:
+            if self.profiler is None:
+                self._start_profiler()
+            renderer.overlay = ProfilerOverlay(
+                self.profiler, renderer.font, renderer.text, self.pacer
+            )
+        else:
+            renderer.overlay = None
+            if self.profile_path is None:
+                self.profiler.detach()
+                self.profiler = None
+
+    def _plan_bots(self, frame_start: float):
+        """Plan bot moves in whatever time the frame has left"""
+        # Leave room for the ticks and drawing, assuming they take as long
+        # as they did last frame
+        deadline = frame_start + 1 / FPS - self._other_work_s
+        self.bots.update(deadline)
+
+    def _run_fixed_ticks(self, dt):
+        """Run as many fixed-length ticks as the elapsed time covers"""
+        self.lag_ms += dt
+        ticks = 0
+        while self.lag_ms >= FIXED_STEP_MS:
+            if ticks == MAX_TICKS_PER_FRAME:
+                # Too far behind to catch up; slow the game down instead
+                self.lag_ms = 0
+                break
+            self.lag_ms -= FIXED_STEP_MS
+            if self.recorder is not None:
+                self.recorder.record(self)
+            self.tick(FIXED_STEP_MS)
+            ticks += 1
 
     def _handle_events(self):
         """
@@ -64,142 +287,16 @@ class GameController:
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     return False
+                if event.key == pygame.K_F3:
+                    self._toggle_overlay()
                 if event.key == pygame.K_r:
-                    self.game_state.reset()
-                    self.acc_ms_p1 = 0
-                    self.acc_ms_p2 = 0
+                    self.reset()
+                    if self.recorder is not None:
+                        self.recorder.mark_restart()
 
         # Handle continuous key presses for steering
         keys = pygame.key.get_pressed()
-        self.game_state.snake1.steer(keys[pygame.K_a], keys[pygame.K_d])
-        self.game_state.snake2.steer(keys[pygame.K_LEFT], keys[pygame.K_RIGHT])
+        for player, left, right in self.key_players:
+            self.set_steering(player, keys[left], keys[right])
 
         return True
-
-    def _update_game(self, dt):
-        """Update game state"""
-        # Update power-ups
-        self.game_state.snake1.update_powerups()
-        self.game_state.snake2.update_powerups()
-
-        # Update snakes with independent timers (for speed boost)
-        self._update_snake_movement(dt)
-
-        # Game logic
-        self._check_collisions()
-        self._handle_apple_collection()
-        self._spawn_apples()
-        self._update_cameras()
-        self._spawn_obstacles()
-        self._check_win_conditions()
-        self.game_state.cleanup_offscreen_items()
-
-    def _update_snake_movement(self, dt):
-        """Update snake positions based on their individual step timers"""
-        self.acc_ms_p1 += dt
-        self.acc_ms_p2 += dt
-
-        while self.acc_ms_p1 >= self.game_state.snake1.current_step_ms:
-            self.acc_ms_p1 -= self.game_state.snake1.current_step_ms
-            self.game_state.snake1.step()
-
-        while self.acc_ms_p2 >= self.game_state.snake2.current_step_ms:
-            self.acc_ms_p2 -= self.game_state.snake2.current_step_ms
-            self.game_state.snake2.step()
-
-    def _check_collisions(self):
-        """Check for obstacle collisions"""
-        s1 = self.game_state.snake1
-        s2 = self.game_state.snake2
-        obs = self.game_state.obstacles
-
-        if s1.alive and not s1.is_invincible():
-            if obs.collides(s1.head):
-                s1.alive = False
-
-        if s2.alive and not s2.is_invincible():
-            if obs.collides(s2.head):
-                s2.alive = False
-
-    def _handle_apple_collection(self):
-        """Handle apple collection by snakes"""
-        s1 = self.game_state.snake1
-        s2 = self.game_state.snake2
-        apples_to_remove = []
-
-        for apple in self.game_state.apples:
-            if s1.alive and s1.head == apple.position:
-                if apple.is_golden:
-                    s1.collect_golden_apple()
-                else:
-                    s1.collect_apple()
-                apples_to_remove.append(apple)
-            elif s2.alive and s2.head == apple.position:
-                if apple.is_golden:
-                    s2.collect_golden_apple()
-                else:
-                    s2.collect_apple()
-                apples_to_remove.append(apple)
-
-        for apple in apples_to_remove:
-            self.game_state.apples.remove(apple)
-
-    def _spawn_apples(self):
-        """Spawn new apples randomly"""
-        if random.random() < 0.08 and len(self.game_state.apples) < 50:
-            self.game_state.spawn_apple()
-
-    def _update_cameras(self):
-        """Update camera positions to follow snakes"""
-        # Player 1 camera
-        target_camera_p1 = self.game_state.snake1.head[1] - GRID_H * 0.75
-        self.game_state.camera_y_p1 += (
-            target_camera_p1 - self.game_state.camera_y_p1
-        ) * 0.2
-
-        # Player 2 camera
-        target_camera_p2 = self.game_state.snake2.head[1] - GRID_H * 0.75
-        self.game_state.camera_y_p2 += (
-            target_camera_p2 - self.game_state.camera_y_p2
-        ) * 0.2
-
-    def _spawn_obstacles(self):
-        """Spawn obstacles ahead of snakes"""
-        self._spawn_obstacles_for_snake(self.game_state.snake1)
-        self._spawn_obstacles_for_snake(self.game_state.snake2)
-
-    def _spawn_obstacles_for_snake(self, snake):
-        """Spawn obstacles for a specific snake"""
-        if not snake.alive:
-            return
-
-        if (
-            snake.steps % OBSTACLE_SPAWN_EVERY_STEPS == 0
-            and random.random() < OBSTACLE_SPAWN_CHANCE
-        ):
-            ahead = random.randint(SPAWN_AHEAD_MIN, SPAWN_AHEAD_MAX)
-            hx, hy = snake.head
-            y = hy - ahead
-            span = random.choice([1, 2, 3])
-            start_x = random.randint(snake.pane.x0, snake.pane.x1 - (span - 1))
-
-            for i in range(span):
-                self.game_state.obstacles.add(start_x + i, y)
-
-    def _check_win_conditions(self):
-        """Check if game has ended"""
-        s1 = self.game_state.snake1
-        s2 = self.game_state.snake2
-
-        # Check for finish line
-        if s1.alive and s1.head[1] <= FINISH_LINE_DISTANCE:
-            self.game_state.winner_text = f"{s1.name} wins! Reached the finish line!"
-        elif s2.alive and s2.head[1] <= FINISH_LINE_DISTANCE:
-            self.game_state.winner_text = f"{s2.name} wins! Reached the finish line!"
-        # Check for crashes
-        elif not s1.alive and s2.alive:
-            self.game_state.winner_text = f"{s2.name} wins! {s1.name} crashed!"
-        elif not s2.alive and s1.alive:
-            self.game_state.winner_text = f"{s1.name} wins! {s2.name} crashed!"
-        elif not s1.alive and not s2.alive:
-            self.game_state.winner_text = "Draw! Both crashed!"
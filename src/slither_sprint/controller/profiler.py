@@ -0,0 +1,185 @@
+"""
+Frame Profiler - per-phase frame timings with rolling percentiles and export
+"""
+
+import csv
+import json
+import math
+import time
+from collections import deque
+from config import PROFILE_WINDOW, PROFILE_TRACE_FRAMES
+
+
+def percentile(sorted_values, p: float) -> float:
+    """
+    Nearest-rank percentile
+
+    Args:
+        sorted_values: Samples in ascending order
+        p: Percentile, 0 to 100
+
+    Returns:
+        The sample at that rank, or 0.0 if there are none
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+class FrameProfiler:
+    """
+    Times named phases of each frame
+
+    attach() replaces methods of an object with timed wrappers stored on
+    that instance, and detach() deletes them again, so code that is not
+    being profiled runs exactly as it would without a profiler. Times of a
+    phase that runs several times in a frame (once per pane, or once per
+    fixed tick) are added up. Phases nest: "update" includes "movement".
+
+    Every value is in milliseconds except the entity counts. The last
+    window frames of each column feed the percentiles; up to trace_frames
+    frames are kept for export.
+    """
+
+    def __init__(
+        self, window: int = PROFILE_WINDOW, trace_frames: int = PROFILE_TRACE_FRAMES
+    ):
+        self.window = window
+        self.columns = ["frame"]  # in order of first appearance
+        self.samples = {"frame": deque(maxlen=window)}
+        self.trace = deque(maxlen=trace_frames)
+        self.frames = 0
+        self._frame = {}
+        self._start = None
+        self._attached = []
+
+    def attach(self, obj, phases: dict):
+        """
+        Start timing methods of an object
+
+        Args:
+            obj: Instance whose methods are timed
+            phases: Mapping of method name to the phase name to record
+        """
+        for attr, name in phases.items():
+            if attr in vars(obj):
+                continue  # already wrapped
+            setattr(obj, attr, self._timed(name, getattr(obj, attr)))
+            self._attached.append((obj, attr))
+            if name not in self.samples:
+                self.columns.append(name)
+                self.samples[name] = deque(maxlen=self.window)
+
+    def detach(self):
+        """Remove every timed wrapper"""
+        for obj, attr in self._attached:
+            vars(obj).pop(attr, None)
+        self._attached = []
+
+    def _timed(self, name: str, method):
+        perf_counter = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                frame = self._frame
+                frame[name] = frame.get(name, 0.0) + (perf_counter() - start) * 1000
+
+        return timed
+
+    def begin_frame(self):
+        """Mark the start of a frame's work"""
+        self._frame = {}
+        self._start = time.perf_counter()
+
+    def end_frame(self, game_state=None):
+        """
+        Close the current frame and record its phase times
+
+        Args:
+            game_state: If given, entity counts are recorded too
+        """
+        if self._start is None:
+            return
+        row = self._frame
+        row["frame"] = (time.perf_counter() - self._start) * 1000
+        if game_state is not None:
+            row["obstacles"] = len(game_state.obstacles.blocks)
+            row["apples"] = len(game_state.apples)
+            row["segments"] = sum(len(snake.body) for snake in game_state.snakes)
+
+        for name, value in row.items():
+            if name not in self.samples:
+                self.columns.append(name)
+                self.samples[name] = deque(maxlen=self.window)
+        # Phases that did not run this frame took no time
+        for name in self.columns:
+            self.samples[name].append(row.setdefault(name, 0.0))
+
+        self.trace.append(row)
+        self.frames += 1
+        self._start = None
+
+    def stats(self, name: str) -> dict:
+        """
+        Rolling statistics of one column
+
+        Returns:
+            Dict with mean, p50, p95, p99 and max over the window
+        """
+        values = sorted(self.samples.get(name, ()))
+        return {
+            "mean": sum(values) / len(values) if values else 0.0,
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+            "max": values[-1] if values else 0.0,
+        }
+
+    def summary(self) -> dict:
+        """Rolling statistics of every column"""
+        return {name: self.stats(name) for name in self.columns}
+
+    def export(self, path, extra: dict = None):
+        """
+        Write the trace to a file
+
+        A path ending in .csv gets one row per frame; anything else gets
+        JSON with the rolling summary and every frame.
+
+        Args:
+            path: File to write
+            extra: Additional summary data for the JSON export
+        """
+        path = str(path)
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=self.columns, restval=0.0)
+                writer.writeheader()
+                writer.writerows(self.trace)
+            return
+
+        data = {
+            "frames": self.frames,
+            "summary": self.summary(),
+            "trace": [
+                [row.get(name, 0.0) for name in self.columns] for row in self.trace
+            ],
+            "columns": self.columns,
+        }
+        if extra:
+            data.update(extra)
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+    def format_table(self) -> str:
+        """Rolling statistics as a fixed-width text table"""
+        lines = [f"{'phase':<16}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"]
+        for name, s in self.summary().items():
+            lines.append(
+                f"{name:<16}{s['p50']:9.3f}{s['p95']:9.3f}{s['p99']:9.3f}{s['max']:9.3f}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,70 @@
+"""
+Remote Controller - window for playing a match hosted by a MatchServer
+"""
+
+import asyncio
+import pygame
+from net.client import MatchClient
+from controller.game_controller import RENDERERS
+from config import WIDTH, HEIGHT, FPS, RENDER_MODE
+
+
+class RemoteController:
+    """Sends this player's keys to the server and draws its mirrored state"""
+
+    def __init__(self, host: str, port: int, room: str = "", render_mode=RENDER_MODE):
+        self.host = host
+        self.port = port
+        self.room = room
+        self.client = MatchClient()
+        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption("Slither Sprint - Online")
+        self.renderer = RENDERERS[render_mode](self.screen)
+
+    def run(self):
+        """Main loop; returns when the window closes or the server leaves"""
+        asyncio.run(self._loop())
+        if self.client.error:
+            print(f"Disconnected: {self.client.error}")
+
+    async def _loop(self):
+        client = self.client
+        await client.connect(self.host, self.port, self.room)
+        pygame.display.set_caption(f"Slither Sprint - Online (P{client.player})")
+        receiving = asyncio.create_task(client.receive())
+        loop = asyncio.get_running_loop()
+        frame_s = 1 / FPS
+        try:
+            while not receiving.done():
+                start = loop.time()
+                if not self._handle_events():
+                    break
+                self.renderer.render(client.game_state)
+                await asyncio.sleep(max(0, frame_s - (loop.time() - start)))
+        finally:
+            receiving.cancel()
+            await client.close()
+
+    def _handle_events(self):
+        """
+        Handle pygame events
+
+        Returns:
+            False if should quit, True otherwise
+        """
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    return False
+                if event.key == pygame.K_r:
+                    self.client.request_restart()
+
+        # Either set of keys steers this client's snake
+        keys = pygame.key.get_pressed()
+        self.client.send_steering(
+            keys[pygame.K_a] or keys[pygame.K_LEFT],
+            keys[pygame.K_d] or keys[pygame.K_RIGHT],
+        )
+        return True
@@ -0,0 +1,361 @@
+"""
+Replays - compact binary match recordings with keyframes and fast seeking
+
+File layout (all integers little-endian):
+
+    header:  b"SSRP", version u8, players u8, step_ms u16, keyframe_every u32
+    blocks:  tag u8, length u32, payload
+
+    b"K" keyframe:  tick u64, zlib-compressed JSON of GameEngine.snapshot()
+    b"I" inputs:    start tick u64, tick count u32, bit-packed steering
+
+Steering is packed 2 bits per player per tick (0 none, 1 left, 2 right).
+A keyframe is written every keyframe_every ticks and after a restart, and
+the pending input block is always flushed right before it, so every input
+block starts at or after the keyframe that precedes it.
+
+Keyframes hold only JSON arrays, numbers, strings, booleans and null, so
+opening a replay from someone else cannot run code the way unpickling
+it could.
+"""
+
+import json
+import struct
+import zlib
+from bisect import bisect_right
+from controller.engine import GameEngine
+from model.power_up import PowerUpType
+from config import FIXED_STEP_MS
+
+MAGIC = b"SSRP"
+VERSION = 6
+HEADER = struct.Struct("<4sBBHI")
+BLOCK = struct.Struct("<cI")
+KEYFRAME_TICK = struct.Struct("<Q")
+INPUT_SPAN = struct.Struct("<QI")
+
+KEYFRAME = b"K"
+INPUTS = b"I"
+
+NO_STEER = 0
+STEER_LEFT = 1
+STEER_RIGHT = 2
+
+KEYFRAME_EVERY = 300  # ticks, 10 seconds at 30 ticks per second
+
+
+class ReplayError(Exception):
+    """Raised when a replay file cannot be read"""
+
+
+def encode_steering(left: bool, right: bool) -> int:
+    """Turn a (left, right) input into a 2-bit code, left winning ties"""
+    if left:
+        return STEER_LEFT
+    if right:
+        return STEER_RIGHT
+    return NO_STEER
+
+
+def decode_steering(code: int) -> tuple:
+    """Turn a 2-bit code back into a (left, right) input"""
+    return (code == STEER_LEFT, code == STEER_RIGHT)
+
+
+def pack_inputs(codes: list, players: int) -> bytes:
+    """Pack per-tick lists of player codes into a little-endian bitstream"""
+    value = 0
+    shift = 0
+    for tick_codes in codes:
+        for code in tick_codes:
+            value |= code << shift
+            shift += 2
+    return value.to_bytes((shift + 7) // 8, "little")
+
+
+def unpack_inputs(data: bytes, count: int, players: int) -> list:
+    """Inverse of pack_inputs"""
+    value = int.from_bytes(data, "little")
+    ticks = []
+    for _ in range(count):
+        tick_codes = []
+        for _ in range(players):
+            tick_codes.append(value & 3)
+            value >>= 2
+        ticks.append(tuple(tick_codes))
+    return ticks
+
+
+def _plain(value):
+    """JSON form of the one non-plain value a snapshot holds"""
+    if isinstance(value, PowerUpType):
+        return value.value
+    raise TypeError(f"cannot store {type(value).__name__} in a keyframe")
+
+
+def _tuples(value):
+    """Turn the JSON arrays of a keyframe back into snapshot tuples"""
+    if isinstance(value, list):
+        return tuple(_tuples(item) for item in value)
+    if isinstance(value, dict):
+        raise ReplayError("keyframe holds an object")
+    return value
+
+
+def capture_state(engine: GameEngine) -> bytes:
+    """Serialize everything the simulation needs to continue from here"""
+    state = engine.snapshot()
+    return zlib.compress(json.dumps(state, default=_plain).encode())
+
+
+def restore_state(engine: GameEngine, payload: bytes):
+    """
+    Load a state produced by capture_state into an engine
+
+    Raises:
+        ReplayError: If the keyframe is not a valid engine state
+    """
+    try:
+        state = _tuples(json.loads(zlib.decompress(payload)))
+        engine.restore(state)
+    except (
+        zlib.error,
+        ValueError,
+        TypeError,
+        IndexError,
+        KeyError,
+        RecursionError,
+    ) as e:
+        raise ReplayError(f"bad keyframe: {e}") from e
+
+
+class ReplayRecorder:
+    """
+    Writes the steering of every simulation tick to a replay file
+
+    Call record() once per fixed tick, before the engine ticks, and
+    mark_restart() whenever the match is reset outside of a tick.
+    """
+
+    def __init__(
+        self,
+        path,
+        players: int = 2,
+        step_ms: int = FIXED_STEP_MS,
+        keyframe_every: int = KEYFRAME_EVERY,
+    ):
+        self.players = players
+        self.keyframe_every = keyframe_every
+        self.tick = 0
+        self._pending = []
+        self._pending_start = 0
+        self._needs_keyframe = True
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, players, step_ms, keyframe_every))
+
+    def mark_restart(self):
+        """Force a keyframe before the next recorded tick"""
+        self._needs_keyframe = True
+
+    def record(self, engine: GameEngine):
+        """
+        Record the steering about to be applied for the next tick
+
+        Args:
+            engine: Engine whose state and steering are recorded
+        """
+        if self._needs_keyframe or self.tick % self.keyframe_every == 0:
+            self._flush_inputs()
+            payload = KEYFRAME_TICK.pack(self.tick) + capture_state(engine)
+            self._write_block(KEYFRAME, payload)
+            self._needs_keyframe = False
+
+        if not self._pending:
+            self._pending_start = self.tick
+        self._pending.append(
+            tuple(encode_steering(*steer) for steer in engine.steering[: self.players])
+        )
+        self.tick += 1
+
+    def close(self):
+        """Flush buffered input and close the file"""
+        if self._file.closed:
+            return
+        self._flush_inputs()
+        self._file.close()
+
+    def _flush_inputs(self):
+        if not self._pending:
+            return
+        payload = INPUT_SPAN.pack(self._pending_start, len(self._pending))
+        payload += pack_inputs(self._pending, self.players)
+        self._write_block(INPUTS, payload)
+        self._pending = []
+
+    def _write_block(self, tag: bytes, payload: bytes):
+        self._file.write(BLOCK.pack(tag, len(payload)))
+        self._file.write(payload)
+
+
+class ReplayReader:
+    """
+    Random access to a replay file without loading it into memory
+
+    Opening the file only reads block headers to build an index of
+    keyframe and input block offsets; payloads are read on demand.
+    A file cut short by a crash is read up to its last complete block.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        header = self._file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ReplayError("replay file is truncated")
+        magic, version, players, step_ms, keyframe_every = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ReplayError("not a Slither Sprint replay")
+        if version != VERSION:
+            raise ReplayError(f"unsupported replay version {version}")
+
+        self.players = players
+        self.step_ms = step_ms
+        self.keyframe_every = keyframe_every
+        self.keyframes = []  # (tick, offset, length)
+        self.input_blocks = []  # (start_tick, count, offset, length)
+        self.length = 0  # ticks with recorded input
+        self._index()
+
+    def _index(self):
+        f = self._file
+        f.seek(0, 2)
+        size = f.tell()
+        f.seek(HEADER.size)
+        while True:
+            head = f.read(BLOCK.size)
+            if len(head) < BLOCK.size:
+                break
+            tag, length = BLOCK.unpack(head)
+            offset = f.tell()
+            if tag == KEYFRAME:
+                data = f.read(KEYFRAME_TICK.size)
+                if len(data) < KEYFRAME_TICK.size:
+                    break
+                (tick,) = KEYFRAME_TICK.unpack(data)
+                entry = (tick, offset, length)
+            elif tag == INPUTS:
+                data = f.read(INPUT_SPAN.size)
+                if len(data) < INPUT_SPAN.size:
+                    break
+                start, count = INPUT_SPAN.unpack(data)
+                entry = (start, count, offset, length)
+            else:
+                raise ReplayError(f"unknown block {tag!r} at offset {offset}")
+
+            if offset + length > size:
+                break  # last block was cut short
+            f.seek(offset + length)
+            if tag == KEYFRAME:
+                self.keyframes.append(entry)
+            else:
+                self.input_blocks.append(entry)
+                self.length = max(self.length, start + count)
+
+    def close(self):
+        self._file.close()
+
+    def _read(self, offset: int, length: int) -> bytes:
+        self._file.seek(offset)
+        return self._file.read(length)
+
+    def keyframe_index(self, tick: int) -> int:
+        """Index into keyframes of the latest keyframe at or before a tick"""
+        i = bisect_right(self.keyframes, (tick, float("inf"))) - 1
+        if i < 0:
+            raise ReplayError(f"no keyframe at or before tick {tick}")
+        return i
+
+    def keyframe_state(self, i: int) -> bytes:
+        """Read the engine state stored in a keyframe"""
+        _, offset, length = self.keyframes[i]
+        return self._read(offset, length)[KEYFRAME_TICK.size :]
+
+    def inputs_from(self, tick: int):
+        """
+        Stream the recorded input codes starting at a tick
+
+        Yields:
+            Tuple of per-player codes for each tick, in order
+        """
+        for start, count, offset, length in self.input_blocks:
+            if start + count <= tick:
+                continue
+            data = self._read(offset, length)[INPUT_SPAN.size :]
+            ticks = unpack_inputs(data, count, self.players)
+            yield from ticks[max(0, tick - start) :]
+
+
+class ReplayPlayer:
+    """
+    Re-simulates a recorded match on a headless engine
+
+    seek() jumps to any tick by restoring the nearest earlier keyframe and
+    fast-forwarding through the recorded input, so its cost is bounded by
+    the keyframe interval rather than the length of the replay.
+    """
+
+    def __init__(self, reader: ReplayReader):
+        self.reader = reader
+        self.engine = GameEngine(players=reader.players)
+        self.tick = 0
+        self._inputs = None
+        self.seek(0)
+
+    @property
+    def finished(self) -> bool:
+        """Check if every recorded tick has been played"""
+        return self.tick >= self.reader.length
+
+    def seek(self, tick: int):
+        """
+        Move playback to a tick
+
+        Args:
+            tick: Tick to stop before (0 is the start of the recording)
+        """
+        i = self.reader.keyframe_index(tick)
+        self.tick = self.reader.keyframes[i][0]
+        self._next_keyframe = i
+        self._load_keyframes()
+        self._inputs = self.reader.inputs_from(self.tick)
+        while self.tick < tick and self.step():
+            pass
+
+    def step(self) -> bool:
+        """
+        Apply one recorded tick
+
+        Returns:
+            False if the recording has ended
+        """
+        codes = next(self._inputs, None)
+        if codes is None:
+            return False
+        for player, code in enumerate(codes, start=1):
+            self.engine.set_steering(player, *decode_steering(code))
+        self.engine.tick(self.reader.step_ms)
+        self.tick += 1
+        self._load_keyframes()
+        return True
+
+    def _load_keyframes(self):
+        """Restore the keyframe recorded at the current tick, if any"""
+        # Restarts are only recorded this way, so they must not be skipped
+        keyframes = self.reader.keyframes
+        while (
+            self._next_keyframe < len(keyframes)
+            and keyframes[self._next_keyframe][0] <= self.tick
+        ):
+            if keyframes[self._next_keyframe][0] == self.tick:
+                state = self.reader.keyframe_state(self._next_keyframe)
+                restore_state(self.engine, state)
+            self._next_keyframe += 1
@@ -0,0 +1,273 @@
+"""
+RL Environment - gym-style reset/step API with NumPy occupancy observations
+"""
+
+import math
+import numpy as np
+from controller.engine import GameEngine
+from controller.replay import decode_steering
+from config import GRID_H, CELL, CHUNKED_WORLD, PLAYERS
+
+# Observation channels
+OBSTACLE = 0
+APPLE = 1
+GOLDEN_APPLE = 2
+BODY = 3  # every segment of the pane's own snake, head included
+HEAD = 4
+CHANNELS = 5
+
+# Rewards per player and env step
+PROGRESS_REWARD = 0.01  # per row climbed
+APPLE_REWARD = 1.0
+WIN_REWARD = 1.0
+CRASH_REWARD = -1.0
+
+FRAME_SKIP = 4  # engine frames per env step; at least one snake step
+
+
+class OccupancyWindow:
+    """
+    One pane's visible rows as a (CHANNELS, rows, pane width) uint8 tensor
+
+    World row y lives in ring slot y % rows, like the rows of a PaneStrip,
+    and every row is stored twice: at its slot and rows slots further down.
+    Whatever the camera offset, the visible window is then one contiguous
+    slice of the buffer, so the observation is a view and scrolling never
+    copies. Rows are only rewritten when they come into view or their
+    obstacles or apples change; the snake channels are cleared and redrawn
+    cell by cell.
+    """
+
+    def __init__(self, pane, rows: int = GRID_H):
+        self.pane = pane
+        self.rows = rows
+        self.width = pane.x1 - pane.x0 + 1
+        self.buffer = np.zeros((CHANNELS, 2 * rows, self.width), dtype=np.uint8)
+        self.invalidate()
+
+    def invalidate(self):
+        """Forget every written row"""
+        self.buffer[:] = 0
+        self.slot_rows = [None] * self.rows
+        self.slot_obstacles = [frozenset()] * self.rows
+        self.slot_apples = [()] * self.rows
+        self.snake_cells = ([], [])  # slots and columns written to BODY/HEAD
+        self.top = 0
+
+    def update(self, game_state, camera_y: float, snake) -> np.ndarray:
+        """
+        Bring the window up to date with a camera position
+
+        Args:
+            game_state: GameState to read obstacles and apples from
+            camera_y: Camera of this pane, in rows
+            snake: Snake of this pane
+
+        Returns:
+            (CHANNELS, rows, width) view into the ring; it changes with
+            the next update, so copy it to keep it
+        """
+        # Same top row as the renderers draw
+        top = math.ceil(camera_y * CELL) // CELL
+        self.top = top
+        rows = self.rows
+        pane = self.pane
+        x0 = pane.x0
+        buffer = self.buffer
+        # Plain dict lookups of this pane's rows: this loop runs for every
+        # row of every step
+        obstacles_at = game_state.obstacles.rows_in(pane).rows.get
+        apples_at = game_state.apples.rows_in(pane).rows.get
+        slot_rows = self.slot_rows
+        slot_obstacles = self.slot_obstacles
+        slot_apples = self.slot_apples
+
+        for y in range(top, top + rows):
+            slot = y % rows
+            xs = obstacles_at(y)
+            # By columns: a rebase or chunk reload can move a row's
+            # obstacles without changing how many there are
+            columns = frozenset(xs) if xs else frozenset()
+            row_apples = apples_at(y)
+            signature = tuple(row_apples.items()) if row_apples else ()
+            if (
+                slot_rows[slot] == y
+                and slot_obstacles[slot] == columns
+                and slot_apples[slot] == signature
+            ):
+                continue
+            slot_rows[slot] = y
+            slot_obstacles[slot] = columns
+            slot_apples[slot] = signature
+
+            row = np.zeros((3, self.width), dtype=np.uint8)
+            if columns:
+                row[OBSTACLE, [x - x0 for x in columns]] = 1
+            for x, is_golden in signature:
+                row[GOLDEN_APPLE if is_golden else APPLE, x - x0] = 1
+            buffer[OBSTACLE : GOLDEN_APPLE + 1, slot] = row
+            buffer[OBSTACLE : GOLDEN_APPLE + 1, slot + rows] = row
+
+        # One fancy-indexed write per channel instead of one per segment
+        slots, columns = self.snake_cells
+        buffer[BODY : HEAD + 1, slots, columns] = 0
+        bottom = top + rows
+        slots = [y % rows for _, y in snake.body if top <= y < bottom]
+        columns = [x - x0 for x, y in snake.body if top <= y < bottom]
+        slots += [slot + rows for slot in slots]
+        columns += columns
+        buffer[BODY, slots, columns] = 1
+        hx, hy = snake.head
+        if top <= hy < bottom:
+            buffer[HEAD, (hy % rows, hy % rows + rows), hx - x0] = 1
+        self.snake_cells = (slots, columns)
+
+        start = top % rows
+        return buffer[:, start : start + rows]
+
+    def rebuild(self, game_state, camera_y: float, snake) -> np.ndarray:
+        """Build the window from scratch, for checking update()"""
+        self.invalidate()
+        return self.update(game_state, camera_y, snake)
+
+
+class SlitherEnv:
+    """
+    Match as a multi-agent reinforcement-learning environment
+
+    Follows the gymnasium API shape without depending on it: reset()
+    returns (observation, info) and step() returns (observation, rewards,
+    terminated, truncated, info). Every player acts every step, so the
+    observation is a tuple of pane windows and the rewards a tuple of
+    floats, in player order; self-play and scripted opponents are up to
+    the caller.
+
+    Actions are steering codes: 0 keeps the direction, 1 turns left and
+    2 turns right. Observations are views into OccupancyWindow rings.
+    """
+
+    action_count = 3
+
+    def __init__(
+        self,
+        seed: int = None,
+        frame_skip: int = FRAME_SKIP,
+        max_steps: int = None,
+        chunked: bool = CHUNKED_WORLD,
+        players: int = PLAYERS,
+    ):
+        """
+        Args:
+            seed: Seed of the first match; later resets continue its stream
+            frame_skip: Engine frames simulated per step
+            max_steps: Truncate episodes after this many steps
+            chunked: Generate obstacles from a ChunkedWorld
+            players: Number of snakes, each with its own pane
+        """
+        self.engine = GameEngine(seed=seed, chunked=chunked, players=players)
+        self.frame_skip = frame_skip
+        self.max_steps = max_steps
+        self.steps = 0
+
+        state = self.engine.game_state
+        self.windows = tuple(OccupancyWindow(pane) for pane in state.panes)
+        self._obstacles = None
+        self._generation = None
+
+    @property
+    def observation_shapes(self) -> tuple:
+        """Shape of each player's observation"""
+        return tuple(w.buffer[:, : w.rows].shape for w in self.windows)
+
+    def reset(self, seed: int = None) -> tuple:
+        """
+        Start a new match
+
+        Args:
+            seed: Reseed the match RNG first
+
+        Returns:
+            (observation, info) tuple
+        """
+        self.engine.reset(seed)
+        self.steps = 0
+        return self.observation(), self._info()
+
+    def step(self, actions) -> tuple:
+        """
+        Apply every player's action and advance frame_skip frames
+
+        Args:
+            actions: One action per player, in player order
+
+        Returns:
+            (observation, rewards, terminated, truncated, info) tuple
+        """
+        engine = self.engine
+        state = engine.game_state
+        snakes = state.snakes
+        before = [
+            (s.head[1], s.apples_collected, s.powerup_end_time, s.alive) for s in snakes
+        ]
+
+        for player, action in enumerate(actions, start=1):
+            engine.set_steering(player, *decode_steering(int(action)))
+        for _ in range(self.frame_skip):
+            engine.tick()
+        self.steps += 1
+
+        rewards = []
+        winner = state.winner_text
+        for snake, (y, apples, powerup_end, alive) in zip(snakes, before):
+            reward = PROGRESS_REWARD * (y - snake.head[1])
+            reward += APPLE_REWARD * (snake.apples_collected - apples)
+            if snake.powerup_end_time != powerup_end and snake.is_invincible():
+                reward += APPLE_REWARD  # a golden apple
+            if not snake.alive:
+                # Once, on the step it crashed; with more than two players
+                # the match can go on without it
+                if alive:
+                    reward += CRASH_REWARD
+            elif winner is not None and winner.startswith(f"{snake.name} wins"):
+                reward += WIN_REWARD
+            rewards.append(reward)
+
+        terminated = engine.is_over
+        truncated = (
+            not terminated
+            and self.max_steps is not None
+            and self.steps >= self.max_steps
+        )
+        return self.observation(), tuple(rewards), terminated, truncated, self._info()
+
+    def observation(self) -> tuple:
+        """
+        Get each player's window of its pane
+
+        Returns:
+            Tuple of (CHANNELS, rows, width) views in player order, valid
+            until the next step or reset
+        """
+        state = self.engine.game_state
+        # A reset swaps in a new obstacle store and a restore refills it
+        obstacles = state.obstacles
+        if obstacles is not self._obstacles or obstacles.generation != self._generation:
+            self._obstacles = obstacles
+            self._generation = obstacles.generation
+            for window in self.windows:
+                window.invalidate()
+        return tuple(
+            window.update(state, camera_y, snake)
+            for window, camera_y, snake in zip(
+                self.windows, state.cameras, state.snakes
+            )
+        )
+
+    def _info(self) -> dict:
+        state = self.engine.game_state
+        return {
+            "steps": self.steps,
+            "winner": state.winner_text,
+            "heads": tuple(snake.head for snake in state.snakes),
+            "apples": tuple(snake.apples_collected for snake in state.snakes),
+        }
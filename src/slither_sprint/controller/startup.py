@@ -0,0 +1,77 @@
+"""
+Startup Timer - time from process start to the first frame on screen
+"""
+
+import os
+import time
+
+
+def process_age() -> float:
+    """
+    Seconds since the OS started this process
+
+    Covers interpreter startup, which no timer inside Python can see. Only
+    Linux exposes it without extra dependencies.
+
+    Returns:
+        Seconds, or None where the start time is not available
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            # Fields after the parenthesised command name, whose text may
+            # hold spaces; starttime is field 22 of the whole line
+            fields = f.read().rpartition(")")[2].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class StartupTimer:
+    """
+    Named marks on the way from launch to the first frame
+
+    Created when this module is first imported, which game.py does before
+    anything else, so the first mark includes every import.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.before_origin = process_age()
+        self.marks = []
+
+    def mark(self, name: str):
+        """Record that a startup phase has finished"""
+        self.marks.append((name, time.perf_counter()))
+
+    def as_dict(self) -> dict:
+        """
+        Get each phase's duration
+
+        Returns:
+            Dict of phase name to milliseconds, in order, starting with
+            "process" (time before this module loaded) when it is known
+        """
+        phases = {}
+        if self.before_origin is not None:
+            phases["process"] = self.before_origin * 1000
+        previous = self.origin
+        for name, at in self.marks:
+            phases[name] = (at - previous) * 1000
+            previous = at
+        return phases
+
+    def report(self) -> str:
+        """Phase durations and running totals as a text table"""
+        lines = [f"{'phase':<16}{'ms':>9}{'total':>9}"]
+        total = 0.0
+        for name, ms in self.as_dict().items():
+            total += ms
+            lines.append(f"{name:<16}{ms:9.1f}{total:9.1f}")
+        if self.before_origin is None:
+            lines.append("(time before Python loaded game.py is not included)")
+        return "\n".join(lines)
+
+
+TIMER = StartupTimer()
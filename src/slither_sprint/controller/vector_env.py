@@ -0,0 +1,201 @@
+"""
+Vector Env - runs many SlitherEnvs in worker processes
+"""
+
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from controller.rl_env import SlitherEnv
+from config import CHUNKED_WORLD
+
+
+def _worker(conn, names, shapes, indices, seeds, kwargs):
+    """
+    Step a group of environments on request
+
+    Observations are written straight into the shared arrays, so only
+    actions, rewards and flags go through the pipe.
+    """
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    arrays = [
+        np.ndarray(shape, dtype=np.uint8, buffer=block.buf)
+        for shape, block in zip(shapes, blocks)
+    ]
+    envs = [SlitherEnv(seed=seed, **kwargs) for seed in seeds]
+
+    def publish(i, observation):
+        for array, window in zip(arrays, observation):
+            array[indices[i]] = window
+
+    try:
+        while True:
+            command, data = conn.recv()
+            if command == "step":
+                results = []
+                for i, (env, actions) in enumerate(zip(envs, data)):
+                    observation, rewards, terminated, truncated, info = env.step(
+                        actions
+                    )
+                    if terminated or truncated:
+                        # Report the last state, then start over
+                        info["final_info"] = dict(info)
+                        observation, reset_info = env.reset()
+                        info.update(reset_info)
+                    publish(i, observation)
+                    results.append((rewards, terminated, truncated, info))
+                conn.send(results)
+            elif command == "reset":
+                infos = []
+                for i, (env, seed) in enumerate(zip(envs, data)):
+                    observation, info = env.reset(seed)
+                    publish(i, observation)
+                    infos.append(info)
+                conn.send(infos)
+            elif command == "close":
+                break
+    finally:
+        arrays.clear()  # release the buffers before closing them
+        for block in blocks:
+            block.close()
+        conn.close()
+
+
+class VectorEnv:
+    """
+    n SlitherEnvs stepped together across worker processes
+
+    Observations live in shared memory as one (n, CHANNELS, rows, width)
+    uint8 array per player; workers copy each env's windows into it, and
+    step() returns views of those arrays rather than pickled copies. As
+    with SlitherEnv, the views are overwritten by the next step. An
+    environment whose episode ends is reset at once; its info then holds
+    the final step's info under "final_info".
+    """
+
+    def __init__(
+        self,
+        n: int,
+        workers: int = None,
+        seed: int = None,
+        chunked: bool = CHUNKED_WORLD,
+        **kwargs,
+    ):
+        """
+        Args:
+            n: Number of environments
+            workers: Number of processes; defaults to the CPU count
+            seed: Env i is seeded with seed + i
+            chunked: Generate obstacles from a ChunkedWorld
+            **kwargs: Further SlitherEnv arguments
+        """
+        self.n = n
+        workers = max(1, min(n, workers or mp.cpu_count()))
+        kwargs["chunked"] = chunked
+
+        shapes = [(n, *shape) for shape in SlitherEnv(**kwargs).observation_shapes]
+        self._blocks = [
+            shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+            for shape in shapes
+        ]
+        self.observations = tuple(
+            np.ndarray(shape, dtype=np.uint8, buffer=block.buf)
+            for shape, block in zip(shapes, self._blocks)
+        )
+
+        # Contiguous groups of envs per worker
+        self._groups = np.array_split(np.arange(n), workers)
+        context = mp.get_context("spawn")
+        self._conns = []
+        self._processes = []
+        for group in self._groups:
+            seeds = [None if seed is None else seed + int(i) for i in group]
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_worker,
+                args=(
+                    child,
+                    [block.name for block in self._blocks],
+                    shapes,
+                    group.tolist(),
+                    seeds,
+                    kwargs,
+                ),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self._conns.append(parent)
+            self._processes.append(process)
+        self.closed = False
+
+    def reset(self, seed: int = None) -> tuple:
+        """
+        Reset every environment
+
+        Args:
+            seed: Reseed env i with seed + i
+
+        Returns:
+            (observations, infos) tuple
+        """
+        for conn, group in zip(self._conns, self._groups):
+            seeds = [None if seed is None else seed + int(i) for i in group]
+            conn.send(("reset", seeds))
+        infos = []
+        for conn in self._conns:
+            infos.extend(conn.recv())
+        return self.observations, infos
+
+    def step(self, actions) -> tuple:
+        """
+        Step every environment
+
+        Args:
+            actions: (n, players) array-like of steering codes
+
+        Returns:
+            (observations, rewards, terminated, truncated, infos) tuple;
+            rewards is an (n, players) array
+        """
+        actions = np.asarray(actions)
+        for conn, group in zip(self._conns, self._groups):
+            conn.send(("step", actions[group].tolist()))
+        results = []
+        for conn in self._conns:
+            results.extend(conn.recv())
+
+        rewards, terminated, truncated, infos = zip(*results)
+        return (
+            self.observations,
+            np.array(rewards, dtype=np.float32),
+            np.array(terminated),
+            np.array(truncated),
+            list(infos),
+        )
+
+    def close(self):
+        """Stop the workers and free the shared memory"""
+        if self.closed:
+            return
+        self.closed = True
+        for conn in self._conns:
+            try:
+                conn.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._conns:
+            conn.close()
+        self.observations = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,16 +1,435 @@
 """
 Slither Sprint - Entry Point
-Two-player vertical snake racing game
+Split-screen vertical snake racing game for 2 to 8 players
 """
 
-import pygame
-from controller.game_controller import GameController
+# Imported first so its clock starts before every other import
+from controller.startup import TIMER
+
+import argparse
+import os
+import time
+from controller.engine import GameEngine
+from config import (
+    RENDER_MODE,
+    WIDTH,
+    HEIGHT,
+    FPS,
+    CHUNKED_WORLD,
+    DEFAULT_PORT,
+    PLAYERS,
+    MAX_PLAYERS,
+    INTERPOLATE,
+    ENDLESS,
+)
+
+# Keys of controller.game_controller.RENDERERS, listed here so headless runs
+# never import pygame
+RENDER_MODES = ("full", "strip")
+
+
+def run_headless(
+    frames: int,
+    seed: int = None,
+    chunked: bool = CHUNKED_WORLD,
+    profile_path=None,
+    bots=(),
+    players: int = PLAYERS,
+    endless: bool = ENDLESS,
+):
+    """Simulate matches without a window and report throughput"""
+    engine = GameEngine(seed=seed, chunked=chunked, players=players, endless=endless)
+    if profile_path is not None:
+        run_profiled(engine, frames, profile_path)
+        return
+    if bots:
+        run_bots(engine, frames, bots)
+        return
+    start = time.perf_counter()
+    simulated = 0
+    while simulated < frames:
+        simulated += engine.run_frames(frames - simulated)
+        if engine.is_over:
+            engine.reset()
+    elapsed = time.perf_counter() - start
+    print(f"Simulated {simulated} frames in {elapsed:.3f}s")
+    print(f"{simulated / elapsed:.0f} frames/sec")
+
+
+def run_profiled(engine, frames: int, profile_path):
+    """Simulate frames one by one with every phase timed"""
+    from controller.profiler import FrameProfiler
+
+    profiler = FrameProfiler()
+    engine.attach_profiler(profiler)
+    for _ in range(frames):
+        profiler.begin_frame()
+        engine.tick()
+        profiler.end_frame(engine.game_state)
+        if engine.is_over:
+            engine.reset()
+    print(profiler.format_table())
+    profiler.export(profile_path)
+    print(f"Wrote {profiler.frames} frames to {profile_path}")
+
+
+def run_bots(engine, frames: int, players):
+    """Simulate frames with bots steering, and report results and planning"""
+    from controller.bot import Bot, BotScheduler
+    from controller.profiler import percentile
+
+    state = engine.game_state
+    scheduler = BotScheduler(engine, [Bot(p, state.panes[p - 1]) for p in players])
+    planning = []
+    results = {}
+    for _ in range(frames):
+        scheduler.update()
+        planning.append(scheduler.planning_ms)
+        engine.tick()
+        if engine.is_over:
+            results[state.winner_text] = results.get(state.winner_text, 0) + 1
+            engine.reset()
+
+    print(f"Simulated {frames} frames, {sum(results.values())} matches")
+    for text, count in sorted(results.items(), key=lambda item: -item[1]):
+        print(f"{count:6d}  {text}")
+    planning.sort()
+    print(
+        f"Planning ms per frame: p50 {percentile(planning, 50):.3f}"
+        f"  p99 {percentile(planning, 99):.3f}  max {planning[-1]:.3f}"
+    )
+    fallbacks = sum(bot.fallbacks for bot in scheduler.bots)
+    print(f"Moves made before a plan was ready: {fallbacks}")
+
+
+def run_batch(frames: int, matches: int, seed: int = None):
+    """Simulate many matches in lockstep and report throughput"""
+    from controller.batch_engine import BatchEngine
+
+    engine = BatchEngine(matches, seed)
+    start = time.perf_counter()
+    simulated = 0
+    for _ in range(frames):
+        simulated += int(engine.running.sum())
+        engine.step()
+        engine.reset(~engine.running)
+    elapsed = time.perf_counter() - start
+    print(f"Simulated {simulated} match frames in {elapsed:.3f}s")
+    print(f"{simulated / elapsed:.0f} match frames/sec")
+
+
+def run_rollback(frames: int, latency_ms: float, seed: int = None):
+    """Play two random bots over a laggy loopback and report rollbacks"""
+    import random
+    from net.rollback import LoopbackTransport, RollbackSession
+    from config import FIXED_STEP_MS
+
+    if seed is None:
+        seed = random.randrange(2**32)
+    now = [0.0]
+    link_a, link_b = LoopbackTransport.pair(lambda: now[0], latency_ms, seed=seed)
+    peers = (
+        RollbackSession(GameEngine(seed=seed, players=2), 1, link_a),
+        RollbackSession(GameEngine(seed=seed, players=2), 2, link_b),
+    )
+    bots = (random.Random(seed + 1), random.Random(seed + 2))
+    keys = [(False, False), (False, False)]
+
+    for _ in range(frames):
+        for i, (peer, bot) in enumerate(zip(peers, bots)):
+            if bot.random() < 0.15:
+                keys[i] = (bot.random() < 0.5, bot.random() < 0.5)
+            peer.advance(*keys[i])
+        now[0] += FIXED_STEP_MS
+    # Let the last inputs arrive so both peers settle on the same state
+    now[0] += latency_ms + FIXED_STEP_MS
+    for peer in peers:
+        peer.poll()
+        while peer.behind:
+            peer.poll()
+
+    in_sync = peers[0].engine.snapshot() == peers[1].engine.snapshot()
+    print(f"Simulated {frames} ticks at {latency_ms:g} ms latency")
+    for player, peer in enumerate(peers, start=1):
+        print(f"P{player}: {peer.stats.as_dict()}")
+    print("Peers in sync" if in_sync else "Peers DIVERGED")
+
+
+def run_replay(path, speed: int, render_mode: str):
+    """Play a recorded match in a window, speed ticks per frame"""
+    import pygame
+    from controller.game_controller import RENDERERS
+    from controller.replay import ReplayPlayer, ReplayReader
+
+    reader = ReplayReader(path)
+    player = ReplayPlayer(reader)
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Slither Sprint - Replay")
+    renderer = RENDERERS[render_mode](screen)
+    clock = pygame.time.Clock()
+
+    while not player.finished:
+        clock.tick(FPS)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (
+                event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE
+            ):
+                reader.close()
+                return
+        for _ in range(speed):
+            if not player.step():
+                break
+        renderer.render(player.engine.game_state)
+    reader.close()
+
+
+def run_export(path, out_path, speed: int):
+    """Render a recorded match straight to a video file or frame images"""
+    from controller.replay import ReplayPlayer, ReplayReader
+    from view.renderer import Renderer
+    from view.video_export import FrameWriter
+
+    reader = ReplayReader(path)
+    player = ReplayPlayer(reader)
+    # Frames go to the writer's surfaces; nothing is shown
+    renderer = Renderer(None, present=False)
+    try:
+        writer = FrameWriter(out_path, (WIDTH, HEIGHT), FPS)
+    except RuntimeError as exc:
+        reader.close()
+        raise SystemExit(exc)
+
+    start = time.perf_counter()
+    try:
+        while True:
+            renderer.screen = writer.acquire()
+            renderer.render(player.engine.game_state)
+            writer.submit(renderer.screen)
+            if player.finished:
+                break
+            for _ in range(speed):
+                if not player.step():
+                    break
+        writer.close()
+    finally:
+        reader.close()
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"Exported {writer.frames} frames to {out_path} in {elapsed:.2f}s"
+        f" ({writer.frames / elapsed:.0f} fps, {writer.frames / elapsed / FPS:.1f}x"
+        f" real time); waited {writer.stall_s:.2f}s for the writer on"
+        f" {writer.stalls} frames"
+    )
+
+
+def run_server(host: str, port: int, chunked: bool = CHUNKED_WORLD):
+    """Host online matches until interrupted"""
+    import asyncio
+    from net.server import MatchServer
+
+    server = MatchServer(host, port, chunked=chunked)
+
+    async def serve():
+        await server.start()
+        print(f"Serving matches on {server.host}:{server.port}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
 
 
 def main():
-    pygame.init()
-    controller = GameController()
-    controller.run()
+    parser = argparse.ArgumentParser(description="Slither Sprint")
+    parser.add_argument(
+        "--headless",
+        type=int,
+        metavar="FRAMES",
+        help="simulate FRAMES frames without a window and exit",
+    )
+    parser.add_argument(
+        "--batch",
+        type=int,
+        metavar="MATCHES",
+        help="with --headless, step MATCHES matches in lockstep (needs numpy)",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        metavar="MS",
+        help="with --headless, run two rollback peers over a loopback this slow",
+    )
+    parser.add_argument(
+        "--players",
+        type=int,
+        choices=range(2, MAX_PLAYERS + 1),
+        default=PLAYERS,
+        metavar="N",
+        help=f"split the screen between N players (2 to {MAX_PLAYERS})",
+    )
+    parser.add_argument(
+        "--bot",
+        type=int,
+        choices=range(1, MAX_PLAYERS + 1),
+        action="append",
+        default=[],
+        metavar="PLAYER",
+        help="let the computer steer PLAYER (from 1); repeat for more bots",
+    )
+    parser.add_argument(
+        "--render",
+        choices=RENDER_MODES,
+        default=RENDER_MODE,
+        help="full redraw every frame, or scrolling strips with dirty rects",
+    )
+    parser.add_argument(
+        "--interpolate",
+        action="store_true",
+        default=INTERPOLATE,
+        help="tick at a fixed rate and draw up to RENDER_FPS interpolated frames",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="seed the match RNG and use a fixed simulation timestep",
+    )
+    parser.add_argument(
+        "--chunks",
+        action="store_true",
+        default=CHUNKED_WORLD,
+        help="generate obstacles in seeded chunks, the same in both panes",
+    )
+    parser.add_argument(
+        "--endless",
+        action="store_true",
+        default=ENDLESS,
+        help="race without a finish line until one snake is left",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="time every frame phase and write a .csv or .json trace on exit",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="FILE",
+        help="record a replay of the session (uses a fixed timestep)",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="FILE",
+        help="play back a recorded replay instead of a live match",
+    )
+    parser.add_argument(
+        "--speed",
+        type=int,
+        default=1,
+        help="with --replay, simulation ticks shown per frame",
+    )
+    parser.add_argument(
+        "--export",
+        metavar="OUT",
+        help="with --replay, render to a video file (needs ffmpeg) or a"
+        " directory of frame images instead of a window",
+    )
+    parser.add_argument(
+        "--serve",
+        type=int,
+        nargs="?",
+        const=DEFAULT_PORT,
+        metavar="PORT",
+        help=f"host online matches (default port {DEFAULT_PORT})",
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="with --serve, address to listen on",
+    )
+    parser.add_argument(
+        "--connect",
+        metavar="HOST:PORT",
+        help="play a match hosted by a --serve server",
+    )
+    parser.add_argument(
+        "--room",
+        default="",
+        help="with --connect, room to join (default: pair with anyone)",
+    )
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="print how long each startup phase took, then quit at the first frame",
+    )
+    args = parser.parse_args()
+    TIMER.mark("imports")
+    if any(player > args.players for player in args.bot):
+        parser.error(f"--bot must name a player from 1 to {args.players}")
+    if args.export and not args.replay:
+        parser.error("--export needs a --replay to render")
+
+    if args.serve is not None:
+        run_server(args.host, args.serve, args.chunks)
+        return
+
+    if args.headless is not None:
+        if args.batch:
+            run_batch(args.headless, args.batch, args.seed)
+        elif args.latency is not None:
+            run_rollback(args.headless, args.latency, args.seed)
+        else:
+            run_headless(
+                args.headless,
+                args.seed,
+                args.chunks,
+                args.profile,
+                args.bot,
+                args.players,
+                args.endless,
+            )
+        return
+
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    if args.export:
+        # Off-screen rendering; no window is opened
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+    import pygame
+
+    TIMER.mark("import pygame")
+    # Only the subsystems the game uses; starting audio alone can stall
+    pygame.display.init()
+    pygame.font.init()
+    TIMER.mark("pygame init")
+
+    if args.export:
+        run_export(args.replay, args.export, args.speed)
+    elif args.replay:
+        run_replay(args.replay, args.speed, args.render)
+    elif args.connect:
+        from controller.remote_controller import RemoteController
+
+        host, _, port = args.connect.rpartition(":")
+        RemoteController(host, int(port), args.room, args.render).run()
+    else:
+        from controller.game_controller import GameController
+
+        TIMER.mark("import game")
+        controller = GameController(
+            args.render,
+            args.seed,
+            args.record,
+            args.chunks,
+            args.profile,
+            args.bot,
+            args.startup_report,
+            args.players,
+            args.interpolate,
+            args.endless,
+        )
+        controller.run()
+        if args.startup_report:
+            print(TIMER.report())
     pygame.quit()
 
 
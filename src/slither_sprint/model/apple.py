@@ -15,3 +15,16 @@ class Apple:
     def position(self):
         """Get the (x, y) position tuple"""
         return (self.x, self.y)
+
+    def snapshot(self) -> tuple:
+        """Capture the apple as an (x, y, is_golden) tuple"""
+        return (self.x, self.y, self.is_golden)
+
+    def restore(self, state: tuple):
+        """
+        Load a state produced by snapshot()
+
+        Args:
+            state: (x, y, is_golden) tuple
+        """
+        self.x, self.y, self.is_golden = state
@@ -0,0 +1,159 @@
+"""
+Apples model - position-indexed registry of collectible apples
+"""
+
+from model.apple import Apple
+from model.entity_store import EntityStore, APPLE
+from model.row_index import RowIndex
+
+
+class Apples:
+    """
+    Manages the apples in the game world, keyed by position
+
+    Apples are APPLE entities of an EntityStore, which may be shared with
+    the obstacles. Every apple is reachable by its (x, y) cell in O(1), and
+    each pane keeps its own row index so a pane's visible apples can be
+    listed without looking at the other panes or at off-screen rows. Maps
+    and row buckets hold the apple's golden flag; Apple objects are only
+    built for callers that ask for one.
+    """
+
+    def __init__(self, panes, store: EntityStore = None):
+        self.store = store if store is not None else EntityStore(panes)
+        self.panes = self.store.panes
+        # Cell to golden flag
+        self.by_pos = self.store.cells[APPLE]
+        self.pane_rows = self.store.pane_rows[APPLE]
+
+    def __len__(self) -> int:
+        return len(self.by_pos)
+
+    def __iter__(self):
+        return (Apple(x, y, golden) for (x, y), golden in self.by_pos.items())
+
+    def __contains__(self, pos) -> bool:
+        return pos in self.by_pos
+
+    def rows_in(self, pane) -> RowIndex:
+        """Get the row index of one pane's apples, each row a dict of x to golden flag"""
+        return self.pane_rows[self.store.pane_index(pane)]
+
+    def add(self, apple: Apple) -> bool:
+        """
+        Add an apple
+
+        Args:
+            apple: Apple to add
+
+        Returns:
+            False if the cell already holds an apple
+        """
+        if self.store.pane_of(apple.x) is None:
+            raise ValueError(f"x={apple.x} is outside every pane")
+        return self.store.add(APPLE, apple.x, apple.y, apple.is_golden)
+
+    def at(self, pos: tuple):
+        """Get the apple at a cell, or None"""
+        golden = self.by_pos.get(pos)
+        return None if golden is None else Apple(pos[0], pos[1], golden)
+
+    def pop_at(self, pos: tuple):
+        """
+        Remove and return the apple at a cell
+
+        Args:
+            pos: (x, y) tuple
+
+        Returns:
+            The removed Apple, or None if the cell was empty
+        """
+        golden = self.store.remove(APPLE, pos)
+        return None if golden is None else Apple(pos[0], pos[1], golden)
+
+    def in_pane(self, pane, y_min, y_max):
+        """
+        Iterate the apples of one pane within a y-range
+
+        Args:
+            pane: Pane to list
+            y_min: Minimum y coordinate (inclusive)
+            y_max: Maximum y coordinate (inclusive)
+
+        Yields:
+            Apple objects
+        """
+        for x, y, golden in self.visible(pane, y_min, y_max):
+            yield Apple(x, y, golden)
+
+    def in_rows(self, y_min, y_max):
+        """
+        Iterate apples in every pane within a y-range
+
+        Yields:
+            Apple objects
+        """
+        for pane in self.panes:
+            yield from self.in_pane(pane, y_min, y_max)
+
+    def visible(self, pane, y_min, y_max) -> list:
+        """
+        Get one pane's apples within a y-range, for culling
+
+        Args:
+            pane: Pane to list
+            y_min: Minimum y coordinate (inclusive)
+            y_max: Maximum y coordinate (inclusive)
+
+        Returns:
+            List of (x, y, is_golden) tuples
+        """
+        return self.store.cull(APPLE, pane, y_min, y_max)
+
+    def cleanup(self, y_limit):
+        """
+        Remove apples at or above a world row
+
+        Args:
+            y_limit: Apples with y <= y_limit are removed
+        """
+        self.store.drop_through(APPLE, y_limit)
+
+    def cleanup_below(self, screen_bottom):
+        """
+        Remove apples that scrolled off the bottom of the screen
+
+        Args:
+            screen_bottom: Apples with y >= screen_bottom are removed
+        """
+        self.store.drop_from(APPLE, screen_bottom)
+
+    def shift(self, dy: int):
+        """
+        Move every apple down by dy rows, for a world rebase
+
+        Args:
+            dy: Rows to add to each apple's y
+        """
+        self.restore(tuple((x, y + dy, golden) for x, y, golden in self.snapshot()))
+
+    def snapshot(self) -> tuple:
+        """
+        Capture every apple
+
+        Returns:
+            Tuple of Apple.snapshot() tuples
+        """
+        return tuple((x, y, golden) for (x, y), golden in self.by_pos.items())
+
+    def restore(self, state: tuple):
+        """
+        Replace every apple with a state produced by snapshot()
+
+        Args:
+            state: Tuple of (x, y, is_golden) tuples
+        """
+        store = self.store
+        store.clear(APPLE)
+        for x, y, is_golden in state:
+            store.add(APPLE, x, y, is_golden)
@@ -0,0 +1,140 @@
+"""
+Chunked World - obstacles generated lazily from a seed, one band of rows at a time
+"""
+
+import math
+import random
+from model.obstacles import Obstacles
+from config import (
+    CHUNK_ROWS,
+    CHUNK_CLEAR_ROWS,
+    GRID_H,
+    OBSTACLE_SPAWN_CHANCE,
+    OBSTACLE_SPAWN_EVERY_STEPS,
+)
+
+# Chance that a row gets a run of blocks, matching the density of blocks
+# spawned ahead of a snake (one attempt every few steps per pane)
+ROW_CHANCE = OBSTACLE_SPAWN_CHANCE / OBSTACLE_SPAWN_EVERY_STEPS
+
+
+def generate_chunk(seed: int, index: int, width: int, stream: int = 0) -> list:
+    """
+    Generate the blocks of one chunk
+
+    The result depends only on the arguments, so a chunk can be dropped
+    and generated again, or generated on another machine, identically.
+
+    Args:
+        seed: World seed
+        index: Chunk index; chunk i covers rows i*CHUNK_ROWS up to the
+            next chunk
+        width: Number of columns to place blocks in
+        stream: Selects an independent layout for the same chunk
+
+    Returns:
+        List of (column, y) tuples, column counted from 0
+    """
+    rng = random.Random(f"{seed}:{index}:{stream}")
+    blocks = []
+    top = index * CHUNK_ROWS
+    for y in range(top, top + CHUNK_ROWS):
+        if rng.random() >= ROW_CHANCE:
+            continue
+        span = rng.choice((1, 2, 3))
+        start = rng.randint(0, width - span)
+        if y <= -CHUNK_CLEAR_ROWS:
+            blocks.extend((start + i, y) for i in range(span))
+    return blocks
+
+
+class ChunkedWorld:
+    """
+    Keeps the obstacles of the chunks near the cameras loaded
+
+    Chunks are loaded when a camera comes within a chunk of them and
+    dropped once every camera has passed them, so the number of stored
+    blocks depends on the distance between the players, never on how far
+    they have climbed. With mirrored set, every pane gets the same chunk
+    pattern so both players race the same course.
+    """
+
+    def __init__(self, obstacles: Obstacles, panes, seed: int, mirrored: bool = True):
+        self.obstacles = obstacles
+        self.panes = list(panes)
+        self.seed = seed
+        self.mirrored = mirrored
+        self.loaded = set()
+        # Rows the world has been moved down by in rebases; chunk i is
+        # generated as chunk i - offset // CHUNK_ROWS was before them
+        self.offset = 0
+        self._width = min(pane.x1 - pane.x0 + 1 for pane in self.panes)
+
+    def _load(self, index: int):
+        """Add the blocks of a chunk to every pane"""
+        offset = self.offset
+        generated = index - offset // CHUNK_ROWS
+        for i, pane in enumerate(self.panes):
+            if self.mirrored:
+                blocks = generate_chunk(self.seed, generated, self._width)
+            else:
+                width = pane.x1 - pane.x0 + 1
+                blocks = generate_chunk(self.seed, generated, width, stream=i)
+            rows = {}
+            for column, y in blocks:
+                rows.setdefault(y + offset, []).append(pane.x0 + column)
+            self.obstacles.add_rows(rows.items())
+        self.loaded.add(index)
+
+    def update(self, camera_top: float, camera_bottom: float):
+        """
+        Load the chunks the cameras are approaching and drop passed ones
+
+        Args:
+            camera_top: Lowest camera y (the leading player's view)
+            camera_bottom: Highest camera y (the trailing player's view)
+        """
+        first = math.floor((camera_top - CHUNK_ROWS) / CHUNK_ROWS)
+        last = math.floor((camera_bottom + GRID_H + 5) / CHUNK_ROWS)
+
+        behind = [index for index in self.loaded if index > last]
+        if behind:
+            self.obstacles.cleanup((last + 1) * CHUNK_ROWS)
+            self.loaded.difference_update(behind)
+
+        for index in range(first, last + 1):
+            if index not in self.loaded:
+                self._load(index)
+
+    def shift(self, dy: int):
+        """
+        Move the world down by dy rows, a whole number of chunks
+
+        The loaded chunks are renumbered; their blocks are moved with the
+        Obstacles themselves.
+
+        Args:
+            dy: Rows to add to every y, a multiple of CHUNK_ROWS
+        """
+        if dy % CHUNK_ROWS:
+            raise ValueError(f"rebase by {dy} rows is not a whole number of chunks")
+        self.offset += dy
+        self.loaded = {index + dy // CHUNK_ROWS for index in self.loaded}
+
+    def snapshot(self) -> tuple:
+        """
+        Capture the world settings and loaded chunks
+
+        Returns:
+            (seed, mirrored, loaded chunk indices, offset) tuple
+        """
+        return (self.seed, self.mirrored, tuple(sorted(self.loaded)), self.offset)
+
+    def restore(self, state: tuple):
+        """
+        Load a state produced by snapshot()
+
+        The blocks themselves are restored with the Obstacles snapshot.
+        """
+        self.seed, self.mirrored, loaded, self.offset = state
+        self.loaded = set(loaded)
@@ -0,0 +1,311 @@
+"""
+Entity Store - obstacles and apples, indexed by cell and row
+"""
+
+from model.pane import column_owners
+from model.row_index import RowIndex
+
+# Entity kinds
+OBSTACLE = 1
+APPLE = 2
+KINDS = (OBSTACLE, APPLE)
+OTHER = {OBSTACLE: APPLE, APPLE: OBSTACLE}
+
+
+class EntityStore:
+    """
+    Every obstacle and apple of a match, in one set of indexes
+
+    For each kind there is a dict from cell to golden flag, a row index
+    over the whole world and one row index per pane, whose buckets are
+    dicts from x to golden flag. Obstacles are never golden. Collision is
+    one cell lookup per head, cleanup drops whole rows from the row
+    indexes and culling takes the buckets of the rows on screen, so no
+    pass walks the entities off screen. The indexes are the store: an
+    entity's position is its key, its pane follows from its column and
+    its kind from the index it is filed under.
+
+    Each pane also counts the cells of every row that hold an entity of
+    any kind, kept up to date by every add and removal, so free cells can
+    be sampled from the counts instead of from the entities.
+
+    Once track_changes() has been called, every add and removal also notes
+    what the cell held before it was first touched, so a consumer can take
+    the cells that changed since it last looked without comparing whole
+    sets. clear() skips that and bumps generation instead.
+    """
+
+    def __init__(self, panes=()):
+        self.panes = list(panes)
+        self._owners = column_owners(self.panes)
+
+        self.cells = {kind: {} for kind in KINDS}
+        self.rows = {kind: RowIndex(dict) for kind in KINDS}
+        self.pane_rows = {kind: [RowIndex(dict) for _ in self.panes] for kind in KINDS}
+        # Per pane, row y to the number of its cells holding anything
+        self.occupancy = [{} for _ in self.panes]
+        # Bumped by clear(), which leaves the change journal behind
+        self.generation = 0
+        # Per kind, cell to what it held before its first change since the
+        # last take_changes(): golden flag, or None if empty; None when
+        # nothing tracks changes
+        self._journal = None
+
+    def __len__(self) -> int:
+        """Number of live entities"""
+        return sum(len(cells) for cells in self.cells.values())
+
+    def pane_index(self, pane) -> int:
+        """Get the index of a pane, for rows_in lookups"""
+        return self._owners[pane.x0]
+
+    def pane_of(self, x: int):
+        """Get the index of the pane containing column x, or None"""
+        return self._owners.get(x)
+
+    def occupancy_in(self, pane) -> dict:
+        """Get one pane's occupied cell count of every non-empty row"""
+        return self.occupancy[self._owners[pane.x0]]
+
+    def add(self, kind: int, x: int, y: int, golden: bool = False) -> bool:
+        """
+        Add an entity
+
+        Args:
+            kind: OBSTACLE or APPLE
+            x: X coordinate
+            y: Y coordinate
+            golden: Golden flag, for apples
+
+        Returns:
+            False if the cell already holds an entity of this kind
+        """
+        cells = self.cells[kind]
+        cell = (x, y)
+        if cell in cells:
+            return False
+        golden = bool(golden)
+        cells[cell] = golden
+        if self._journal is not None:
+            self._journal[kind].setdefault(cell, None)
+        self.rows[kind].bucket(y)[x] = golden
+        pane = self._owners.get(x)
+        if pane is not None:
+            self.pane_rows[kind][pane].bucket(y)[x] = golden
+            if cell not in self.cells[OTHER[kind]]:
+                counts = self.occupancy[pane]
+                counts[y] = counts.get(y, 0) + 1
+        return True
+
+    def add_rows(self, kind: int, rows):
+        """
+        Add many entities of one kind, none golden, row by row
+
+        Args:
+            kind: OBSTACLE or APPLE
+            rows: (y, xs) pairs; cells already holding this kind are skipped
+        """
+        cells = self.cells[kind]
+        other = self.cells[OTHER[kind]]
+        world_rows = self.rows[kind]
+        pane_rows = self.pane_rows[kind]
+        occupancy = self.occupancy
+        owners = self._owners
+        journal = self._journal[kind] if self._journal is not None else None
+        for y, xs in rows:
+            world_bucket = None
+            bucket_pane = None
+            for x in xs:
+                cell = (x, y)
+                if cell in cells:
+                    continue
+                cells[cell] = False
+                if journal is not None:
+                    journal.setdefault(cell, None)
+                if world_bucket is None:
+                    world_bucket = world_rows.bucket(y)
+                world_bucket[x] = False
+                pane = owners.get(x)
+                if pane is not None:
+                    # xs usually come sorted, so each pane's are one run
+                    if pane != bucket_pane:
+                        bucket_pane = pane
+                        pane_bucket = pane_rows[pane].bucket(y)
+                    pane_bucket[x] = False
+                    if cell not in other:
+                        counts = occupancy[pane]
+                        counts[y] = counts.get(y, 0) + 1
+
+    def remove(self, kind: int, pos: tuple):
+        """
+        Remove the entity of a kind at a cell, if any
+
+        Args:
+            kind: OBSTACLE or APPLE
+            pos: (x, y) tuple
+
+        Returns:
+            Golden flag of the removed entity, or None if the cell was empty
+        """
+        golden = self.cells[kind].pop(pos, None)
+        if golden is None:
+            return None
+        if self._journal is not None:
+            self._journal[kind].setdefault(pos, golden)
+        x, y = pos
+        indexes = [self.rows[kind]]
+        pane = self._owners.get(x)
+        if pane is not None:
+            indexes.append(self.pane_rows[kind][pane])
+            if pos not in self.cells[OTHER[kind]]:
+                self._vacate(pane, y, 1)
+        for rows in indexes:
+            row = rows.get(y)
+            del row[x]
+            if not row:
+                rows.discard_row(y)
+        return golden
+
+    def cull(self, kind: int, pane, y_min, y_max) -> list:
+        """
+        Get one pane's entities of a kind within a y-range
+
+        Args:
+            kind: OBSTACLE or APPLE
+            pane: Pane to look in
+            y_min: Minimum y coordinate (inclusive)
+            y_max: Maximum y coordinate (inclusive)
+
+        Returns:
+            List of (x, y, golden) tuples, in ascending row order
+        """
+        rows = self.pane_rows[kind][self._owners[pane.x0]]
+        return [
+            (x, y, golden)
+            for y, row in rows.rows_between(y_min, y_max)
+            for x, golden in row.items()
+        ]
+
+    def drop_from(self, kind: int, y) -> int:
+        """
+        Remove every entity of a kind at or below y on screen (world y >= y)
+
+        Returns:
+            Number of entities removed
+        """
+        # Most calls are from every tick's cleanup and find nothing to drop
+        bounds = self.rows[kind].bounds()
+        if bounds is None or bounds[1] < y:
+            return 0
+        for rows in self.pane_rows[kind]:
+            rows.drop_from(y)
+        return self._drop_cells(kind, self.rows[kind].drop_from(y))
+
+    def drop_through(self, kind: int, y) -> int:
+        """
+        Remove every entity of a kind at or above y on screen (world y <= y)
+
+        Returns:
+            Number of entities removed
+        """
+        bounds = self.rows[kind].bounds()
+        if bounds is None or bounds[0] > y:
+            return 0
+        for rows in self.pane_rows[kind]:
+            rows.drop_through(y)
+        return self._drop_cells(kind, self.rows[kind].drop_through(y))
+
+    def clear(self, kind: int):
+        """Remove every entity of a kind, as a new generation"""
+        self.generation += 1
+        if self._journal is not None:
+            self._journal[kind].clear()
+        cells = self.cells[kind]
+        other = self.cells[OTHER[kind]]
+        occupancy = self.occupancy
+        owners = self._owners
+        if len(other) < len(cells):
+            # Cheaper to count the other kind's cells again from nothing
+            for counts in occupancy:
+                counts.clear()
+            for x, y in other:
+                pane = owners.get(x)
+                if pane is not None:
+                    counts = occupancy[pane]
+                    counts[y] = counts.get(y, 0) + 1
+        else:
+            for cell in cells:
+                pane = owners.get(cell[0])
+                if pane is not None and cell not in other:
+                    counts = occupancy[pane]
+                    y = cell[1]
+                    left = counts[y] - 1
+                    if left:
+                        counts[y] = left
+                    else:
+                        del counts[y]
+        cells.clear()
+        self.rows[kind].clear()
+        for rows in self.pane_rows[kind]:
+            rows.clear()
+
+    def track_changes(self):
+        """Start noting changes for take_changes(); a no-op if already on"""
+        if self._journal is None:
+            self._journal = {kind: {} for kind in KINDS}
+
+    def take_changes(self, kind: int) -> tuple:
+        """
+        Get the cells of a kind that changed since the last call, and
+        start over
+
+        Only valid while generation is unchanged since that call.
+
+        Returns:
+            (added, removed): cell to golden flag of every entity that is
+            new or changed its flag, and the cells left empty
+        """
+        journal = self._journal[kind]
+        self._journal[kind] = {}
+        cells = self.cells[kind]
+        added = {}
+        removed = []
+        for cell, before in journal.items():
+            now = cells.get(cell)
+            if now is None:
+                if before is not None:
+                    removed.append(cell)
+            elif now != before:
+                added[cell] = now
+        return added, removed
+
+    def _drop_cells(self, kind: int, removed: list) -> int:
+        """Drop the cells of rows already taken out of the row indexes"""
+        cells = self.cells[kind]
+        other = self.cells[OTHER[kind]]
+        owners = self._owners
+        journal = self._journal[kind] if self._journal is not None else None
+        count = 0
+        for y, row in removed:
+            vacated = {}
+            for x, golden in row.items():
+                cell = (x, y)
+                del cells[cell]
+                if journal is not None:
+                    journal.setdefault(cell, golden)
+                pane = owners.get(x)
+                if pane is not None and cell not in other:
+                    vacated[pane] = vacated.get(pane, 0) + 1
+            for pane, n in vacated.items():
+                self._vacate(pane, y, n)
+            count += len(row)
+        return count
+
+    def _vacate(self, pane: int, y: int, n: int):
+        """Take n cells of a pane's row off its occupancy count"""
+        counts = self.occupancy[pane]
+        left = counts[y] - n
+        if left:
+            counts[y] = left
+        else:
+            del counts[y]
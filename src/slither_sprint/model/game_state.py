@@ -5,88 +5,343 @@ Game State model - contains all game data
 import random
 from model.snake import Snake
 from model.obstacles import Obstacles
+from model.chunked_world import ChunkedWorld
 from model.apple import Apple
-from model.pane import Pane
+from model.apples import Apples
+from model.entity_store import EntityStore
+from model.pane import split_panes
+from model.sim_clock import SimClock
 from config import (
-    PANE1_X0,
-    PANE1_X1,
-    PANE2_X0,
-    PANE2_X1,
-    P1_COLOR,
-    P1_HEAD,
-    P2_COLOR,
-    P2_HEAD,
+    PLAYERS,
+    MAX_PLAYERS,
+    PLAYER_COLORS,
     OBSTACLE_SEED,
     GOLDEN_APPLE_SPAWN_CHANCE,
+    CHUNKED_WORLD,
+    MIRROR_CHUNKS,
+    ENDLESS,
 )
 
 
+class Occupancy:
+    """Read-only view of every cell holding an obstacle or an apple"""
+
+    def __init__(self, obstacles: Obstacles, apples: Apples):
+        self.obstacles = obstacles
+        self.apples = apples
+
+    def __contains__(self, pos) -> bool:
+        return pos in self.obstacles.blocks or pos in self.apples.by_pos
+
+
 class GameState:
     """Contains all game state data"""
 
-    def __init__(self):
-        self.pane1 = Pane(PANE1_X0, PANE1_X1)
-        self.pane2 = Pane(PANE2_X0, PANE2_X1)
+    # Methods a FrameProfiler times, and the phase names it records
+    profiled_phases = {
+        "cleanup_offscreen_items": "cleanup",
+    }
+
+    def __init__(
+        self,
+        seed: int = None,
+        chunked: bool = CHUNKED_WORLD,
+        mirrored: bool = MIRROR_CHUNKS,
+        players: int = PLAYERS,
+        endless: bool = ENDLESS,
+    ):
+        """
+        Args:
+            seed: Seed for the match RNG, or None for a random match
+            chunked: Generate obstacles from a ChunkedWorld instead of
+                seeding them at reset and spawning them ahead of snakes
+            mirrored: With chunked, give every pane the same layout
+            players: Number of snakes, each racing in its own pane
+            endless: Race without a finish line; the world is rebased as
+                the snakes climb so coordinates stay small
+        """
+        if not 2 <= players <= MAX_PLAYERS:
+            raise ValueError(f"players must be from 2 to {MAX_PLAYERS}, not {players}")
+        # Every random draw of a match comes from this generator, so the
+        # same seed and inputs reproduce the same match
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.chunked = chunked
+        self.mirrored = mirrored
+        self.endless = endless
 
-        self.snake1 = None
-        self.snake2 = None
+        # Everything per player is a list in player order: player p owns
+        # panes[p - 1], snakes[p - 1] and cameras[p - 1]
+        self.panes = split_panes(players)
+
+        self.clock = None
+        self.snakes = []
+        self.entities = None
         self.obstacles = None
-        self.apples = []
+        self.world = None
+        self.apples = None
+        self.occupied = None
 
-        self.camera_y_p1 = 0.0
-        self.camera_y_p2 = 0.0
+        self.cameras = [0.0] * players
         self.winner_text = None
         self.minigame_triggered = False
+        # Rows the world has been moved down by in rebases; a y in this
+        # match was y - origin before them
+        self.origin = 0
 
         self.reset()
 
-    def reset(self):
-        """Reset game to initial state"""
+    # Two-player names, kept for the code that only deals with two players
+
+    @property
+    def pane1(self):
+        return self.panes[0]
+
+    @property
+    def pane2(self):
+        return self.panes[1]
+
+    @property
+    def snake1(self):
+        return self.snakes[0]
+
+    @property
+    def snake2(self):
+        return self.snakes[1]
+
+    @property
+    def camera_y_p1(self) -> float:
+        return self.cameras[0]
+
+    @camera_y_p1.setter
+    def camera_y_p1(self, value: float):
+        self.cameras[0] = value
+
+    @property
+    def camera_y_p2(self) -> float:
+        return self.cameras[1]
+
+    @camera_y_p2.setter
+    def camera_y_p2(self, value: float):
+        self.cameras[1] = value
+
+    def _random_pane(self):
+        """Pick a pane uniformly with one draw from the match RNG"""
+        # The same draw as the two-player "random() < 0.5" choice, so
+        # two-player seeds keep producing the same matches
+        panes = self.panes
+        return panes[int(self.rng.random() * len(panes))]
+
+    def reset(self, seed: int = None):
+        """
+        Reset game to initial state
+
+        Args:
+            seed: Reseed the match RNG first; otherwise the new match
+                continues the current random stream
+        """
+        if seed is not None:
+            self.seed = seed
+            self.rng.seed(seed)
+        rng = self.rng
+
+        # Simulation time restarts with every match
+        self.clock = SimClock()
+
         # Create snakes
-        self.snake1 = Snake(
-            self.pane1, (self.pane1.x0 + self.pane1.x1) // 2, 0, P1_COLOR, P1_HEAD, "P1"
-        )
-        self.snake2 = Snake(
-            self.pane2, (self.pane2.x0 + self.pane2.x1) // 2, 0, P2_COLOR, P2_HEAD, "P2"
-        )
+        self.snakes = [
+            Snake(
+                pane,
+                (pane.x0 + pane.x1) // 2,
+                0,
+                body_col,
+                head_col,
+                f"P{i + 1}",
+                self.clock,
+            )
+            for i, (pane, (body_col, head_col)) in enumerate(
+                zip(self.panes, PLAYER_COLORS)
+            )
+        ]
+
+        # Obstacles and apples share one entity store
+        self.entities = EntityStore(self.panes)
 
         # Create obstacles
-        self.obstacles = Obstacles()
-        for _ in range(OBSTACLE_SEED):
-            x = self.pane1.rand_x() if random.random() < 0.5 else self.pane2.rand_x()
-            y = random.randint(-80, -30)
-            self.obstacles.add(x, y)
+        self.obstacles = Obstacles(self.panes, self.entities)
+        if self.chunked:
+            self.world = ChunkedWorld(
+                self.obstacles,
+                self.panes,
+                rng.randrange(2**32),
+                self.mirrored,
+            )
+            self.world.update(0.0, 0.0)
+        else:
+            self.world = None
+            for _ in range(OBSTACLE_SEED):
+                x = self._random_pane().rand_x(rng)
+                y = rng.randint(-80, -30)
+                self.obstacles.add(x, y)
 
         # Create initial apples
-        self.apples = []
+        self.apples = Apples(self.panes, self.entities)
+        self.occupied = Occupancy(self.obstacles, self.apples)
         for _ in range(10):
-            pane = self.pane1 if random.random() < 0.5 else self.pane2
-            occupied = self.obstacles.blocks.copy()
-            pos = pane.get_empty_cell(occupied, -100, -10)
+            pane = self._random_pane()
+            counts = self.entities.occupancy_in(pane)
+            pos = pane.get_free_cell(counts, self.occupied, -100, -10, rng)
             if pos:
-                self.apples.append(Apple(pos[0], pos[1]))
+                self.apples.add(Apple(pos[0], pos[1]))
 
-        # Reset camera and state
-        self.camera_y_p1 = 0.0
-        self.camera_y_p2 = 0.0
+        # Reset cameras and state
+        self.cameras = [0.0] * len(self.panes)
         self.winner_text = None
         self.minigame_triggered = False
+        self.origin = 0
+
+    def snapshot(self) -> tuple:
+        """
+        Capture the whole match as nested immutable tuples
+
+        Much cheaper than deep-copying the state, so lookahead and rollback
+        can branch the world several times per frame. Snapshots share no
+        mutable objects with the state and can be restored any number of
+        times.
+
+        Returns:
+            Tuple accepted by restore()
+        """
+        return (
+            self.rng.getstate(),
+            self.clock.now_ms,
+            tuple(snake.snapshot() for snake in self.snakes),
+            self.obstacles.snapshot(),
+            self.apples.snapshot(),
+            tuple(self.cameras),
+            self.winner_text,
+            self.minigame_triggered,
+            self.world.snapshot() if self.world is not None else None,
+            self.endless,
+            self.origin,
+        )
+
+    def restore(self, state: tuple):
+        """
+        Return the match to a state produced by snapshot()
+
+        The state is loaded in place, so the snakes, obstacles and apples
+        stay the same objects and references to them remain valid.
+
+        Args:
+            state: Tuple returned by snapshot() on a state with the same
+                number of players
+        """
+        (
+            rng_state,
+            now_ms,
+            snakes,
+            obstacles,
+            apples,
+            cameras,
+            winner_text,
+            minigame_triggered,
+            world,
+            endless,
+            origin,
+        ) = state
+        if len(snakes) != len(self.snakes):
+            raise ValueError(
+                f"snapshot has {len(snakes)} players, this match has {len(self.snakes)}"
+            )
+        self.endless = endless
+        self.origin = origin
+        self.rng.setstate(rng_state)
+        self.clock.now_ms = now_ms
+        for snake, snake_state in zip(self.snakes, snakes):
+            snake.restore(snake_state)
+        self.cameras[:] = cameras
+        self.winner_text = winner_text
+        self.minigame_triggered = minigame_triggered
+        self.obstacles.restore(obstacles)
+        self.apples.restore(apples)
+
+        self.chunked = world is not None
+        if world is None:
+            self.world = None
+        else:
+            if self.world is None:
+                self.world = ChunkedWorld(self.obstacles, self.panes, 0)
+            self.world.restore(world)
+            self.mirrored = self.world.mirrored
 
     def spawn_apple(self):
         """Spawn a new apple in a random pane"""
-        pane = self.pane1 if random.random() < 0.5 else self.pane2
-        occupied = self.obstacles.blocks.copy()
-        occupied.update((a.x, a.y) for a in self.apples)
-        furthest_y = min(self.snake1.head[1], self.snake2.head[1])
-        pos = pane.get_empty_cell(occupied, furthest_y - 60, furthest_y - 10)
+        rng = self.rng
+        pane = self._random_pane()
+        furthest_y = min(snake.head[1] for snake in self.snakes)
+        y_min, y_max = furthest_y - 60, furthest_y - 10
+        counts = self.entities.occupancy_in(pane)
+        pos = pane.get_free_cell(counts, self.occupied, y_min, y_max, rng)
         if pos:
-            is_golden = random.random() < GOLDEN_APPLE_SPAWN_CHANCE
-            self.apples.append(Apple(pos[0], pos[1], is_golden))
+            is_golden = rng.random() < GOLDEN_APPLE_SPAWN_CHANCE
+            self.apples.add(Apple(pos[0], pos[1], is_golden))
+
+    def rebase(self, dy: int):
+        """
+        Move the whole world down by dy rows
+
+        Snakes, cameras, obstacles, apples and chunks all move together,
+        so nothing changes on screen or in play, only the numbers.
+        Obstacles are refilled, which bumps their generation and makes
+        cached views start over.
+
+        Args:
+            dy: Rows to add to every y; a multiple of CHUNK_ROWS when the
+                world is chunked
+        """
+        if self.world is not None:
+            self.world.shift(dy)
+        for snake in self.snakes:
+            snake.shift(dy)
+        self.cameras[:] = [camera + dy for camera in self.cameras]
+        self.obstacles.shift(dy)
+        self.apples.shift(dy)
+        self.origin += dy
+
+    def _tracked_cameras(self) -> list:
+        """
+        Cameras whose surroundings are kept loaded
+
+        In endless mode a crashed snake's camera stops following the race,
+        so only the cameras of snakes still climbing count; otherwise the
+        world between a crash site and the leader would never be dropped.
+        """
+        if not self.endless:
+            return self.cameras
+        live = [
+            camera for camera, snake in zip(self.cameras, self.snakes) if snake.alive
+        ]
+        return live or self.cameras
+
+    def update_world(self):
+        """Load and drop chunks around the cameras, if the world is chunked"""
+        if self.world is not None:
+            cameras = self._tracked_cameras()
+            self.world.update(min(cameras), max(cameras))
 
     def cleanup_offscreen_items(self):
         """Remove off-screen obstacles and apples"""
-        screen_bottom = max(self.camera_y_p1, self.camera_y_p2) + 35  # GRID_H + 5
-        self.obstacles.cleanup(screen_bottom)
+        cameras = self._tracked_cameras()
+        screen_bottom = max(cameras) + 35  # GRID_H + 5
+
+        # A chunked world drops whole chunks itself in update_world
+        if self.world is None:
+            self.obstacles.cleanup(screen_bottom)
 
-        min_camera = min(self.camera_y_p1, self.camera_y_p2)
-        self.apples = [a for a in self.apples if a.y > min_camera - 5]
+        min_camera = min(cameras)
+        self.apples.cleanup(min_camera - 5)
+        if self.endless:
+            # Apples left behind would otherwise fill the apple limit
+            # for good over a long race
+            self.apples.cleanup_below(screen_bottom)
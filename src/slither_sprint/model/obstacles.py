@@ -2,12 +2,34 @@
 Obstacles model - manages obstacle blocks
 """
 
+from model.entity_store import EntityStore, OBSTACLE
+from model.row_index import RowIndex
+
 
 class Obstacles:
-    """Manages obstacle blocks in the game world"""
+    """
+    Manages obstacle blocks in the game world
+
+    Blocks are OBSTACLE entities of an EntityStore, which may be shared
+    with the apples. Besides the row index over the whole world, each pane
+    keeps its own row index, so drawing or planning for one pane only looks
+    at that pane's blocks however many panes there are.
+    """
 
-    def __init__(self):
-        self.blocks = set()
+    def __init__(self, panes=(), store: EntityStore = None):
+        self.store = store if store is not None else EntityStore(panes)
+        self.panes = self.store.panes
+        # Cell to golden flag, always False; iterating gives the cells
+        self.blocks = self.store.cells[OBSTACLE]
+        self.rows = self.store.rows[OBSTACLE]
+        self.pane_rows = self.store.pane_rows[OBSTACLE]
+        # Bumped whenever the blocks are replaced wholesale, so views that
+        # cache what they drew know to start over
+        self.generation = 0
+
+    def rows_in(self, pane) -> RowIndex:
+        """Get the row index of one pane's blocks"""
+        return self.pane_rows[self.store.pane_index(pane)]
 
     def add(self, x: int, y: int):
         """
@@ -17,7 +39,26 @@ class Obstacles:
             x: X coordinate
             y: Y coordinate
         """
-        self.blocks.add((x, y))
+        self.store.add(OBSTACLE, x, y)
+
+    def add_rows(self, rows):
+        """
+        Add many obstacle blocks, row by row
+
+        Args:
+            rows: (y, xs) pairs
+        """
+        self.store.add_rows(OBSTACLE, rows)
+
+    def remove(self, x: int, y: int):
+        """
+        Remove the obstacle block at a position, if any
+
+        Args:
+            x: X coordinate
+            y: Y coordinate
+        """
+        self.store.remove(OBSTACLE, (x, y))
 
     def collides(self, pos: tuple) -> bool:
         """
@@ -31,6 +72,51 @@ class Obstacles:
         """
         return pos in self.blocks
 
+    def in_rows(self, y_min, y_max):
+        """
+        Iterate obstacle blocks within a y-range
+
+        Args:
+            y_min: Minimum y coordinate (inclusive)
+            y_max: Maximum y coordinate (inclusive)
+
+        Yields:
+            (x, y) tuples
+        """
+        for y, xs in self.rows.rows_between(y_min, y_max):
+            for x in xs:
+                yield (x, y)
+
+    def in_pane(self, pane, y_min, y_max):
+        """
+        Iterate the blocks of one pane within a y-range
+
+        Args:
+            pane: Pane to list
+            y_min: Minimum y coordinate (inclusive)
+            y_max: Maximum y coordinate (inclusive)
+
+        Yields:
+            (x, y) tuples
+        """
+        for y, xs in self.rows_in(pane).rows_between(y_min, y_max):
+            for x in xs:
+                yield (x, y)
+
+    def visible(self, pane, y_min, y_max) -> list:
+        """
+        Get one pane's blocks within a y-range, for culling
+
+        Args:
+            pane: Pane to list
+            y_min: Minimum y coordinate (inclusive)
+            y_max: Maximum y coordinate (inclusive)
+
+        Returns:
+            List of (x, y, False) tuples
+        """
+        return self.store.cull(OBSTACLE, pane, y_min, y_max)
+
     def cleanup(self, screen_bottom: int):
         """
         Remove obstacles that are off-screen
@@ -38,4 +124,34 @@ class Obstacles:
         Args:
             screen_bottom: Y coordinate of screen bottom
         """
-        self.blocks = {(x, y) for x, y in self.blocks if y < screen_bottom}
+        self.store.drop_from(OBSTACLE, screen_bottom)
+
+    def shift(self, dy: int):
+        """
+        Move every block down by dy rows, for a world rebase
+
+        Args:
+            dy: Rows to add to each block's y
+        """
+        self.restore(tuple((y + dy, xs) for y, xs in self.snapshot()))
+
+    def snapshot(self) -> tuple:
+        """
+        Capture every block
+
+        Returns:
+            Tuple of (y, xs) pairs in ascending y order, xs being a sorted
+            tuple so equal worlds give equal snapshots
+        """
+        return tuple((y, tuple(sorted(xs))) for y, xs in self.rows.items())
+
+    def restore(self, state: tuple):
+        """
+        Replace every block with a state produced by snapshot()
+
+        Args:
+            state: Tuple of (y, xs) pairs in ascending y order
+        """
+        self.store.clear(OBSTACLE)
+        self.store.add_rows(OBSTACLE, state)
+        self.generation += 1
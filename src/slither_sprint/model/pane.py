@@ -4,6 +4,7 @@ Pane model - represents a player's game area
 
 import random
 from dataclasses import dataclass
+from config import GRID_W
 
 
 @dataclass
@@ -17,11 +18,11 @@ class Pane:
         """Check if x coordinate is within this pane"""
         return self.x0 <= x <= self.x1
 
-    def rand_x(self) -> int:
+    def rand_x(self, rng=random) -> int:
         """Get a random x coordinate within this pane"""
-        return random.randint(self.x0, self.x1)
+        return rng.randint(self.x0, self.x1)
 
-    def get_empty_cell(self, occupied_positions, y_min, y_max):
+    def get_empty_cell(self, occupied_positions, y_min, y_max, rng=random):
         """
         Find a random empty cell in this pane
 
@@ -29,15 +30,92 @@ class Pane:
             occupied_positions: Set of (x, y) tuples that are occupied
             y_min: Minimum y coordinate
             y_max: Maximum y coordinate
+            rng: Random number generator to draw from
 
         Returns:
             (x, y) tuple or None if no empty cell found
         """
         attempts = 0
         while attempts < 50:
-            x = self.rand_x()
-            y = random.randint(y_min, y_max)
+            x = self.rand_x(rng)
+            y = rng.randint(y_min, y_max)
             if (x, y) not in occupied_positions:
                 return (x, y)
             attempts += 1
         return None
+
+    def get_free_cell(self, row_counts, occupied, y_min, y_max, rng=random):
+        """
+        Pick a uniformly random free cell in this pane
+
+        Unlike get_empty_cell this never gives up early: it totals the free
+        cells of the window from per-row occupied counts, draws one index
+        among them, finds its row from the counts and its column by
+        scanning that one row. The cost depends only on the window's size,
+        not on how many entities there are, and it returns None only if
+        the window is full.
+
+        Args:
+            row_counts: Mapping of row y to the number of occupied cells
+                of this pane in that row, for rows that are not empty
+            occupied: Container of the occupied (x, y) cells
+            y_min: Minimum y coordinate
+            y_max: Maximum y coordinate
+            rng: Random number generator to draw from
+
+        Returns:
+            (x, y) tuple or None if every cell in the window is occupied
+        """
+        width = self.x1 - self.x0 + 1
+        rows = range(y_min, y_max + 1)
+        get = row_counts.get
+        taken = [get(y, 0) for y in rows]
+        total = width * len(rows) - sum(taken)
+        if total <= 0:
+            return None
+
+        # The k-th free cell in row-major order
+        k = rng.randrange(total)
+        for y, count in zip(rows, taken):
+            free = width - count
+            if k < free:
+                break
+            k -= free
+        if not count:
+            return (self.x0 + k, y)
+        for x in range(self.x0, self.x1 + 1):
+            if (x, y) not in occupied:
+                if k == 0:
+                    return (x, y)
+                k -= 1
+
+
+def split_panes(players: int, width: int = GRID_W) -> list:
+    """
+    Cut the grid into one pane per player, side by side
+
+    Panes differ in width by at most one column; two players get the
+    PANE1/PANE2 columns from config.
+
+    Args:
+        players: Number of panes
+        width: Number of grid columns to share out
+
+    Returns:
+        List of Pane objects, left to right
+    """
+    bounds = [i * width // players for i in range(players + 1)]
+    return [Pane(bounds[i], bounds[i + 1] - 1) for i in range(players)]
+
+
+def column_owners(panes) -> dict:
+    """
+    Map every column to the index of the pane that contains it
+
+    Args:
+        panes: Sequence of Pane objects
+
+    Returns:
+        Dict of column x to index into panes
+    """
+    return {x: i for i, pane in enumerate(panes) for x in range(pane.x0, pane.x1 + 1)}
@@ -0,0 +1,107 @@
+"""
+Row index - groups world items by row with sorted row bounds
+"""
+
+from bisect import bisect_left, bisect_right, insort
+
+
+class RowIndex:
+    """
+    Maps world rows to buckets of items, keeping the occupied rows sorted
+
+    Rows are only ever dropped from the ends of the sorted range (the rows
+    that scrolled off the top or bottom of the screen), so cleanup touches
+    just the rows being removed.
+    """
+
+    def __init__(self, bucket_type=set):
+        self.bucket_type = bucket_type
+        self.rows = {}
+        self._ys = []  # occupied rows, ascending
+
+    def __len__(self) -> int:
+        return len(self._ys)
+
+    def get(self, y: int):
+        """Get the bucket for a row, or None if the row is empty"""
+        return self.rows.get(y)
+
+    def bucket(self, y: int):
+        """Get the bucket for a row, creating it if needed"""
+        bucket = self.rows.get(y)
+        if bucket is None:
+            bucket = self.rows[y] = self.bucket_type()
+            insort(self._ys, y)
+        return bucket
+
+    def discard_row(self, y: int):
+        """Remove a row and its bucket if present"""
+        if self.rows.pop(y, None) is not None:
+            del self._ys[bisect_left(self._ys, y)]
+
+    def clear(self):
+        """Remove every row"""
+        self.rows.clear()
+        self._ys.clear()
+
+    def bounds(self):
+        """
+        Get the lowest and highest occupied rows
+
+        Returns:
+            (min_y, max_y) tuple or None if empty
+        """
+        if not self._ys:
+            return None
+        return self._ys[0], self._ys[-1]
+
+    def rows_between(self, y_min, y_max):
+        """
+        Iterate rows in a y-range
+
+        Args:
+            y_min: Minimum y coordinate (inclusive)
+            y_max: Maximum y coordinate (inclusive)
+
+        Yields:
+            (y, bucket) pairs in ascending y order
+        """
+        ys = self._ys
+        for i in range(bisect_left(ys, y_min), bisect_right(ys, y_max)):
+            y = ys[i]
+            yield y, self.rows[y]
+
+    def items(self):
+        """
+        Iterate every row
+
+        Yields:
+            (y, bucket) pairs in ascending y order
+        """
+        rows = self.rows
+        for y in self._ys:
+            yield y, rows[y]
+
+    def drop_from(self, y) -> list:
+        """
+        Remove every row at or below y on screen (world y >= y)
+
+        Returns:
+            List of removed (y, bucket) pairs
+        """
+        i = bisect_left(self._ys, y)
+        removed = [(row, self.rows.pop(row)) for row in self._ys[i:]]
+        del self._ys[i:]
+        return removed
+
+    def drop_through(self, y) -> list:
+        """
+        Remove every row at or above y on screen (world y <= y)
+
+        Returns:
+            List of removed (y, bucket) pairs
+        """
+        i = bisect_right(self._ys, y)
+        removed = [(row, self.rows.pop(row)) for row in self._ys[:i]]
+        del self._ys[:i]
+        return removed
@@ -0,0 +1,23 @@
+"""
+Simulation clock - millisecond time source advanced by the game loop
+"""
+
+
+class SimClock:
+    """Millisecond clock that only moves when the simulation advances it"""
+
+    def __init__(self, start_ms: int = 0):
+        self.now_ms = start_ms
+
+    def ticks(self) -> int:
+        """Get the current simulation time in milliseconds"""
+        return self.now_ms
+
+    def advance(self, dt: int):
+        """
+        Move the clock forward
+
+        Args:
+            dt: Elapsed time in milliseconds
+        """
+        self.now_ms += dt
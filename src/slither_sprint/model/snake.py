@@ -2,8 +2,9 @@
 Snake model - represents a player's snake
 """
 
-import pygame
+from collections import Counter, deque
 from model.pane import Pane
+from model.sim_clock import SimClock
 from model.power_up import PowerUpType
 from config import (
     SNAKE_LEN,
@@ -17,9 +18,24 @@ from config import (
 class Snake:
     """Represents a player's snake with movement and power-up logic"""
 
-    def __init__(self, pane: Pane, x: int, y: int, body_col, head_col, name: str):
+    def __init__(
+        self,
+        pane: Pane,
+        x: int,
+        y: int,
+        body_col,
+        head_col,
+        name: str,
+        clock: SimClock = None,
+        length: int = SNAKE_LEN,
+    ):
         self.pane = pane
-        self.body = [(x, y + i) for i in range(SNAKE_LEN)]
+        self.clock = clock if clock is not None else SimClock()
+        self.length = length
+        # Head first; the counter maps each occupied cell to how many
+        # segments sit on it so occupancy checks never scan the body
+        self.body = deque((x, y + i) for i in range(length))
+        self.cells = Counter(self.body)
         self.dx, self.dy = 0, -1
         self.body_col = body_col
         self.head_col = head_col
@@ -37,6 +53,109 @@ class Snake:
         """Get the head position of the snake"""
         return self.body[0]
 
+    def occupies(self, pos: tuple) -> bool:
+        """
+        Check if any segment of this snake is on a cell
+
+        Args:
+            pos: (x, y) tuple to check
+
+        Returns:
+            True if the cell is part of the body
+        """
+        return pos in self.cells
+
+    def grow(self, segments: int = 1):
+        """
+        Lengthen the snake; new segments appear at the tail as it moves
+
+        Args:
+            segments: Number of segments to add
+        """
+        self.length += segments
+
+    def snapshot(self) -> tuple:
+        """
+        Capture the mutable state of the snake
+
+        Pane, colors, name and clock are fixed for a match and left out.
+
+        Returns:
+            Immutable tuple accepted by restore()
+        """
+        return (
+            tuple(self.body),
+            self.length,
+            self.dx,
+            self.dy,
+            self.alive,
+            self.steps,
+            self.apples_collected,
+            self.active_powerup,
+            self.powerup_end_time,
+            self.current_step_ms,
+        )
+
+    def restore(self, state: tuple):
+        """
+        Load a state produced by snapshot()
+
+        Args:
+            state: Tuple returned by snapshot()
+        """
+        (
+            body,
+            self.length,
+            self.dx,
+            self.dy,
+            self.alive,
+            self.steps,
+            self.apples_collected,
+            active_powerup,
+            self.powerup_end_time,
+            self.current_step_ms,
+        ) = state
+        # Replay keyframes store the power-up by value
+        self.active_powerup = PowerUpType(active_powerup)
+        self.set_body(body)
+
+    def move_head(self, head: tuple):
+        """
+        Put the head on a new cell and drop tail segments past the length,
+        without applying any game rules
+
+        Args:
+            head: (x, y) cell for the new head
+        """
+        cells = self.cells
+        self.body.appendleft(head)
+        cells[head] += 1
+        while len(self.body) > self.length:
+            tail = self.body.pop()
+            if cells[tail] == 1:
+                del cells[tail]
+            else:
+                cells[tail] -= 1
+
+    def set_body(self, body):
+        """
+        Replace every segment
+
+        Args:
+            body: (x, y) cells, head first
+        """
+        self.body = deque(body)
+        self.cells = Counter(self.body)
+
+    def shift(self, dy: int):
+        """
+        Move every segment down by dy rows, for a world rebase
+
+        Args:
+            dy: Rows to add to each segment's y
+        """
+        self.set_body([(x, y + dy) for x, y in self.body])
+
     def steer(self, left: bool, right: bool):
         """
         Update steering direction
@@ -67,7 +186,7 @@ class Snake:
         Args:
             powerup_type: Type of power-up to activate
         """
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock.ticks()
         self.active_powerup = powerup_type
 
         if powerup_type == PowerUpType.SPEED_BOOST:
@@ -83,7 +202,7 @@ class Snake:
     def update_powerups(self):
         """Check if power-ups have expired"""
         if self.active_powerup != PowerUpType.NONE:
-            if pygame.time.get_ticks() >= self.powerup_end_time:
+            if self.clock.ticks() >= self.powerup_end_time:
                 self.active_powerup = PowerUpType.NONE
                 self.current_step_ms = self.base_step_ms
 
@@ -106,10 +225,9 @@ class Snake:
             return
 
         # Move snake
-        self.body.insert(0, (nx, ny))
-        while len(self.body) > SNAKE_LEN:
-            self.body.pop()
+        head = (nx, ny)
+        self.move_head(head)
 
         # Check self-collision
-        if self.head in self.body[1:]:
+        if self.cells[head] > 1:
             self.alive = False
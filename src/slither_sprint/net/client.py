@@ -0,0 +1,109 @@
+"""
+Match Client - thin client that steers one snake and mirrors the server
+"""
+
+import asyncio
+import struct
+from controller.replay import encode_steering
+from model.game_state import GameState
+from net.protocol import (
+    JOIN,
+    INPUT,
+    RESTART,
+    WELCOME,
+    STATE,
+    WELCOME_BODY,
+    ProtocolError,
+    apply_state,
+    frame,
+    read_frame,
+)
+
+WAITING_TEXT = "Waiting for an opponent..."
+
+
+class MatchClient:
+    """
+    Connection to a MatchServer
+
+    The client never simulates: game_state is a mirror that receive()
+    keeps in step with the server's match, ready to hand to a Renderer.
+    """
+
+    def __init__(self):
+        self.game_state = GameState(players=2)
+        self.game_state.winner_text = WAITING_TEXT
+        self.player = None
+        self.step_ms = None
+        self.tick = None
+        self.bytes_received = 0
+        self.states_received = 0
+        # Why the server's stream was cut off, if it was malformed
+        self.error = None
+        self._code = None
+        self._reader = None
+        self._writer = None
+
+    async def connect(self, host: str, port: int, room: str = ""):
+        """
+        Connect and join a match
+
+        Args:
+            host: Server address
+            port: Server port
+            room: Room to join, or "" to be paired with anyone
+
+        Raises:
+            ProtocolError: If the server turned the client away
+        """
+        self._reader, self._writer = await asyncio.open_connection(host, port)
+        self._writer.write(frame(JOIN, room.encode()))
+        try:
+            tag, payload = await read_frame(self._reader)
+        except asyncio.IncompleteReadError:
+            raise ProtocolError(f"room {room!r} is full") from None
+        if tag != WELCOME:
+            raise ProtocolError(f"expected welcome, got {tag!r}")
+        self.player, self.step_ms = WELCOME_BODY.unpack(payload)
+
+    def send_steering(self, left: bool, right: bool):
+        """Send the local player's steering if it changed"""
+        code = encode_steering(left, right)
+        if code != self._code:
+            self._code = code
+            self._writer.write(frame(INPUT, bytes((code,))))
+
+    def request_restart(self):
+        """Ask the server for a rematch once the match is over"""
+        self._writer.write(frame(RESTART))
+
+    async def receive(self):
+        """
+        Apply server states to game_state until the connection closes
+
+        A truncated or corrupt message closes the connection and is kept
+        in error; nothing after it could be applied to the mirror.
+        """
+        try:
+            while True:
+                tag, payload = await read_frame(self._reader)
+                if tag != STATE:
+                    raise ProtocolError(f"unexpected message {tag!r}")
+                self.tick = apply_state(self.game_state, payload)
+                self.bytes_received += len(payload)
+                self.states_received += 1
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except (ProtocolError, struct.error, ValueError) as e:
+            # ValueError covers an unknown power-up or undecodable text
+            self.error = f"bad state from server: {e}"
+            self._writer.close()
+
+    async def close(self):
+        """Disconnect from the server"""
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
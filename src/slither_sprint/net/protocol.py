@@ -0,0 +1,277 @@
+"""
+Network protocol - message framing and delta-compressed match state
+
+Every message is a frame: length u32 (little-endian), tag u8, payload.
+
+Client to server:
+
+    b"J" join:     room name, UTF-8 (empty to be paired with anyone)
+    b"I" input:    steering code u8 (see controller.replay.encode_steering)
+    b"R" restart:  no payload, honoured once the match is over
+
+Server to client:
+
+    b"W" welcome:  player u8 (1 or 2), step_ms u16
+    b"S" state:    one simulation tick, see StateEncoder
+
+A state payload is a header (tick u32, flags u8, two cameras f32), one
+record per snake with the cells its head entered, then the obstacles and
+apples added and removed since the previous state. With FLAG_FULL set the
+client must first clear its mirror, and every snake record carries the
+whole body.
+"""
+
+import asyncio
+import struct
+from model.apple import Apple
+from model.entity_store import OBSTACLE, APPLE
+from model.power_up import PowerUpType
+
+FRAME = struct.Struct("<I")
+MAX_FRAME = 1 << 20
+
+JOIN = b"J"
+INPUT = b"I"
+RESTART = b"R"
+WELCOME = b"W"
+STATE = b"S"
+
+WELCOME_BODY = struct.Struct("<BH")
+STATE_HEADER = struct.Struct("<IBff")
+SNAKE_RECORD = struct.Struct("<BBHHH")  # bits, powerup, apples, length, cells
+COUNT = struct.Struct("<H")
+TEXT_LENGTH = struct.Struct("<H")
+APPLE_RECORD = struct.Struct("<hhB")
+
+FLAG_FULL = 1
+FLAG_WINNER = 2
+
+SNAKE_ALIVE = 1
+SNAKE_WHOLE_BODY = 2  # cells are the entire body, not just new heads
+
+
+class ProtocolError(Exception):
+    """Raised when a peer sends a malformed message"""
+
+
+def frame(tag: bytes, payload: bytes = b"") -> bytes:
+    """Wrap a tagged payload in a length-prefixed frame"""
+    return FRAME.pack(len(payload) + 1) + tag + payload
+
+
+async def read_frame(reader: asyncio.StreamReader):
+    """
+    Read one frame
+
+    Returns:
+        (tag, payload) tuple
+
+    Raises:
+        asyncio.IncompleteReadError: If the connection closed
+        ProtocolError: If the frame length is out of range
+    """
+    (length,) = FRAME.unpack(await reader.readexactly(FRAME.size))
+    if not 1 <= length <= MAX_FRAME:
+        raise ProtocolError(f"bad frame length {length}")
+    data = await reader.readexactly(length)
+    return data[:1], data[1:]
+
+
+def _pack_cells(cells) -> bytes:
+    """Pack (x, y) cells as int16 pairs"""
+    flat = [v for cell in cells for v in cell]
+    return struct.pack(f"<{len(flat)}h", *flat)
+
+
+def _unpack_cells(data: bytes, offset: int, count: int):
+    """Inverse of _pack_cells; returns (cells, new offset)"""
+    flat = struct.unpack_from(f"<{2 * count}h", data, offset)
+    return list(zip(flat[::2], flat[1::2])), offset + 4 * count
+
+
+def _pack_cell_list(cells) -> bytes:
+    """Pack (x, y) cells prefixed with their count"""
+    return COUNT.pack(len(cells)) + _pack_cells(cells)
+
+
+def _unpack_cell_list(data: bytes, offset: int):
+    """Inverse of _pack_cell_list; returns (cells, new offset)"""
+    (count,) = COUNT.unpack_from(data, offset)
+    return _unpack_cells(data, offset + COUNT.size, count)
+
+
+class StateEncoder:
+    """
+    Encodes a match as a stream of per-tick deltas
+
+    The encoder remembers what it last sent, which is what every client of
+    the match holds, so one encoded state can be written to all of them.
+    Obstacle and apple deltas come from the entity store's change journal,
+    so a tick costs as much as what changed in it, not as many entities
+    as the match holds. A new store or generation is sent in full.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Forget what was sent; the next state is encoded in full"""
+        self._store = None
+        self._generation = None
+        self._heads = None
+        self._winner_text = None
+        self._full = True
+
+    def encode(self, tick: int, game_state) -> bytes:
+        """
+        Encode the changes since the previous call
+
+        Args:
+            tick: Simulation tick the state belongs to
+            game_state: GameState to encode
+
+        Returns:
+            STATE payload
+        """
+        store = game_state.entities
+        if store is not self._store or store.generation != self._generation:
+            # Replaced wholesale, by a reset, restore or rebase
+            self._full = True
+        full = self._full
+        snakes = (game_state.snake1, game_state.snake2)
+        winner_text = game_state.winner_text
+        flags = FLAG_FULL if full else 0
+        if full or winner_text != self._winner_text:
+            flags |= FLAG_WINNER
+        parts = [
+            STATE_HEADER.pack(
+                tick, flags, game_state.camera_y_p1, game_state.camera_y_p2
+            )
+        ]
+
+        heads = []
+        for i, snake in enumerate(snakes):
+            bits = SNAKE_ALIVE if snake.alive else 0
+            cells = None if full else self._new_cells(snake, self._heads[i])
+            if cells is None:
+                # Head moved further than we can describe; resend the body
+                cells = snake.body
+                bits |= SNAKE_WHOLE_BODY
+            parts.append(
+                SNAKE_RECORD.pack(
+                    bits,
+                    snake.active_powerup.value,
+                    snake.apples_collected,
+                    snake.length,
+                    len(cells),
+                )
+            )
+            parts.append(_pack_cells(cells))
+            heads.append(snake.head)
+        self._heads = heads
+
+        store.track_changes()
+        blocks, unblocked = store.take_changes(OBSTACLE)
+        # An eaten apple can be replaced by a new one at the same cell, and
+        # a changed golden flag counts as added
+        apples, eaten = store.take_changes(APPLE)
+        if full:
+            blocks, unblocked = store.cells[OBSTACLE], ()
+            apples, eaten = store.cells[APPLE], ()
+            self._store = store
+            self._generation = store.generation
+        parts.append(_pack_cell_list(list(blocks)))
+        parts.append(_pack_cell_list(unblocked))
+        parts.append(COUNT.pack(len(apples)))
+        parts.extend(
+            APPLE_RECORD.pack(x, y, is_golden) for (x, y), is_golden in apples.items()
+        )
+        parts.append(_pack_cell_list(eaten))
+
+        if flags & FLAG_WINNER:
+            text = (winner_text or "").encode()
+            parts.append(TEXT_LENGTH.pack(len(text)) + text)
+            self._winner_text = winner_text
+
+        self._full = False
+        return b"".join(parts)
+
+    def _new_cells(self, snake, last_head):
+        """
+        Cells the head entered since last_head, newest first
+
+        Returns:
+            List of cells, or None if last_head is no longer on the body
+        """
+        cells = []
+        for cell in snake.body:
+            if cell == last_head:
+                return cells
+            cells.append(cell)
+        return None
+
+
+def apply_state(game_state, payload: bytes) -> int:
+    """
+    Apply a STATE payload to a mirrored GameState
+
+    Args:
+        game_state: GameState holding the previous states
+        payload: Payload produced by StateEncoder.encode
+
+    Returns:
+        Tick the state belongs to
+    """
+    tick, flags, camera_y_p1, camera_y_p2 = STATE_HEADER.unpack_from(payload)
+    offset = STATE_HEADER.size
+    full = flags & FLAG_FULL
+    game_state.camera_y_p1 = camera_y_p1
+    game_state.camera_y_p2 = camera_y_p2
+    if full:
+        game_state.obstacles.restore(())
+        game_state.apples.restore(())
+
+    for snake in (game_state.snake1, game_state.snake2):
+        bits, powerup, apples_collected, length, count = SNAKE_RECORD.unpack_from(
+            payload, offset
+        )
+        cells, offset = _unpack_cells(payload, offset + SNAKE_RECORD.size, count)
+        snake.alive = bool(bits & SNAKE_ALIVE)
+        snake.active_powerup = PowerUpType(powerup)
+        snake.apples_collected = apples_collected
+        snake.length = length
+        if bits & SNAKE_WHOLE_BODY:
+            snake.set_body(cells)
+        else:
+            for cell in reversed(cells):
+                snake.move_head(cell)
+
+    obstacles = game_state.obstacles
+    added, offset = _unpack_cell_list(payload, offset)
+    removed, offset = _unpack_cell_list(payload, offset)
+    for x, y in removed:
+        obstacles.remove(x, y)
+    for x, y in added:
+        obstacles.add(x, y)
+
+    apples = game_state.apples
+    (count,) = COUNT.unpack_from(payload, offset)
+    offset += COUNT.size
+    added = []
+    for _ in range(count):
+        added.append(APPLE_RECORD.unpack_from(payload, offset))
+        offset += APPLE_RECORD.size
+    removed, offset = _unpack_cell_list(payload, offset)
+    for pos in removed:
+        apples.pop_at(pos)
+    for x, y, is_golden in added:
+        apples.pop_at((x, y))
+        apples.add(Apple(x, y, bool(is_golden)))
+
+    if flags & FLAG_WINNER:
+        (length,) = TEXT_LENGTH.unpack_from(payload, offset)
+        offset += TEXT_LENGTH.size
+        text = payload[offset : offset + length].decode()
+        game_state.winner_text = text or None
+
+    return tick
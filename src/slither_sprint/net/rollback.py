@@ -0,0 +1,286 @@
+"""
+Rollback - input prediction and re-simulation for two-player remote play
+
+Each peer runs the whole match itself from the same seed. Local steering is
+applied at once and sent to the other peer; the remote player's steering
+for ticks that have not arrived yet is predicted by repeating their last
+known input. When a remote input arrives that differs from what was
+predicted, the engine is restored to its snapshot from before that tick
+and the ticks since are simulated again with the real input, within a
+per-tick time budget; what does not fit carries over to the next tick.
+
+Only the headless --latency demo runs sessions, two peers over an
+in-process LoopbackTransport. Online play (--serve / --connect) is
+server-authoritative and does not predict or roll back.
+"""
+
+import heapq
+import random
+import time
+from collections import Counter
+from controller.engine import GameEngine
+from controller.replay import encode_steering, decode_steering
+from config import FIXED_STEP_MS, ROLLBACK_BUDGET_MS
+
+MAX_ROLLBACK = 8  # ticks a peer may run ahead of the other's input
+
+
+class RollbackStats:
+    """Counters describing how often and how deeply a session rolled back"""
+
+    def __init__(self):
+        self.rollbacks = 0
+        self.resim_ticks = 0
+        self.resim_ms = 0.0
+        self.max_resim_ms = 0.0
+        self.last_depth = 0
+        self.max_depth = 0
+        self.depths = Counter()  # rollback depth -> times seen
+        self.stalls = 0  # frames spent waiting for remote input
+        self.budget_ms = 0.0  # re-simulation time allowed per frame
+        self.over_budget = 0  # frames that ran out of it
+        self.carried_ticks = 0  # re-simulation left over at their end, summed
+        self.max_carried = 0
+
+    @property
+    def mean_depth(self) -> float:
+        """Average number of ticks re-simulated per rollback"""
+        return self.resim_ticks / self.rollbacks if self.rollbacks else 0.0
+
+    def record(self, depth: int):
+        """Count one rollback of depth ticks"""
+        self.rollbacks += 1
+        self.resim_ticks += depth
+        self.last_depth = depth
+        self.max_depth = max(self.max_depth, depth)
+        self.depths[depth] += 1
+
+    def spend(self, elapsed_ms: float, carried: int):
+        """Count one frame's re-simulation, with carried ticks left over"""
+        self.resim_ms += elapsed_ms
+        self.max_resim_ms = max(self.max_resim_ms, elapsed_ms)
+        if carried:
+            self.over_budget += 1
+            self.carried_ticks += carried
+            self.max_carried = max(self.max_carried, carried)
+
+    def as_dict(self) -> dict:
+        """Get the counters as a plain dict, for logs and overlays"""
+        return {
+            "rollbacks": self.rollbacks,
+            "resim_ticks": self.resim_ticks,
+            "resim_ms": round(self.resim_ms, 3),
+            "max_resim_ms": round(self.max_resim_ms, 3),
+            "mean_depth": round(self.mean_depth, 2),
+            "max_depth": self.max_depth,
+            "stalls": self.stalls,
+            "budget_ms": round(self.budget_ms, 3),
+            "over_budget": self.over_budget,
+            "carried_ticks": self.carried_ticks,
+            "max_carried": self.max_carried,
+        }
+
+
+class LoopbackTransport:
+    """
+    In-process message link that delivers after a simulated latency
+
+    Endpoints come in pairs from pair(); what one sends, the other receives
+    once latency (plus up to jitter, which can reorder messages) has passed
+    on the shared clock.
+    """
+
+    def __init__(self, clock, latency_ms: float, jitter_ms: float = 0, rng=None):
+        self.clock = clock
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rng = rng if rng is not None else random.Random()
+        self.peer = None
+        self._inbox = []  # heap of (deliver_at, seq, message)
+        self._seq = 0
+
+    @classmethod
+    def pair(cls, clock, latency_ms: float, jitter_ms: float = 0, seed: int = None):
+        """
+        Create two connected endpoints
+
+        Args:
+            clock: Callable returning the current time in milliseconds
+            latency_ms: One-way delay
+            jitter_ms: Extra random delay, up to this much
+            seed: Seed for the jitter
+
+        Returns:
+            (a, b) tuple of endpoints
+        """
+        rng = random.Random(seed)
+        a = cls(clock, latency_ms, jitter_ms, rng)
+        b = cls(clock, latency_ms, jitter_ms, rng)
+        a.peer, b.peer = b, a
+        return a, b
+
+    def send(self, message):
+        """Queue a message for the peer"""
+        delay = self.latency_ms + self.rng.uniform(0, self.jitter_ms)
+        peer = self.peer
+        peer._seq += 1
+        heapq.heappush(peer._inbox, (self.clock() + delay, peer._seq, message))
+
+    def receive(self) -> list:
+        """Get every message that has arrived, oldest first"""
+        now = self.clock()
+        messages = []
+        while self._inbox and self._inbox[0][0] <= now:
+            messages.append(heapq.heappop(self._inbox)[2])
+        return messages
+
+
+class RollbackSession:
+    """
+    Runs one peer's copy of a two-player match with rollback
+
+    The transport only needs send(message) and receive() -> list; messages
+    are (tick, steering code) tuples. Call advance() once per fixed tick
+    with the local player's keys.
+
+    A rollback re-simulates for at most budget_ms per tick. Ticks it has
+    not reached by then are carried into the next tick, which finishes
+    them before simulating anything new, and the session stalls until
+    it has caught up.
+    """
+
+    def __init__(
+        self,
+        engine: GameEngine,
+        local_player: int,
+        transport,
+        max_rollback: int = MAX_ROLLBACK,
+        step_ms: int = FIXED_STEP_MS,
+        budget_ms: float = ROLLBACK_BUDGET_MS,
+    ):
+        self.engine = engine
+        self.local = local_player - 1
+        self.remote = 1 - self.local
+        self.transport = transport
+        self.max_rollback = max_rollback
+        self.step_ms = step_ms
+        self.budget_ms = budget_ms
+        self.stats = RollbackStats()
+        self.stats.budget_ms = budget_ms
+
+        self.tick = 0  # next tick to simulate
+        self.confirmed = -1  # every remote input up to here has arrived
+        self.inputs = ({}, {})  # per player: tick -> steering code
+        self._predicted = {}  # tick -> remote code guessed for it
+        self._snapshots = {}  # tick -> engine snapshot from before it
+        self._resim = None  # next tick to simulate again, while catching up
+
+    @property
+    def behind(self) -> int:
+        """Ticks of a rollback still to be simulated again"""
+        return 0 if self._resim is None else self.tick - self._resim
+
+    def advance(self, left: bool, right: bool) -> bool:
+        """
+        Apply the local player's steering and simulate one tick
+
+        Returns:
+            False if the tick was not simulated because the remote player
+            is more than max_rollback ticks behind, or a rollback has not
+            been simulated through yet; try again next frame
+        """
+        self.poll()
+        if self._resim is not None or self.tick - self.confirmed > self.max_rollback:
+            self.stats.stalls += 1
+            return False
+
+        code = encode_steering(left, right)
+        self.inputs[self.local][self.tick] = code
+        self.transport.send((self.tick, code))
+        self._simulate(self.tick)
+        self.tick += 1
+        return True
+
+    def poll(self):
+        """
+        Take in remote input, roll back if a prediction was wrong, and
+        re-simulate for up to budget_ms
+        """
+        remote = self.inputs[self.remote]
+        rollback_to = None
+        for tick, code in self.transport.receive():
+            remote[tick] = code
+            predicted = self._predicted.pop(tick, None)
+            if predicted is not None and predicted != code:
+                if rollback_to is None or tick < rollback_to:
+                    rollback_to = tick
+
+        previous = self.confirmed
+        while self.confirmed + 1 in remote:
+            self.confirmed += 1
+
+        # Ticks a pending rollback has not reached yet will see the input
+        if rollback_to is not None and (
+            self._resim is None or rollback_to < self._resim
+        ):
+            self._rollback(rollback_to)
+        if self._resim is not None:
+            self._catch_up()
+        if self.confirmed != previous:
+            self._forget_through(self.confirmed)
+
+    def _predict(self) -> int:
+        """Guess the remote code: the latest one we know of"""
+        return self.inputs[self.remote].get(self.confirmed, 0)
+
+    def _simulate(self, tick: int):
+        """Run one tick with the known or predicted input of both players"""
+        engine = self.engine
+        code = self.inputs[self.remote].get(tick)
+        if code is None:
+            # Only predicted ticks can need a rollback, so only they are
+            # worth a snapshot
+            code = self._predicted[tick] = self._predict()
+            self._snapshots[tick] = engine.snapshot()
+
+        codes = [0, 0]
+        codes[self.local] = self.inputs[self.local][tick]
+        codes[self.remote] = code
+        for player, player_code in enumerate(codes, start=1):
+            engine.set_steering(player, *decode_steering(player_code))
+        engine.tick(self.step_ms)
+
+    def _rollback(self, tick: int):
+        """Restore the state from before tick, to simulate forward again"""
+        self.stats.record(self.tick - tick)
+        self.engine.restore(self._snapshots[tick])
+        self._resim = tick
+
+    def _catch_up(self):
+        """Simulate rolled back ticks again until done or out of budget"""
+        start = time.perf_counter()
+        stop = start + self.budget_ms / 1000
+        t = self._resim
+        # At least one tick a frame, so a slow machine still catches up
+        while True:
+            self._predicted.pop(t, None)
+            self._snapshots.pop(t, None)
+            self._simulate(t)
+            t += 1
+            if t == self.tick or time.perf_counter() >= stop:
+                break
+        self._resim = t if t < self.tick else None
+        self.stats.spend((time.perf_counter() - start) * 1000, self.behind)
+
+    def _forget_through(self, tick: int):
+        """Drop history for ticks whose input is final"""
+        # Ticks not simulated yet still need their inputs: the remote
+        # player may be ahead, and catching up simulates old ticks again
+        tick = min(tick, self.tick)
+        if self._resim is not None:
+            tick = min(tick, self._resim)
+        for t in [t for t in self._snapshots if t <= tick]:
+            del self._snapshots[t]
+        for inputs in self.inputs:
+            for t in [t for t in inputs if t < tick]:
+                del inputs[t]
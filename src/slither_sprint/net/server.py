@@ -0,0 +1,224 @@
+"""
+Match Server - authoritative asyncio server hosting many matches at once
+"""
+
+import asyncio
+import random
+from controller.engine import GameEngine
+from controller.replay import decode_steering
+from net.protocol import (
+    JOIN,
+    INPUT,
+    RESTART,
+    WELCOME,
+    STATE,
+    WELCOME_BODY,
+    ProtocolError,
+    StateEncoder,
+    frame,
+    read_frame,
+)
+from config import FIXED_STEP_MS, MAX_TICKS_PER_FRAME, CHUNKED_WORLD, DEFAULT_PORT
+
+MAX_WRITE_BUFFER = 256 * 1024  # bytes queued for a client before it is dropped
+
+
+class Match:
+    """One two-player match: the simulation plus the clients watching it"""
+
+    def __init__(self, room: str, seed: int = None, chunked: bool = CHUNKED_WORLD):
+        self.room = room
+        self.engine = GameEngine(seed=seed, chunked=chunked, players=2)
+        self.encoder = StateEncoder()
+        self.writers = [None, None]
+        self.codes = [0, 0]  # latest steering code per player
+        self.tick = 0
+        self.started = False
+        self.sent_result = False
+
+    @property
+    def full(self) -> bool:
+        """Check if both player slots are taken"""
+        return None not in self.writers
+
+    @property
+    def empty(self) -> bool:
+        """Check if every player has left"""
+        return self.writers == [None, None]
+
+    def restart(self):
+        """Start a new match with the same players"""
+        self.engine.reset()
+        self.encoder.reset()
+        self.codes = [0, 0]
+        self.sent_result = False
+
+    def advance(self, step_ms: int):
+        """
+        Run one tick and send the resulting state to every player
+
+        Nothing is sent once the result has gone out, so a finished match
+        costs nothing until it is restarted.
+        """
+        engine = self.engine
+        if engine.is_over:
+            if self.sent_result:
+                return
+            self.sent_result = True
+        else:
+            for player, code in enumerate(self.codes, start=1):
+                engine.set_steering(player, *decode_steering(code))
+            engine.tick(step_ms)
+        self.tick += 1
+
+        data = frame(STATE, self.encoder.encode(self.tick, engine.game_state))
+        for writer in self.writers:
+            if writer is None:
+                continue
+            if writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+                # Too slow to keep up; it would only fall further behind
+                writer.close()
+                continue
+            writer.write(data)
+
+
+class MatchServer:
+    """
+    Hosts matches for thin clients over TCP
+
+    Clients join a named room, or an empty room name to be paired with
+    the next client looking for a match. The server owns the simulation:
+    clients only send steering, and every tick each match sends its
+    players a delta of what changed. All matches are advanced by a single
+    fixed-step loop, so one process can host as many as its CPU allows.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        step_ms: int = FIXED_STEP_MS,
+        chunked: bool = CHUNKED_WORLD,
+    ):
+        self.host = host
+        self.port = port
+        self.step_ms = step_ms
+        self.chunked = chunked
+        self.matches = {}
+        self._waiting = None  # match made for an unnamed room, short a player
+        self._next_match = 0
+        self._server = None
+        self._loop_task = None
+
+    async def start(self):
+        """Start listening and ticking; returns once the socket is bound"""
+        self._server = await asyncio.start_server(
+            self._handle_client, self.host, self.port
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._loop_task = asyncio.create_task(self._tick_loop())
+
+    async def serve_forever(self):
+        """Run until cancelled"""
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._loop_task
+
+    async def close(self):
+        """Stop accepting clients and stop every match"""
+        self._loop_task.cancel()
+        self._server.close()
+        for match in self.matches.values():
+            for writer in match.writers:
+                if writer is not None:
+                    writer.close()
+        await self._server.wait_closed()
+
+    async def _tick_loop(self):
+        loop = asyncio.get_running_loop()
+        step = self.step_ms / 1000
+        next_time = loop.time()
+        while True:
+            for match in list(self.matches.values()):
+                if match.started:
+                    match.advance(self.step_ms)
+
+            next_time += step
+            delay = next_time - loop.time()
+            if delay < -step * MAX_TICKS_PER_FRAME:
+                # Too far behind to catch up; slow the matches down instead
+                next_time = loop.time()
+                delay = 0
+            await asyncio.sleep(max(0, delay))
+
+    def _new_match(self, room: str) -> Match:
+        return Match(room, random.randrange(2**32), self.chunked)
+
+    def _join(self, room: str, writer):
+        """
+        Seat a client in a match
+
+        Returns:
+            (match, player) tuple, or None if the room is full
+        """
+        if room:
+            match = self.matches.get(room)
+            if match is None:
+                match = self.matches[room] = self._new_match(room)
+        else:
+            match = self._waiting
+            if match is None:
+                self._next_match += 1
+                room = f"#{self._next_match}"
+                match = self.matches[room] = self._new_match(room)
+                self._waiting = match
+
+        if match.full or match.started:
+            return None
+        player = match.writers.index(None) + 1
+        match.writers[player - 1] = writer
+        if match.full:
+            match.started = True
+            if match is self._waiting:
+                self._waiting = None
+        return match, player
+
+    def _leave(self, match: Match, player: int):
+        match.writers[player - 1] = None
+        if match is self._waiting:
+            self._waiting = None
+        game_state = match.engine.game_state
+        if match.started and game_state.winner_text is None:
+            quitter = game_state.snake1 if player == 1 else game_state.snake2
+            game_state.winner_text = f"{quitter.name} left the match"
+        if match.empty or not match.started:
+            self.matches.pop(match.room, None)
+
+    async def _handle_client(self, reader, writer):
+        seat = None
+        try:
+            tag, payload = await read_frame(reader)
+            if tag != JOIN:
+                raise ProtocolError(f"expected join, got {tag!r}")
+            seat = self._join(payload.decode(errors="replace"), writer)
+            if seat is None:
+                return
+            match, player = seat
+            writer.write(frame(WELCOME, WELCOME_BODY.pack(player, self.step_ms)))
+
+            while True:
+                tag, payload = await read_frame(reader)
+                if tag == INPUT and payload:
+                    match.codes[player - 1] = payload[0] & 3
+                elif tag == RESTART:
+                    if match.engine.is_over and match.full:
+                        match.restart()
+                else:
+                    raise ProtocolError(f"unexpected message {tag!r}")
+        except (asyncio.IncompleteReadError, ConnectionError, ProtocolError):
+            pass
+        finally:
+            if seat is not None:
+                self._leave(*seat)
+            writer.close()
@@ -0,0 +1,44 @@
+"""
+Fonts - HUD fonts loaded by file path and shared between views
+"""
+
+import os
+import pygame
+from config import FONT_PATH, FONT_SIZE
+
+_fonts = {}
+
+
+def font_path() -> str:
+    """
+    Get the file the HUD font is loaded from
+
+    Returns:
+        FONT_PATH, or the font file pygame ships with, which PyInstaller
+        bundles along with pygame
+    """
+    if FONT_PATH is not None:
+        return FONT_PATH
+    return os.path.join(
+        os.path.dirname(pygame.__file__), pygame.font.get_default_font()
+    )
+
+
+def load_font(size: int = FONT_SIZE):
+    """
+    Get a font of a size, loading it on first use
+
+    Opening a known file skips pygame.font.SysFont's scan of every font
+    installed on the system, which can take seconds on a cold start.
+
+    Args:
+        size: Point size
+
+    Returns:
+        pygame.font.Font, shared by every caller asking for that size
+    """
+    key = (font_path(), size)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.Font(key[0], size)
+    return font
@@ -0,0 +1,144 @@
+"""
+Interpolation - draws the world part way between two simulation ticks
+"""
+
+# A segment that moved further than this many cells in one tick was put
+# there by a reset or restore, and is drawn where it is instead of sliding
+MAX_SLIDE = 2
+
+
+class SnakeView:
+    """A snake whose body is drawn at fractional cells"""
+
+    def __init__(self, snake, body: list):
+        self._snake = snake
+        self.body = body
+
+    def __getattr__(self, name):
+        return getattr(self._snake, name)
+
+
+class StateView:
+    """A GameState whose cameras and snakes are drawn between ticks"""
+
+    def __init__(self, game_state, cameras: list, snakes: list):
+        self._state = game_state
+        self.cameras = cameras
+        self.snakes = snakes
+
+    def __getattr__(self, name):
+        return getattr(self._state, name)
+
+
+class TickInterpolator:
+    """
+    Glides snakes between their steps and cameras between ticks
+
+    Everything is drawn as it was one tick ago, plus however far the wall
+    clock is into the current tick. Cameras move every tick, so they blend
+    between the last two ticks. A snake only moves a whole cell every
+    current_step_ms, several ticks apart, so blending it between ticks
+    would slide its head a cell within one tick and then hold it still
+    for the next ones. Each snake is instead placed by the share of its
+    step interval that had passed at the drawn time, from its engine
+    accumulator, between its bodies before and after the step it was
+    taking then. Obstacles and apples do not move, so they are drawn as
+    they are.
+
+    Call capture() right before every tick; view() then gives the
+    renderers a stand-in for the state with the cameras and snake
+    segments placed in between.
+    """
+
+    def __init__(self, tick_ms: int):
+        self.tick_ms = tick_ms
+        self._snakes = None
+        self._cameras = None
+        self._origin = None
+        # Per snake: (body before its last step, body before the step
+        # before that, step interval between the two), None until seen
+        self._history = []
+        # Per snake: step count, body and step interval when the current
+        # tick started
+        self._steps = []
+        self._bodies = []
+        self._intervals = []
+
+    def capture(self, game_state):
+        """Remember the positions the next tick starts from"""
+        snakes = game_state.snakes
+        if self._snakes != snakes or self._origin != game_state.origin:
+            # A reset replaced the snakes, or a rebase moved everything
+            self._history = [(None, None, None)] * len(snakes)
+        else:
+            self._history = self._steps_taken(snakes)
+        self._snakes = list(snakes)
+        self._cameras = list(game_state.cameras)
+        self._origin = game_state.origin
+        self._steps = [snake.steps for snake in snakes]
+        self._bodies = [list(snake.body) for snake in snakes]
+        self._intervals = [snake.current_step_ms for snake in snakes]
+
+    def view(self, game_state, alpha: float, acc_ms: list):
+        """
+        Get the state as drawn alpha of the way through the current tick
+
+        Args:
+            game_state: State after the last tick
+            alpha: How far the wall clock is past the last tick, in ticks
+                (0 to 1)
+            acc_ms: Each snake's step accumulator after the last tick, as
+                kept by GameEngine
+
+        Returns:
+            StateView, or the state itself when there is nothing to blend
+        """
+        snakes = game_state.snakes
+        if self._snakes != snakes or self._origin != game_state.origin:
+            return game_state
+        cameras = [
+            before + (after - before) * alpha
+            for before, after in zip(self._cameras, game_state.cameras)
+        ]
+        views = []
+        lag = (1 - alpha) * self.tick_ms
+        history = self._steps_taken(snakes)
+        for snake, (last, previous, interval), owed in zip(snakes, history, acc_ms):
+            # Time from the snake's last step to the drawn time; negative
+            # while the drawn time is still in the step before it
+            since = owed - lag
+            if since >= 0 or previous is None:
+                start, end = last, snake.body
+                progress = since / snake.current_step_ms
+            else:
+                # A power-up may have changed the interval since
+                start, end = previous, last
+                progress = 1 + since / interval
+            if start is None:
+                views.append(snake)
+                continue
+            progress = min(max(progress, 0.0), 1.0)
+            views.append(SnakeView(snake, self._slide(start, end, progress)))
+        return StateView(game_state, cameras, views)
+
+    def _steps_taken(self, snakes) -> list:
+        """Each snake's step history, counting a step in the current tick"""
+        return [
+            (body, history[0], interval) if snake.steps != steps else history
+            for snake, steps, body, interval, history in zip(
+                snakes, self._steps, self._bodies, self._intervals, self._history
+            )
+        ]
+
+    def _slide(self, before: list, after, alpha: float) -> list:
+        """Place each segment between its old and new cell"""
+        body = []
+        last = len(before) - 1
+        for i, (x, y) in enumerate(after):
+            # A snake that grew has a new tail segment on its old tail cell
+            bx, by = before[min(i, last)]
+            if abs(x - bx) + abs(y - by) > MAX_SLIDE:
+                body.append((x, y))
+            else:
+                body.append((bx + (x - bx) * alpha, by + (y - by) * alpha))
+        return body
@@ -0,0 +1,89 @@
+"""
+Profiler Overlay - on-screen panel of rolling frame timings
+"""
+
+import time
+import pygame
+from config import TEXT_COLOR
+
+PANEL_COLOR = (0, 0, 0, 190)
+REFRESH_MS = 250  # how often the numbers are re-rendered
+LINE_HEIGHT = 18
+MARGIN = 8
+PANEL_POS = (12, 40)
+
+COUNT_COLUMNS = ("obstacles", "apples", "segments")
+
+
+class ProfilerOverlay:
+    """
+    Semi-transparent panel listing a FrameProfiler's percentiles
+
+    The panel is only re-rendered a few times a second; in between the
+    same surface is blitted, so showing it costs one blit per frame.
+    """
+
+    def __init__(self, profiler, font, text_cache=None, pacer=None):
+        self.profiler = profiler
+        self.font = font
+        self.text_cache = text_cache
+        self.pacer = pacer  # FramePacer whose frame counts are shown, if any
+        self._panel = None
+        self._rendered_at = None
+
+    def _lines(self) -> list:
+        profiler = self.profiler
+        frame = profiler.stats("frame")
+        lines = [
+            f"frame ms  p50 {frame['p50']:.2f}  p95 {frame['p95']:.2f}"
+            f"  p99 {frame['p99']:.2f}",
+        ]
+        for name in profiler.columns:
+            if name == "frame" or name in COUNT_COLUMNS:
+                continue
+            s = profiler.stats(name)
+            lines.append(f"{name:<15}{s['p50']:7.3f}{s['p95']:8.3f}{s['p99']:8.3f}")
+        counts = [
+            f"{name} {profiler.stats(name)['p50']:.0f}"
+            for name in COUNT_COLUMNS
+            if name in profiler.samples
+        ]
+        if counts:
+            lines.append("  ".join(counts))
+        if self.text_cache is not None:
+            lines.append(
+                f"text cache {len(self.text_cache)} items,"
+                f" {self.text_cache.hit_rate:.1%} hits"
+            )
+        if self.pacer is not None:
+            pacing = self.pacer.as_dict()
+            lines.append(
+                f"drawn {pacing['fps']:.0f} fps, dropped {pacing['dropped_frames']}"
+                f" ({pacing['dropped_pct']:.1f}%), late ticks {pacing['late_ticks']}"
+            )
+        return lines
+
+    def _build(self):
+        images = [self.font.render(line, True, TEXT_COLOR) for line in self._lines()]
+        width = max(image.get_width() for image in images) + 2 * MARGIN
+        height = len(images) * LINE_HEIGHT + 2 * MARGIN
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill(PANEL_COLOR)
+        for i, image in enumerate(images):
+            panel.blit(image, (MARGIN, MARGIN + i * LINE_HEIGHT))
+        return panel
+
+    def draw(self, screen) -> pygame.Rect:
+        """
+        Draw the panel
+
+        Returns:
+            Screen rect that was drawn
+        """
+        # Not pygame.time.get_ticks(): the game only starts the display and
+        # font subsystems, and without SDL's timer that always returns 0
+        now = time.perf_counter() * 1000
+        if self._panel is None or now - self._rendered_at >= REFRESH_MS:
+            self._panel = self._build()
+            self._rendered_at = now
+        return screen.blit(self._panel, PANEL_POS)
@@ -2,38 +2,83 @@
 Renderer - handles all drawing operations
 """
 
+import math
 import pygame
 from config import (
     WIDTH,
     HEIGHT,
     CELL,
     GRID_H,
-    PANE_COLS,
     BG_COLOR,
     DIVIDER_COLOR,
     TEXT_COLOR,
     PADDING,
-    RED_APPLE_COLOR,
-    GOLDEN_APPLE_COLOR,
-    OBSTACLE_A,
-    OBSTACLE_B,
-    FINISH_LINE_COLOR,
-    P1_HEAD,
-    P2_HEAD,
+    FINISH_LINE_DISTANCE,
+    PLAYER_KEYS,
+    TEXT_CACHE_SIZE,
 )
 from model.power_up import PowerUpType
+from view.fonts import load_font
+from view.sprite_cache import SpriteCache, APPLE_RADIUS, OBSTACLE_OFFSET
+from view.text_cache import TextCache
+
+# How steering keys are spelled in the HUD, where their name does not do
+KEY_LABELS = {"left": "Left", "right": "Right", "[4]": "KP4", "[6]": "KP6"}
 
 
 class Renderer:
     """Handles all rendering operations"""
 
-    def __init__(self, screen):
+    # Whether draw passes report the screen rects they touched
+    track_dirty = False
+
+    # Methods a FrameProfiler times, and the phase names it records
+    profiled_passes = {
+        "render": "render",
+        "_draw_finish_line": "draw_finish",
+        "_draw_obstacles": "draw_obstacles",
+        "_draw_apples_for_pane": "draw_apples",
+        "_draw_snake": "draw_snakes",
+        "_draw_hud": "draw_hud",
+        "_draw_overlay": "draw_overlay",
+    }
+
+    def __init__(self, screen, present: bool = True):
+        """
+        Args:
+            screen: Surface to draw on
+            present: Flip the display after each frame; off when drawing
+                onto off-screen surfaces
+        """
         self.screen = screen
-        self.font = pygame.font.SysFont("consolas", 18)
+        self.present = present
+        self.font = load_font()
+        self.sprites = SpriteCache()
+        self.text = TextCache(self.font, TEXT_CACHE_SIZE)
+        self.overlay = None  # drawn over everything when set, e.g. the profiler
+
+        # Clip rectangle of each pane, laid out for the first state drawn
+        self.panes = []
+        self.clips = []
+
+    def layout(self, panes) -> bool:
+        """
+        Fit the clip rectangles to a state's panes
+
+        Args:
+            panes: GameState.panes
 
-        # Create clip rectangles for split screen
-        self.clip_p1 = pygame.Rect(0, 0, PANE_COLS * CELL, HEIGHT)
-        self.clip_p2 = pygame.Rect(PANE_COLS * CELL, 0, PANE_COLS * CELL, HEIGHT)
+        Returns:
+            True if the layout changed
+        """
+        if panes == self.panes:
+            return False
+        self.panes = list(panes)
+        self.clips = [
+            pygame.Rect(pane.x0 * CELL, 0, (pane.x1 - pane.x0 + 1) * CELL, HEIGHT)
+            for pane in self.panes
+        ]
+        return True
 
     def render(self, game_state):
         """
@@ -42,147 +87,164 @@ class Renderer:
         Args:
             game_state: GameState object containing all game data
         """
+        self.layout(game_state.panes)
         self.screen.fill(BG_COLOR)
 
-        # Draw Player 1's view
-        self.screen.set_clip(self.clip_p1)
-        self._draw_finish_line(game_state.camera_y_p1, self.clip_p1)
-        self._draw_obstacles(game_state.obstacles, game_state.camera_y_p1, self.clip_p1)
-        self._draw_apples_for_pane(
-            game_state.apples, game_state.pane1, game_state.camera_y_p1, self.clip_p1
-        )
-        self._draw_snake(game_state.snake1, game_state.camera_y_p1, self.clip_p1)
-
-        # Draw Player 2's view
-        self.screen.set_clip(self.clip_p2)
-        self._draw_finish_line(game_state.camera_y_p2, self.clip_p2)
-        self._draw_obstacles(game_state.obstacles, game_state.camera_y_p2, self.clip_p2)
-        self._draw_apples_for_pane(
-            game_state.apples, game_state.pane2, game_state.camera_y_p2, self.clip_p2
-        )
-        self._draw_snake(game_state.snake2, game_state.camera_y_p2, self.clip_p2)
-
-        # Draw divider and HUD without clipping
+        # Draw each player's view
+        views = zip(self.clips, game_state.cameras, game_state.snakes)
+        for clip, camera_y, snake in views:
+            self.screen.set_clip(clip)
+            if not game_state.endless:
+                self._draw_finish_line(camera_y, clip)
+            self._draw_obstacles(game_state.obstacles, snake.pane, camera_y, clip)
+            self._draw_apples_for_pane(game_state.apples, snake.pane, camera_y, clip)
+            self._draw_snake(snake, camera_y, clip)
+
+        # Draw dividers and HUD without clipping
         self.screen.set_clip(None)
-        pygame.draw.rect(
-            self.screen, DIVIDER_COLOR, pygame.Rect(PANE_COLS * CELL - 2, 0, 4, HEIGHT)
-        )
-        self._draw_hud(game_state.snake1, game_state.snake2, game_state.winner_text)
+        self._draw_divider()
+        self._draw_hud(game_state.snakes, game_state.winner_text)
+        self._draw_overlay()
+
+        if self.present:
+            pygame.display.flip()
+
+    def _draw_divider(self):
+        """
+        Draw the lines between the panes
 
-        pygame.display.flip()
+        Returns:
+            List of screen rects that were drawn
+        """
+        return [
+            pygame.draw.rect(
+                self.screen, DIVIDER_COLOR, pygame.Rect(clip.x - 2, 0, 4, HEIGHT)
+            )
+            for clip in self.clips[1:]
+        ]
 
     def _draw_snake(self, snake, camera_y, clip_rect):
         """Draw a snake"""
+        sprites = self.sprites
+        head = sprites.segment(snake.head_col)
+        body = sprites.segment(snake.body_col)
+        scroll = math.ceil(camera_y * CELL)
+        batch = []
         for i, (x, y) in enumerate(snake.body):
             screen_y = y - camera_y
             if -1 <= screen_y <= GRID_H:
-                col = snake.head_col if i == 0 else snake.body_col
-
-                # Add glow effect if invincible
-                if snake.is_invincible() and i == 0:
-                    glow_rect = pygame.Rect(
-                        x * CELL - 2, screen_y * CELL - 2, CELL + 4, CELL + 4
-                    )
-                    if clip_rect is None or glow_rect.colliderect(clip_rect):
-                        pygame.draw.rect(
-                            self.screen, (255, 255, 200), glow_rect, border_radius=6
-                        )
-
-                r = pygame.Rect(
-                    x * CELL + PADDING,
-                    screen_y * CELL + PADDING,
-                    CELL - 2 * PADDING,
-                    CELL - 2 * PADDING,
-                )
-                if clip_rect is None or r.colliderect(clip_rect):
-                    pygame.draw.rect(self.screen, col, r, border_radius=4)
+                # Segments sit between cells while interpolated
+                px = round(x * CELL)
+                py = round(y * CELL) - scroll
+                if i == 0:
+                    # Add glow effect if invincible
+                    if snake.is_invincible():
+                        batch.append((sprites.glow(), (px - 2, py - 2)))
+                    batch.append((head, (px + PADDING, py + PADDING)))
+                else:
+                    batch.append((body, (px + PADDING, py + PADDING)))
+        return self.screen.blits(batch, doreturn=self.track_dirty)
 
     def _draw_apples_for_pane(self, apples, pane, camera_y, clip_rect):
         """Draw apples that belong to a specific pane"""
-        for apple in apples:
-            if pane.inside(apple.x):
-                self._draw_apple(apple, camera_y, clip_rect)
-
-    def _draw_apple(self, apple, camera_y, clip_rect):
-        """Draw an apple"""
-        screen_y = apple.y - camera_y
-        if -1 <= screen_y <= GRID_H:
-            color = GOLDEN_APPLE_COLOR if apple.is_golden else RED_APPLE_COLOR
-            center_x = apple.x * CELL + CELL // 2
-            center_y = int(screen_y * CELL + CELL // 2)
-
-            if clip_rect is None or clip_rect.collidepoint(center_x, center_y):
-                radius = int((CELL // 2 - 3) * 1.5)
-                pygame.draw.circle(self.screen, color, (center_x, center_y), radius)
-
-                # Add shine effect
-                shine_offset = radius // 3
-                pygame.draw.circle(
-                    self.screen,
-                    (255, 255, 255),
-                    (center_x - shine_offset, center_y - shine_offset),
-                    radius // 3,
-                )
-
-    def _draw_obstacles(self, obstacles, camera_y, clip_rect):
-        """Draw obstacles"""
-        for x, y in obstacles.blocks:
-            screen_y = y - camera_y
-            if -1 <= screen_y <= GRID_H:
-                size = int((CELL - 4) * 1.15)
-                offset = (CELL - size) // 2
-                r = pygame.Rect(x * CELL + offset, screen_y * CELL + offset, size, size)
-                if clip_rect is None or r.colliderect(clip_rect):
-                    pygame.draw.rect(self.screen, OBSTACLE_A, r, border_radius=4)
-                    pygame.draw.rect(
-                        self.screen, OBSTACLE_B, r.inflate(-6, -6), border_radius=3
-                    )
+        red = self.sprites.apple(False)
+        golden = self.sprites.apple(True)
+        offset = CELL // 2 - APPLE_RADIUS
+        scroll = math.ceil(camera_y * CELL)
+        batch = [
+            (
+                golden if is_golden else red,
+                (x * CELL + offset, y * CELL - scroll + offset),
+            )
+            for x, y, is_golden in apples.visible(pane, camera_y - 1, camera_y + GRID_H)
+        ]
+        return self.screen.blits(batch, doreturn=self.track_dirty)
+
+    def _draw_obstacles(self, obstacles, pane, camera_y, clip_rect):
+        """Draw the obstacles of one pane"""
+        sprite = self.sprites.obstacle()
+        # Row y starts at y * CELL - scroll on screen in every draw pass,
+        # the same mapping StripRenderer scrolls its strips by
+        scroll = math.ceil(camera_y * CELL)
+        batch = [
+            (
+                sprite,
+                (x * CELL + OBSTACLE_OFFSET, y * CELL - scroll + OBSTACLE_OFFSET),
+            )
+            for x, y, _ in obstacles.visible(pane, camera_y - 1, camera_y + GRID_H)
+        ]
+        self.screen.blits(batch, doreturn=False)
 
     def _draw_finish_line(self, camera_y, clip_rect):
         """Draw the finish line"""
-        from config import FINISH_LINE_DISTANCE
-
         screen_y = FINISH_LINE_DISTANCE - camera_y
         if -5 <= screen_y <= GRID_H + 5:
-            y_pixel = int(screen_y * CELL)
-            # Draw checkered pattern
-            for x in range(0, WIDTH, CELL):
-                r = pygame.Rect(x, y_pixel, CELL, CELL // 2)
-                if clip_rect is None or r.colliderect(clip_rect):
-                    color = (
-                        FINISH_LINE_COLOR if (x // CELL) % 2 == 0 else (200, 200, 50)
-                    )
-                    pygame.draw.rect(self.screen, color, r)
-
-    def _draw_hud(self, snake1, snake2, winner_text):
-        """Draw the heads-up display"""
-        # Player 1 info
-        p1_text = f"{snake1.name}: {snake1.apples_collected} apples"
-        if snake1.active_powerup == PowerUpType.SPEED_BOOST:
-            p1_text += " [SPEED]"
-        elif snake1.active_powerup == PowerUpType.INVINCIBILITY:
-            p1_text += " [INVINCIBLE]"
-        img1 = self.font.render(p1_text, True, P1_HEAD)
-        self.screen.blit(img1, (12, 10))
-
-        # Player 2 info
-        p2_text = f"{snake2.name}: {snake2.apples_collected} apples"
-        if snake2.active_powerup == PowerUpType.SPEED_BOOST:
-            p2_text += " [SPEED]"
-        elif snake2.active_powerup == PowerUpType.INVINCIBILITY:
-            p2_text += " [INVINCIBLE]"
-        img2 = self.font.render(p2_text, True, P2_HEAD)
-        self.screen.blit(img2, (WIDTH - img2.get_width() - 12, 10))
+            py = FINISH_LINE_DISTANCE * CELL - math.ceil(camera_y * CELL)
+            self.screen.blit(self.sprites.finish_line(), (0, py))
+
+    def _draw_overlay(self):
+        """
+        Draw the overlay, if one is shown
+
+        Returns:
+            List of screen rects that were drawn
+        """
+        if self.overlay is None:
+            return []
+        return [self.overlay.draw(self.screen)]
+
+    def _draw_hud(self, snakes, winner_text):
+        """
+        Draw the heads-up display
+
+        Two players get their status in the top corners and the controls
+        of both along the bottom. With more players, each pane shows its
+        own player's status at the top and steering keys at the bottom.
+
+        Returns:
+            List of screen rects that were drawn
+        """
+        rects = []
+        if len(snakes) == 2:
+            img1 = self.text.render(self._status_text(snakes[0]), snakes[0].head_col)
+            rects.append(self.screen.blit(img1, (12, 10)))
+            img2 = self.text.render(self._status_text(snakes[1]), snakes[1].head_col)
+            rects.append(self.screen.blit(img2, (WIDTH - img2.get_width() - 12, 10)))
+            controls = "P1: A/D   P2: ◀/▶   R: restart   ESC: quit"
+        else:
+            for clip, snake, keys in zip(self.clips, snakes, PLAYER_KEYS):
+                status = self.text.render(
+                    self._status_text(snake, compact=True), snake.head_col
+                )
+                rects.append(self.screen.blit(status, (clip.x + 6, 10)))
+                labels = [KEY_LABELS.get(key, key.upper()) for key in keys]
+                hint = self.text.render("/".join(labels), snake.head_col)
+                rects.append(self.screen.blit(hint, (clip.x + 6, HEIGHT - 54)))
+            controls = "R: restart   ESC: quit"
 
         # Controls
-        controls = self.font.render(
-            "P1: A/D   P2: ◀/▶   R: restart   ESC: quit", True, TEXT_COLOR
-        )
-        self.screen.blit(controls, (12, HEIGHT - 30))
+        img = self.text.render(controls, TEXT_COLOR)
+        rects.append(self.screen.blit(img, (12, HEIGHT - 30)))
 
         # Winner text
         if winner_text:
-            banner = self.font.render(winner_text, True, TEXT_COLOR)
+            banner = self.text.render(winner_text, TEXT_COLOR)
             rect = banner.get_rect(center=(WIDTH // 2, 32))
-            pygame.draw.rect(self.screen, (0, 0, 0, 128), rect.inflate(20, 10))
+            rects.append(
+                pygame.draw.rect(self.screen, (0, 0, 0, 128), rect.inflate(20, 10))
+            )
             self.screen.blit(banner, rect)
+
+        return rects
+
+    def _status_text(self, snake, compact: bool = False) -> str:
+        """A player's apple count and power-up, shortened if compact"""
+        if compact:
+            text = f"{snake.name}: {snake.apples_collected}"
+        else:
+            text = f"{snake.name}: {snake.apples_collected} apples"
+        if snake.active_powerup == PowerUpType.SPEED_BOOST:
+            text += " [S]" if compact else " [SPEED]"
+        elif snake.active_powerup == PowerUpType.INVINCIBILITY:
+            text += " [I]" if compact else " [INVINCIBLE]"
+        return text
@@ -0,0 +1,129 @@
+"""
+Sprite cache - pre-rendered surfaces for every kind of grid cell
+"""
+
+import pygame
+from config import (
+    WIDTH,
+    CELL,
+    PADDING,
+    RED_APPLE_COLOR,
+    GOLDEN_APPLE_COLOR,
+    OBSTACLE_A,
+    OBSTACLE_B,
+    FINISH_LINE_COLOR,
+)
+
+# Never drawn by any sprite, so it can mark transparent pixels
+COLORKEY = (255, 0, 255)
+
+GLOW_COLOR = (255, 255, 200)
+SHINE_COLOR = (255, 255, 255)
+
+SEGMENT_SIZE = CELL - 2 * PADDING
+OBSTACLE_SIZE = int((CELL - 4) * 1.15)
+OBSTACLE_OFFSET = (CELL - OBSTACLE_SIZE) // 2
+APPLE_RADIUS = int((CELL // 2 - 3) * 1.5)
+
+
+class SpriteCache:
+    """
+    Builds each cell sprite once and hands out the same surface afterwards
+
+    Sprites use a colorkey for their rounded corners so they can be
+    convert()ed to the display format and blitted with RLE acceleration,
+    which is much cheaper than re-running pygame.draw every frame.
+    """
+
+    def __init__(self):
+        self._sprites = {}
+
+    def _new_surface(self, width: int, height: int):
+        """Create a surface filled with the transparent colorkey"""
+        surface = pygame.Surface((width, height))
+        surface.fill(COLORKEY)
+        return surface
+
+    def _finish(self, surface):
+        """Mark the colorkey transparent and match the display format"""
+        surface.set_colorkey(COLORKEY, pygame.RLEACCEL)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        return surface
+
+    def _get(self, key, build):
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            sprite = self._sprites[key] = self._finish(build())
+        return sprite
+
+    def clear(self):
+        """Drop every cached sprite"""
+        self._sprites.clear()
+
+    def __len__(self) -> int:
+        return len(self._sprites)
+
+    def segment(self, color):
+        """Snake segment, blitted at the cell corner plus PADDING"""
+
+        def build():
+            surface = self._new_surface(SEGMENT_SIZE, SEGMENT_SIZE)
+            pygame.draw.rect(surface, color, surface.get_rect(), border_radius=4)
+            return surface
+
+        return self._get(("segment", color), build)
+
+    def glow(self):
+        """Invincibility glow, blitted 2px up and left of the head cell"""
+
+        def build():
+            surface = self._new_surface(CELL + 4, CELL + 4)
+            pygame.draw.rect(surface, GLOW_COLOR, surface.get_rect(), border_radius=6)
+            return surface
+
+        return self._get("glow", build)
+
+    def obstacle(self):
+        """Obstacle block, blitted at the cell corner plus OBSTACLE_OFFSET"""
+
+        def build():
+            surface = self._new_surface(OBSTACLE_SIZE, OBSTACLE_SIZE)
+            rect = surface.get_rect()
+            pygame.draw.rect(surface, OBSTACLE_A, rect, border_radius=4)
+            pygame.draw.rect(surface, OBSTACLE_B, rect.inflate(-6, -6), border_radius=3)
+            return surface
+
+        return self._get("obstacle", build)
+
+    def apple(self, is_golden: bool):
+        """Apple with shine, blitted APPLE_RADIUS up and left of its center"""
+
+        def build():
+            size = 2 * APPLE_RADIUS + 1
+            surface = self._new_surface(size, size)
+            color = GOLDEN_APPLE_COLOR if is_golden else RED_APPLE_COLOR
+            center = (APPLE_RADIUS, APPLE_RADIUS)
+            pygame.draw.circle(surface, color, center, APPLE_RADIUS)
+            shine_offset = APPLE_RADIUS // 3
+            pygame.draw.circle(
+                surface,
+                SHINE_COLOR,
+                (APPLE_RADIUS - shine_offset, APPLE_RADIUS - shine_offset),
+                APPLE_RADIUS // 3,
+            )
+            return surface
+
+        return self._get(("apple", is_golden), build)
+
+    def finish_line(self):
+        """Checkered finish line spanning the whole window width"""
+
+        def build():
+            surface = self._new_surface(WIDTH, CELL // 2)
+            for x in range(0, WIDTH, CELL):
+                color = FINISH_LINE_COLOR if (x // CELL) % 2 == 0 else (200, 200, 50)
+                pygame.draw.rect(surface, color, pygame.Rect(x, 0, CELL, CELL // 2))
+            return surface
+
+        return self._get("finish_line", build)
@@ -0,0 +1,222 @@
+"""
+Strip Renderer - scrolls cached world strips and updates only dirty rects
+"""
+
+import math
+import pygame
+from view.renderer import Renderer
+from view.sprite_cache import OBSTACLE_OFFSET
+from config import (
+    HEIGHT,
+    CELL,
+    GRID_H,
+    BG_COLOR,
+    FINISH_LINE_DISTANCE,
+)
+
+# Rows held by each strip; must cover a screen's worth of rows plus the
+# partially visible row at each edge
+STRIP_ROWS = GRID_H + 4
+
+
+class PaneStrip:
+    """
+    Off-screen ring buffer of one pane's static world content
+
+    World row y is painted into slot y % STRIP_ROWS, so scrolling never
+    moves pixels: the camera window is just read from a different offset.
+    """
+
+    def __init__(self, pane, screen_rect: pygame.Rect):
+        self.pane = pane
+        self.rect = screen_rect
+        self.surface = pygame.Surface((screen_rect.width, STRIP_ROWS * CELL))
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert()
+        self.height = self.surface.get_height()
+        self.invalidate()
+
+    def invalidate(self):
+        """Forget every painted row and the last scroll position"""
+        self.surface.fill(BG_COLOR)
+        self.slot_rows = [None] * STRIP_ROWS
+        self.slot_columns = [frozenset()] * STRIP_ROWS
+        self.scroll = None
+        self.overlay = []
+
+
+class StripRenderer(Renderer):
+    """
+    Renderer that keeps one world strip per pane
+
+    Obstacles and the finish line are painted into the strip once, when
+    their row first comes into view or gains a block. Each frame blits the
+    camera window out of the strip, draws only the moving entities (snakes
+    and apples) and the HUD on top, and pushes the changed rects to the
+    display with pygame.display.update instead of flipping the whole
+    window. A pane whose camera did not move only restores and redraws the
+    rects its entities covered on the previous frame.
+    """
+
+    track_dirty = True
+
+    profiled_passes = {
+        **Renderer.profiled_passes,
+        "_paint_rows": "paint_strips",
+        "_blit_window": "blit_strips",
+    }
+
+    def __init__(self, screen):
+        super().__init__(screen)
+        self.strips = []
+        self._obstacles = None
+        self._generation = None
+        self._hud_rects = []
+        self.finish_y = FINISH_LINE_DISTANCE  # row the finish line is painted on
+        # Screen area right of the last pane, which no strip covers
+        self.margin = pygame.Rect(0, 0, 0, HEIGHT)
+
+    def layout(self, panes) -> bool:
+        """Fit the clip rectangles to a state's panes, with a strip for each"""
+        if not super().layout(panes):
+            return False
+        self.strips = [PaneStrip(pane, clip) for pane, clip in zip(panes, self.clips)]
+        right = self.clips[-1].right
+        self.margin = pygame.Rect(right, 0, self.screen.get_width() - right, HEIGHT)
+        # New strips start blank, and the screen has to be cleared around them
+        self._obstacles = None
+        return True
+
+    def render(self, game_state):
+        """
+        Render the complete game state
+
+        Args:
+            game_state: GameState object containing all game data
+        """
+        dirty = []
+        self.layout(game_state.panes)
+
+        # A reset swaps in a new obstacle store and a restore refills it
+        obstacles = game_state.obstacles
+        if obstacles is not self._obstacles or obstacles.generation != self._generation:
+            self._obstacles = obstacles
+            self._generation = obstacles.generation
+            self.finish_y = None if game_state.endless else FINISH_LINE_DISTANCE
+            for strip in self.strips:
+                strip.invalidate()
+            # Also clears any margin the panes do not cover
+            self.screen.fill(BG_COLOR)
+            dirty.append(self.screen.get_rect())
+
+        views = zip(self.strips, game_state.cameras, game_state.snakes)
+        for strip, camera_y, snake in views:
+            self._draw_pane(strip, game_state, camera_y, snake, dirty)
+
+        # Draw divider and HUD without clipping, clearing the previous HUD
+        # text wherever it spilled past the panes
+        self.screen.set_clip(None)
+        for rect in self._hud_rects:
+            self.screen.fill(BG_COLOR, rect.clip(self.margin))
+        dirty.extend(self._hud_rects)
+        dirty.extend(self._draw_divider())
+        self._hud_rects = self._draw_hud(game_state.snakes, game_state.winner_text)
+        self._hud_rects += self._draw_overlay()
+        dirty.extend(self._hud_rects)
+
+        pygame.display.update(dirty)
+
+    def _draw_pane(self, strip, game_state, camera_y, snake, dirty):
+        """Bring one pane up to date and record the rects it changed"""
+        scroll = math.ceil(camera_y * CELL)
+        painted = self._paint_rows(strip, game_state.obstacles, scroll)
+
+        self.screen.set_clip(strip.rect)
+        # A row repainted in place is only on screen once the window is
+        # copied again, even if the camera did not move
+        if painted or scroll != strip.scroll:
+            strip.scroll = scroll
+            self._blit_window(strip, strip.rect)
+            dirty.append(strip.rect)
+            full = True
+        else:
+            for rect in strip.overlay + self._hud_rects:
+                self._blit_window(strip, rect.clip(strip.rect))
+            dirty.extend(strip.overlay)
+            full = False
+
+        drawn = self._draw_apples_for_pane(
+            game_state.apples, strip.pane, camera_y, strip.rect
+        )
+        drawn += self._draw_snake(snake, camera_y, strip.rect)
+        strip.overlay = drawn
+        if not full:
+            dirty.extend(drawn)
+
+    def _paint_rows(self, strip, obstacles, scroll) -> bool:
+        """
+        Paint any visible row whose slot is stale into the strip
+
+        Returns:
+            True if any row was painted
+        """
+        # Only this pane's blocks, so other panes' rows never repaint it
+        rows = obstacles.rows_in(strip.pane)
+        first = scroll // CELL
+        last = (scroll + HEIGHT - 1) // CELL
+        painted = False
+        for y in range(first, last + 1):
+            xs = rows.get(y)
+            # By columns: a row can lose one block and gain another
+            columns = frozenset(xs) if xs else frozenset()
+            slot = y % STRIP_ROWS
+            if strip.slot_rows[slot] != y or strip.slot_columns[slot] != columns:
+                self._paint_row(strip, slot, y, columns)
+                strip.slot_rows[slot] = y
+                strip.slot_columns[slot] = columns
+                painted = True
+        return painted
+
+    def _paint_row(self, strip, slot, y, xs):
+        """Redraw the static content of one world row into its slot"""
+        surface = strip.surface
+        top = slot * CELL
+        surface.fill(BG_COLOR, pygame.Rect(0, top, strip.rect.width, CELL))
+
+        pane = strip.pane
+        if xs:
+            sprite = self.sprites.obstacle()
+            surface.blits(
+                [
+                    (
+                        sprite,
+                        ((x - pane.x0) * CELL + OBSTACLE_OFFSET, top + OBSTACLE_OFFSET),
+                    )
+                    for x in xs
+                ],
+                doreturn=False,
+            )
+
+        if y == self.finish_y:
+            finish = self.sprites.finish_line()
+            area = pygame.Rect(pane.x0 * CELL, 0, strip.rect.width, CELL // 2)
+            surface.blit(finish, (0, top), area)
+
+    def _blit_window(self, strip, dest: pygame.Rect):
+        """Copy the strip pixels behind a screen rect, wrapping the ring"""
+        if dest.width <= 0 or dest.height <= 0:
+            return
+        src_x = dest.x - strip.rect.x
+        src_y = (strip.scroll + dest.y) % strip.height
+        first = min(dest.height, strip.height - src_y)
+        self.screen.blit(
+            strip.surface,
+            dest.topleft,
+            pygame.Rect(src_x, src_y, dest.width, first),
+        )
+        if first < dest.height:
+            self.screen.blit(
+                strip.surface,
+                (dest.x, dest.y + first),
+                pygame.Rect(src_x, 0, dest.width, dest.height - first),
+            )
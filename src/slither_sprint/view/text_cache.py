@@ -0,0 +1,72 @@
+"""
+Text cache - keeps rendered text surfaces keyed by their content
+"""
+
+from collections import OrderedDict
+
+
+class TextCache:
+    """
+    Least-recently-used cache of rendered text
+
+    Font rasterization only happens when a (text, color) pair has not been
+    seen recently; otherwise the stored surface is reused. The cache holds
+    at most max_size surfaces and evicts the least recently used one when
+    full, so a long session with ever-changing scores stays bounded.
+    """
+
+    def __init__(self, font, max_size: int = 64):
+        self.font = font
+        self.max_size = max_size
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    def render(self, text: str, color):
+        """
+        Get the surface for a piece of text, rendering it on a miss
+
+        Args:
+            text: String to draw
+            color: RGB tuple
+
+        Returns:
+            Antialiased text surface (shared; do not draw onto it)
+        """
+        key = (text, color)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self._surfaces[key] = self.font.render(text, True, color)
+        if len(self._surfaces) > self.max_size:
+            self._surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        """Counters for instrumentation"""
+        return {
+            "size": len(self._surfaces),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+    def clear(self):
+        """Drop every cached surface"""
+        self._surfaces.clear()
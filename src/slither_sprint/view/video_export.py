@@ -0,0 +1,181 @@
+"""
+Video Export - hands rendered frames to a background thread that encodes them
+"""
+
+import os
+import queue
+import subprocess
+import threading
+import time
+import pygame
+from config import EXPORT_POOL, FFMPEG
+
+# Output paths with these extensions are encoded by ffmpeg; any other path
+# is a directory of numbered frame images
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".webm", ".mov", ".avi", ".gif")
+
+
+def pixel_format(surface: pygame.Surface) -> str:
+    """
+    Name a 32-bit surface's byte order the way ffmpeg does
+
+    Args:
+        surface: Surface with 4 bytes per pixel
+
+    Returns:
+        ffmpeg pix_fmt, e.g. "bgr0" for the usual little-endian XRGB
+    """
+    channels = ["0"] * 4
+    masks = surface.get_masks()
+    for name, shift, mask in zip("rgba", surface.get_shifts(), masks):
+        if mask:
+            channels[shift // 8] = name
+    return "".join(channels)
+
+
+class FFmpegSink:
+    """Pipes raw frames into an ffmpeg process that encodes a video file"""
+
+    def __init__(self, path, size: tuple, fps: int, pix_fmt: str, command=FFMPEG):
+        width, height = size
+        try:
+            self.process = self._start(command, width, height, fps, pix_fmt, path)
+        except FileNotFoundError:
+            raise RuntimeError(
+                f"{command} not found; install ffmpeg or export frame images"
+                " to a directory instead"
+            ) from None
+
+    def _start(self, command, width, height, fps, pix_fmt, path):
+        return subprocess.Popen(
+            [
+                command,
+                "-loglevel",
+                "error",
+                "-y",
+                "-f",
+                "rawvideo",
+                "-pix_fmt",
+                pix_fmt,
+                "-s",
+                f"{width}x{height}",
+                "-r",
+                str(fps),
+                "-i",
+                "-",
+                "-pix_fmt",
+                "yuv420p",
+                str(path),
+            ],
+            stdin=subprocess.PIPE,
+        )
+
+    def write(self, surface: pygame.Surface):
+        """Send one frame, straight from the surface's pixel memory"""
+        view = surface.get_view("0")
+        try:
+            self.process.stdin.write(view)
+        finally:
+            del view  # unlocks the surface
+
+    def close(self):
+        """Finish the file and wait for the encoder"""
+        self.process.stdin.close()
+        if self.process.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with status {self.process.returncode}")
+
+
+class FrameFilesSink:
+    """Saves every frame as a numbered BMP image in a directory"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        os.makedirs(self.path, exist_ok=True)
+        self.count = 0
+
+    def write(self, surface: pygame.Surface):
+        """Save one frame"""
+        self.count += 1
+        pygame.image.save(
+            surface, os.path.join(self.path, f"frame_{self.count:06d}.bmp")
+        )
+
+    def close(self):
+        pass
+
+
+class FrameWriter:
+    """
+    Pool of frame surfaces shared by a render loop and a writer thread
+
+    The loop acquire()s a free surface, renders into it and submit()s it;
+    a background thread writes submitted surfaces out through the sink
+    and puts them back in the pool. Encoding and disk I/O release the GIL,
+    so they overlap with rendering. The loop only waits when every
+    surface in the pool is still queued for writing, which stalls counts.
+    """
+
+    def __init__(self, path, size: tuple, fps: int, pool: int = EXPORT_POOL):
+        """
+        Args:
+            path: Video file (by extension, see VIDEO_EXTENSIONS) or
+                directory for frame images
+            size: Frame size in pixels
+            fps: Frame rate of the video
+            pool: Number of frame surfaces
+        """
+        self._free = queue.Queue()
+        for _ in range(pool):
+            self._free.put(pygame.Surface(size, 0, 32))
+        surface = self._free.queue[0]
+
+        if str(path).lower().endswith(VIDEO_EXTENSIONS):
+            self.sink = FFmpegSink(path, size, fps, pixel_format(surface))
+        else:
+            self.sink = FrameFilesSink(path)
+
+        self.frames = 0
+        self.stalls = 0  # acquire() calls that had to wait for the writer
+        self.stall_s = 0.0
+        self.error = None
+        self._pending = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def acquire(self) -> pygame.Surface:
+        """Get a surface to render the next frame into"""
+        if self.error is not None:
+            raise self.error
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            start = time.perf_counter()
+            surface = self._free.get()
+            self.stalls += 1
+            self.stall_s += time.perf_counter() - start
+            return surface
+
+    def submit(self, surface: pygame.Surface):
+        """Queue a rendered frame for writing"""
+        self.frames += 1
+        self._pending.put(surface)
+
+    def close(self):
+        """Write every queued frame and close the output"""
+        self._pending.put(None)
+        self._thread.join()
+        self.sink.close()
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        while True:
+            surface = self._pending.get()
+            if surface is None:
+                return
+            if self.error is None:
+                try:
+                    self.sink.write(surface)
+                except Exception as exc:  # reported to the loop by acquire()
+                    self.error = exc
+            self._free.put(surface)
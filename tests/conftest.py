@@ -0,0 +1,13 @@
+"""
+Test setup - the game's modules import each other from src/slither_sprint
+"""
+
+import os
+import sys
+
+# Nothing under test opens a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), os.pardir, "src", "slither_sprint")
+)
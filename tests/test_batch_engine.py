@@ -0,0 +1,127 @@
+"""
+BatchEngine against the scalar GameEngine rules
+"""
+
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from controller.batch_engine import (  # noqa: E402
+    BatchEngine,
+    RUNNING,
+    P1_WINS,
+    P2_WINS,
+    DRAW,
+    INVINCIBILITY,
+    Y_MIN,
+)
+from controller.bot import Bot, BotScheduler  # noqa: E402
+from controller.engine import GameEngine  # noqa: E402
+
+
+def _winner(engine) -> int:
+    """Batch winner code of a scalar match"""
+    text = engine.game_state.winner_text
+    if text is None:
+        return RUNNING
+    if text.startswith("Draw"):
+        return DRAW
+    return P1_WINS if text.startswith("P1") else P2_WINS
+
+
+def _race(seed: int, dt: int, blunders: float = 0.02):
+    """
+    Step a scalar match between bots, and from a copy of it before every
+    tick one batch match, comparing what the rules decide
+
+    Spawns come from different RNGs, so the batch match is loaded again
+    from the scalar one before each tick instead of running on its own.
+    The bots now and then take a random turn, so races also end in
+    crashes.
+
+    Returns:
+        Ticks simulated and apples collected
+    """
+    engine = GameEngine(seed=seed, chunked=False, players=2, endless=False)
+    # A budget no plan runs out of, so the race does not depend on timing
+    bots = BotScheduler(
+        engine,
+        [Bot(i + 1, snake.pane) for i, snake in enumerate(engine.game_state.snakes)],
+        budget_ms=10_000,
+    )
+    batch = BatchEngine(1, seed=seed)
+    rng = random.Random(seed)
+    ticks = 0
+    while not engine.is_over:
+        bots.update()
+        for player in (1, 2):
+            if rng.random() < blunders:
+                left = rng.random() < 0.5
+                engine.set_steering(player, left, not left)
+        steer = [-1 if left else 1 if right else 0 for left, right in engine.steering]
+        batch.load(0, engine)
+        engine.tick(dt)
+        batch.step(np.array([steer]), dt)
+        ticks += 1
+
+        for p, snake in enumerate(engine.game_state.snakes):
+            assert batch.body(0, p) == list(snake.body), (seed, ticks)
+            assert bool(batch.alive[0, p]) == snake.alive
+            assert batch.steps[0, p] == snake.steps
+            assert batch.apples_collected[0, p] == snake.apples_collected
+            assert batch.powerup[0, p] == snake.active_powerup.value
+            assert batch.step_ms[0, p] == snake.current_step_ms
+        assert batch.winner[0] == _winner(engine), (seed, ticks)
+    return ticks, sum(snake.apples_collected for snake in engine.game_state.snakes)
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_matches_scalar_rules(seed):
+    ticks, _ = _race(seed, dt=33)
+    assert ticks > 0
+
+
+def test_races_exercise_apples_and_power_ups():
+    # Apples and the speed boost that every third one brings
+    _, apples = _race(4, dt=33)
+    assert apples >= 3
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_matches_scalar_rules_with_long_frames(seed):
+    # Several steps a frame, and heads carried far past the finish line
+    ticks, _ = _race(seed, dt=4000)
+    assert ticks > 0
+
+
+def test_rows_past_the_grid_never_wrap():
+    batch = BatchEngine(256, seed=3)
+    # One frame long enough to carry every head far past the finish line
+    batch.powerup[:] = INVINCIBILITY
+    batch.powerup_end_ms[:] = 10**9
+    batch.step(dt=88_000)
+    assert (batch.head_y < Y_MIN).all()
+    assert (batch.winner == P1_WINS).all()
+    # Obstacles spawned ahead of the heads fell outside the grid, and the
+    # seeded ones are now below the cameras
+    assert not batch.obstacles.any()
+
+
+def test_initial_apples_never_share_a_cell():
+    batch = BatchEngine(256, seed=5)
+    for i in range(batch.n):
+        present = batch.apple_kind[i] != 0
+        cells = set(zip(batch.apple_x[i, present], batch.apple_y[i, present]))
+        assert len(cells) == present.sum()
+
+
+def test_obstacles_below_the_cameras_are_dropped():
+    batch = BatchEngine(32, seed=7)
+    for _ in range(600):
+        batch.step()
+        batch.reset(~batch.running)
+    bottom = np.ceil(batch.camera_y.max(axis=1) + 35).astype(int)
+    for i in range(batch.n):
+        rows = np.flatnonzero(batch.obstacles[i].any(axis=1)) + Y_MIN
+        assert (rows < bottom[i]).all()
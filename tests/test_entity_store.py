@@ -0,0 +1,59 @@
+"""
+EntityStore indexes and change journal
+"""
+
+from model.entity_store import EntityStore, OBSTACLE, APPLE
+from model.pane import Pane
+
+
+def _store() -> EntityStore:
+    return EntityStore([Pane(0, 9), Pane(10, 19)])
+
+
+def test_occupancy_counts_cells_of_either_kind_once():
+    store = _store()
+    store.add(OBSTACLE, 3, 5)
+    store.add(APPLE, 3, 5)
+    store.add(APPLE, 12, 5)
+    assert store.occupancy == [{5: 1}, {5: 1}]
+    store.remove(OBSTACLE, (3, 5))
+    assert store.occupancy == [{5: 1}, {5: 1}]
+    store.drop_from(APPLE, 0)
+    assert store.occupancy == [{}, {}]
+    assert len(store) == 0
+
+
+def test_changes_are_net_of_the_ticks_in_between():
+    store = _store()
+    store.add(OBSTACLE, 1, 1)
+    store.add(APPLE, 2, 2, golden=True)
+    store.track_changes()
+    store.add(OBSTACLE, 4, 4)
+    store.add(OBSTACLE, 5, 5)
+    store.remove(OBSTACLE, (5, 5))
+    store.remove(OBSTACLE, (1, 1))
+    store.add(OBSTACLE, 1, 1)
+    store.add_rows(OBSTACLE, [(6, [6, 7]), (8, [3])])
+    store.drop_from(OBSTACLE, 7)
+    added = {(4, 4): False, (6, 6): False, (7, 6): False}
+    assert store.take_changes(OBSTACLE) == (added, [])
+
+    # An apple eaten and replaced by another kind of apple
+    store.remove(APPLE, (2, 2))
+    store.add(APPLE, 2, 2)
+    store.drop_through(OBSTACLE, 4)
+    assert store.take_changes(APPLE) == ({(2, 2): False}, [])
+    added, removed = store.take_changes(OBSTACLE)
+    assert not added
+    assert sorted(removed) == [(1, 1), (4, 4)]
+    assert store.take_changes(OBSTACLE) == ({}, [])
+
+
+def test_clear_starts_a_new_generation():
+    store = _store()
+    store.track_changes()
+    store.add(APPLE, 2, 2)
+    generation = store.generation
+    store.clear(APPLE)
+    assert store.generation == generation + 1
+    assert store.take_changes(APPLE) == ({}, [])
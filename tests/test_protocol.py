@@ -0,0 +1,145 @@
+"""
+State encoding against the mirrors clients build from it
+"""
+
+import asyncio
+import random
+import struct
+import pytest
+from controller.bot import Bot, BotScheduler
+from controller.engine import GameEngine
+from model.game_state import GameState
+from net.client import MatchClient
+from net.protocol import (
+    STATE,
+    WELCOME,
+    WELCOME_BODY,
+    StateEncoder,
+    apply_state,
+    frame,
+)
+
+
+def _world(game_state) -> tuple:
+    """What a mirror must agree on; cameras are sent as f32"""
+    return (
+        [list(snake.body) for snake in game_state.snakes],
+        [
+            (snake.alive, snake.active_powerup, snake.apples_collected)
+            for snake in game_state.snakes
+        ],
+        dict(game_state.obstacles.blocks),
+        dict(game_state.apples.by_pos),
+        struct.pack("<2f", *game_state.cameras),
+        game_state.winner_text,
+    )
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+@pytest.mark.parametrize("seed", range(2))
+def test_mirror_matches_the_match(seed, chunked):
+    engine = GameEngine(seed=seed, chunked=chunked, players=2)
+    bots = BotScheduler(
+        engine,
+        [Bot(i + 1, snake.pane) for i, snake in enumerate(engine.game_state.snakes)],
+        budget_ms=10_000,
+    )
+    encoder = StateEncoder()
+    mirror = GameState(players=2)
+    rng = random.Random(seed)
+    snapshot = None
+    restored = 0
+    for tick in range(1500):
+        bots.update()
+        engine.tick()
+        # Restores replace the store's contents wholesale
+        if rng.random() < 0.02:
+            snapshot = engine.snapshot()
+        elif snapshot is not None and rng.random() < 0.02:
+            engine.restore(snapshot)
+            restored += 1
+        assert apply_state(mirror, encoder.encode(tick, engine.game_state)) == tick
+        assert _world(mirror) == _world(engine.game_state), tick
+        if engine.is_over:
+            break
+    assert restored
+
+
+def test_deltas_carry_only_what_changed():
+    engine = GameEngine(seed=4, players=2)
+    encoder = StateEncoder()
+    full = encoder.encode(0, engine.game_state)
+    # Blocks below the cameras are dropped; these stay until then
+    obstacles = engine.game_state.obstacles
+    obstacles.add_rows([(y, range(0, 45, 3)) for y in range(-2000, 0)])
+    # Gone again before anything was sent
+    obstacles.remove(0, -1)
+    obstacles.add(1, -1)
+    obstacles.remove(1, -1)
+    delta = encoder.encode(1, engine.game_state)
+    mirror = GameState(players=2)
+    apply_state(mirror, full)
+    apply_state(mirror, delta)
+    assert _world(mirror) == _world(engine.game_state)
+
+    engine.tick()
+    delta = encoder.encode(2, engine.game_state)
+    # A few new head cells, not the 30k blocks
+    assert len(delta) < 200
+    apply_state(mirror, delta)
+    assert _world(mirror) == _world(engine.game_state)
+
+
+def test_new_match_is_sent_in_full():
+    engine = GameEngine(seed=2, players=2)
+    encoder = StateEncoder()
+    mirror = GameState(players=2)
+    for tick in range(50):
+        engine.tick()
+        apply_state(mirror, encoder.encode(tick, engine.game_state))
+    engine.reset()
+    # Without encoder.reset(): a new store is noticed by itself
+    apply_state(mirror, encoder.encode(50, engine.game_state))
+    assert _world(mirror) == _world(engine.game_state)
+
+
+def _receive_corrupt(corrupt) -> MatchClient:
+    """Connect a client to a server sending one good state, then a bad one"""
+
+    async def serve(reader, writer):
+        await reader.readexactly(5)  # the join frame, empty room
+        writer.write(frame(WELCOME, WELCOME_BODY.pack(1, 110)))
+        payload = StateEncoder().encode(1, GameEngine(seed=1, players=2).game_state)
+        writer.write(frame(STATE, payload))
+        writer.write(frame(STATE, corrupt(payload)))
+        await writer.drain()
+        await reader.read()
+        writer.close()
+
+    async def run():
+        server = await asyncio.start_server(serve, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        client = MatchClient()
+        await client.connect("127.0.0.1", port)
+        await asyncio.wait_for(client.receive(), 5)
+        await client.close()
+        server.close()
+        await server.wait_closed()
+        return client
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize(
+    "corrupt",
+    [
+        lambda payload: payload[:7],  # cut inside the header
+        lambda payload: payload[:-3],  # cut inside the apples
+        lambda payload: payload[:14] + b"\xff" + payload[15:],  # no such power-up
+    ],
+    ids=["header", "tail", "power-up"],
+)
+def test_client_closes_on_a_corrupt_state(corrupt):
+    client = _receive_corrupt(corrupt)
+    assert client.states_received == 1
+    assert client.error is not None
@@ -0,0 +1,118 @@
+"""
+Replay files against the matches they were recorded from
+"""
+
+import random
+import pytest
+from controller.engine import GameEngine
+from controller.replay import (
+    ReplayError,
+    ReplayPlayer,
+    ReplayReader,
+    ReplayRecorder,
+    decode_steering,
+    encode_steering,
+)
+
+
+def _record(path, seed: int, ticks: int, keyframe_every: int = 64) -> tuple:
+    """
+    Record a match with random steering, restarting it whenever it ends
+
+    Returns:
+        Engine snapshots of every tick: as recorded, with its steering
+        set, and after it ran
+    """
+    engine = GameEngine(seed=seed, players=2)
+    recorder = ReplayRecorder(path, 2, keyframe_every=keyframe_every)
+    rng = random.Random(seed)
+    keys = [(False, False), (False, False)]
+    recorded = []
+    ran = []
+    for _ in range(ticks):
+        if engine.is_over:
+            engine.reset()
+            recorder.mark_restart()
+        for player in (1, 2):
+            if rng.random() < 0.1:
+                # Both keys at once go on the wire as left
+                code = encode_steering(rng.random() < 0.5, rng.random() < 0.5)
+                keys[player - 1] = decode_steering(code)
+            engine.set_steering(player, *keys[player - 1])
+        recorder.record(engine)
+        recorded.append(engine.snapshot())
+        engine.tick()
+        ran.append(engine.snapshot())
+    recorder.close()
+    return recorded, ran
+
+
+def _expected(reader: ReplayReader, snapshots: tuple, tick: int) -> tuple:
+    """
+    State a player should hold at a tick: the keyframe recorded there, or
+    else the state the tick before left
+    """
+    recorded, ran = snapshots
+    if any(keyframe[0] == tick for keyframe in reader.keyframes):
+        return recorded[tick]
+    return ran[tick - 1]
+
+
+@pytest.fixture(scope="module")
+def recording(tmp_path_factory):
+    path = tmp_path_factory.mktemp("replay") / "match.ssr"
+    return path, _record(path, seed=11, ticks=1500)
+
+
+def test_round_trip(recording):
+    path, snapshots = recording
+    reader = ReplayReader(path)
+    player = ReplayPlayer(reader)
+    ticks = len(snapshots[0])
+    assert reader.length == ticks
+    # Several matches, so restarts were recorded as keyframes too
+    assert len(reader.keyframes) > ticks // reader.keyframe_every + 1
+    for tick in range(ticks):
+        assert player.tick == tick
+        assert player.engine.snapshot() == _expected(reader, snapshots, tick), tick
+        assert player.step()
+    assert player.engine.snapshot() == snapshots[1][-1]
+    assert player.finished
+    assert not player.step()
+    reader.close()
+
+
+def test_seek(recording):
+    path, snapshots = recording
+    reader = ReplayReader(path)
+    player = ReplayPlayer(reader)
+    # Backwards, forwards, onto and just past keyframes
+    for tick in (900, 10, 1499, 64, 65, 0, 1200, 1201):
+        player.seek(tick)
+        # Playback goes on from there as recorded
+        for t in range(tick, min(tick + 20, reader.length)):
+            assert player.tick == t
+            assert player.engine.snapshot() == _expected(reader, snapshots, t), t
+            player.step()
+    reader.close()
+
+
+def test_cut_short_file_reads_to_its_last_whole_block(recording, tmp_path):
+    path, snapshots = recording
+    data = path.read_bytes()
+    cut = tmp_path / "cut.ssr"
+    cut.write_bytes(data[: len(data) * 2 // 3])
+    reader = ReplayReader(cut)
+    assert 0 < reader.length < len(snapshots[0])
+    player = ReplayPlayer(reader)
+    player.seek(reader.length)
+    assert player.finished
+    assert player.engine.snapshot() == snapshots[1][reader.length - 1]
+    reader.close()
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.ssr"
+    path.write_bytes(b"not a replay at all")
+    with pytest.raises(ReplayError):
+        ReplayReader(path)
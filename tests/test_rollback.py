@@ -0,0 +1,128 @@
+"""
+Rollback peers over a laggy loopback against one match run with every input
+"""
+
+import random
+import pytest
+from controller.bot import Bot, BotScheduler
+from controller.engine import GameEngine
+from controller.replay import decode_steering, encode_steering
+from net.rollback import LoopbackTransport, RollbackSession
+from config import FIXED_STEP_MS
+
+
+class _Steering:
+    """Stands in for an engine to a BotScheduler, keeping what it steers"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.keys = {}
+
+    @property
+    def game_state(self):
+        return self.engine.game_state
+
+    def set_steering(self, player: int, left: bool, right: bool):
+        self.keys[player] = (left, right)
+
+
+def _play(seed: int, latency_ms: float, jitter_ms: float, frames: int, **session):
+    """
+    Play two bots against each other, each on its own peer's engine, then
+    let both peers catch up with every input
+
+    Returns:
+        The two sessions, and each player's steering code per tick
+    """
+    now = [0.0]
+    links = LoopbackTransport.pair(lambda: now[0], latency_ms, jitter_ms, seed=seed)
+    peers = [
+        RollbackSession(GameEngine(seed=seed, players=2), player, link, **session)
+        for player, link in enumerate(links, start=1)
+    ]
+    # Only advance() may steer a session's engine. A budget no plan runs
+    # out of, so the match does not depend on timing
+    steering = [_Steering(peer.engine) for peer in peers]
+    bots = [
+        BotScheduler(
+            link,
+            [Bot(player, link.game_state.snakes[player - 1].pane)],
+            budget_ms=10_000,
+        )
+        for player, link in enumerate(steering, start=1)
+    ]
+    rng = random.Random(seed)
+    keys = [(False, False), (False, False)]
+    codes = ({}, {})
+
+    def advance(i):
+        tick = peers[i].tick
+        if peers[i].advance(*keys[i]):
+            codes[i][tick] = encode_steering(*keys[i])
+
+    for _ in range(frames):
+        for i, bot in enumerate(bots):
+            bot.update()
+            keys[i] = steering[i].keys[i + 1]
+            if rng.random() < 0.02:
+                left = rng.random() < 0.5
+                keys[i] = (left, not left)
+            advance(i)
+        now[0] += FIXED_STEP_MS
+    # Bring the peer that stalled more up to the other one's tick
+    while peers[0].tick != peers[1].tick:
+        for i, peer in enumerate(peers):
+            if peer.tick < peers[1 - i].tick:
+                advance(i)
+            else:
+                peer.poll()
+        now[0] += FIXED_STEP_MS
+    now[0] += latency_ms + jitter_ms + FIXED_STEP_MS
+    for peer in peers:
+        peer.poll()
+        while peer.behind:
+            peer.poll()
+    return peers, codes
+
+
+def _reference(seed: int, codes, ticks: int) -> tuple:
+    """Snapshot of the match run with every input known in advance"""
+    engine = GameEngine(seed=seed, players=2)
+    for tick in range(ticks):
+        for player, player_codes in enumerate(codes, start=1):
+            engine.set_steering(player, *decode_steering(player_codes[tick]))
+        engine.tick(FIXED_STEP_MS)
+    return engine.snapshot()
+
+
+@pytest.mark.parametrize(
+    "latency_ms, jitter_ms", [(0, 0), (60, 0), (120, 0), (150, 90), (300, 0)]
+)
+def test_peers_sync_under_latency(latency_ms, jitter_ms):
+    for seed in range(2):
+        peers, codes = _play(seed, latency_ms, jitter_ms, frames=600)
+        reference = _reference(seed, codes, peers[0].tick)
+        for peer in peers:
+            assert peer.engine.snapshot() == reference, (seed, peer.local)
+        if latency_ms:
+            assert peers[0].stats.rollbacks
+
+
+def test_rollbacks_past_the_budget_carry_over():
+    # No budget at all: every rollback is simulated a tick a frame
+    peers, codes = _play(3, 150, 90, frames=600, budget_ms=0)
+    reference = _reference(3, codes, peers[0].tick)
+    for peer in peers:
+        assert peer.engine.snapshot() == reference
+        stats = peer.stats
+        assert stats.over_budget and stats.carried_ticks >= stats.over_budget
+        assert stats.as_dict()["budget_ms"] == 0
+
+
+def test_remote_player_too_far_behind_stalls():
+    now = [0.0]
+    link, _ = LoopbackTransport.pair(lambda: now[0], 10_000)
+    peer = RollbackSession(GameEngine(seed=1, players=2), 1, link, max_rollback=4)
+    ran = [peer.advance(False, False) for _ in range(8)]
+    assert ran == [True] * 4 + [False] * 4
+    assert peer.stats.stalls == 4